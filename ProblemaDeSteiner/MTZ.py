@@ -1,97 +1,88 @@
-from pyomo.environ import Var, ConcreteModel, Objective, ConstraintList, SolverFactory, Boolean, NonNegativeIntegers, minimize
-
-    
-# Dados de entrada
-V = set()  # Conjunto de vértices
-E = set()  # Conjunto de arestas
-T = set()  # Conjunto de nós terminais
-d = {}  # Distâncias das arestas
-
-# Leitura da entrada
-n, m = map(int, input().split())  # Número de vértices e número de arestas
-
-# Leitura das arestas e distâncias
-for _ in range(m):
-    v, u, w = map(int, input().split())
-    E.add((v, u))  # Adiciona aresta ao conjunto E
-    d[(v, u)] = w  # Define a distância da aresta
-    E.add((u, v))  # Adiciona a aresta reversa (caso seja não direcionado)
-    d[(u, v)] = w  # Define a distância da aresta reversa
-
-# Leitura do número de nós terminais
-t = int(input())
-
-# Leitura dos nós terminais
-for _ in range(t):
-    terminal = int(input())
-    T.add(terminal)
-
-print('------------ Leitura completa ------------')
-
-# Criando o modelo
-modelo = ConcreteModel()
-
-# Conjunto de vértices
-V = set(range(1, n + 1))
-
-# Variáveis binárias x
-modelo.x = Var(E, within=Boolean)
-
-# Variáveis u para desigualdades de Miller-Tucker-Zemlin
-modelo.u = Var(V, within=NonNegativeIntegers, bounds=(0, len(V)-1))
-
-# Função objetivo: minimizar a soma das distâncias das arestas em x
-modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
-
-# Lista de restrições
-modelo.restricoes = ConstraintList()
-
-raiz = list(T)[0]  # Nó raiz
-T_r = T - {raiz}  # Conjunto de nós terminais sem a raiz
-
-# Adiciona restrições para garantir que cada nó terminal está conectado
-for k in T_r:
-    modelo.restricoes.add(sum(modelo.x[i, k] for i in V if (i, k) in E) >= 1)
-
-# Adiciona restrição para garantir que a raiz está conectada
-modelo.restricoes.add(sum(modelo.x[raiz, i] for i in V if (raiz, i) in E) >= 1)
-
-# Restrições de grau para garantir conectividade
-for i in V:
-    if i not in T:
-        modelo.restricoes.add(sum(modelo.x[i, j] for j in V if (i, j) in E) <= t * sum(modelo.x[j, i] for j in V if (j, i) in E))
-
-# Define a restrição para a variável de ordem do nó raiz
-
-modelo.restricoes.add(modelo.u[raiz] == 0)
-
-# Restrições de Miller-Tucker-Zemlin para eliminar subcircuitos
-for j in V:
-    if j == raiz:
-        continue
-    for i in V:
-        if (i, j) in E:
-            modelo.restricoes.add(modelo.u[j] >= modelo.u[i] + (n - 1) * modelo.x[i, j] + (n - 3) * modelo.x[j, i] - (n - 2))
-            
-# Resolver o modelo
-solver = SolverFactory('glpk')
-solver.options['tmlim'] = 30 * 60
-resultado = solver.solve(modelo, tee=True)
-
-# Imprimir a solução
-print("\nSolucao Otima Encontrada")
-
-# Extraindo informações do resultado
-LB = resultado.problem.lower_bound
-UB = resultado.problem.upper_bound
-relaxacao = modelo.objetivo()
-gap_relaxacao = ((UB - LB) / UB) * 100 if UB != 0 else float('inf')
-
-# Imprimir as informações solicitadas
-print("\nResumo da Execucao:")
-print(f"Valor da funcao objetivo: {modelo.objetivo()}")
-print(f"Melhor Limite Inferior (LB): {LB}")
-print(f"Melhor  Limite Superior (UB): {UB}")
-print(f"Relaxacao (LBR): {relaxacao}")
-print(f"Gap de Relaxacao (%): {gap_relaxacao}")
-print(f'--------------------------------------\n{resultado}')
+from pyomo.environ import Var, ConcreteModel, Objective, ConstraintList, Boolean, NonNegativeIntegers, minimize
+from instancia import ler_instancia
+import compactas
+from registro import Registro
+
+
+def construir_modelo(inst, fixados=()):
+    n = inst.n
+    t = len(inst.terminais)
+    raiz = inst.raiz  # Nó raiz
+    arcos = inst.arcos
+
+    # Criando o modelo
+    modelo = ConcreteModel()
+
+    # Variáveis binárias x
+    modelo.x = Var(arcos, within=Boolean)
+    x = [modelo.x[a] for a in arcos]  # Variáveis indexadas pelo id do arco
+    for a in fixados:
+        x[a].fix(0)  # Arcos eliminados por custo reduzido
+
+    # Variáveis u para desigualdades de Miller-Tucker-Zemlin
+    modelo.u = Var(range(n), within=NonNegativeIntegers, bounds=(0, n - 1))
+
+    # Função objetivo: minimizar a soma das distâncias das arestas em x
+    modelo.objetivo = Objective(expr=inst.custo_fixo + sum(w * x[a] for a, w in enumerate(inst.peso)), sense=minimize)
+
+    # Lista de restrições
+    modelo.restricoes = ConstraintList()
+
+    # Adiciona restrições para garantir que cada nó terminal está conectado
+    for k in inst.T_r:
+        modelo.restricoes.add(sum(x[a] for a in inst.arcos_entrada(k)) >= 1)
+
+    # Adiciona restrição para garantir que a raiz está conectada
+    modelo.restricoes.add(sum(x[a] for a in inst.arcos_saida(raiz)) >= 1)
+
+    # Restrições de grau para garantir conectividade
+    for i in range(n):
+        if not inst.eh_terminal[i]:
+            modelo.restricoes.add(sum(x[a] for a in inst.arcos_saida(i)) <= t * sum(x[a] for a in inst.arcos_entrada(i)))
+
+    # Define a restrição para a variável de ordem do nó raiz
+    modelo.restricoes.add(modelo.u[raiz] == 0)
+
+    # Restrições de Miller-Tucker-Zemlin para eliminar subcircuitos
+    for j in range(n):
+        if j == raiz:
+            continue
+        for a in inst.arcos_entrada(j):
+            i = inst.cauda[a]
+            modelo.restricoes.add(modelo.u[j] >= modelo.u[i] + (n - 1) * x[a] + (n - 3) * x[a ^ 1] - (n - 2))
+
+    return modelo
+
+
+def solucao_inicial(modelo, inst, heuristica):
+    """Valores de x e u da árvore heurística (u é a profundidade a partir da raiz)."""
+    na_arvore = set(heuristica.arcos)
+    for a, arco in enumerate(inst.arcos):
+        modelo.x[arco].value = 1 if a in na_arvore else 0
+    profundidade = {inst.raiz: 0}
+    for a in heuristica.arcos:
+        profundidade[inst.cabeca[a]] = profundidade[inst.cauda[a]] + 1
+    for v in range(inst.n):
+        modelo.u[v].value = profundidade.get(v, 1)
+
+
+def argumentos():
+    return compactas.argumentos('Formulação MTZ para o problema de Steiner.')
+
+
+def resolver(inst, opcoes=None, registro=None):
+    """Redução, heurística, ascensão dual e modelo MTZ; devolve o Registro da execução."""
+    opcoes = opcoes or argumentos().parse_args([])
+    registro = registro or Registro('MTZ')
+    return compactas.resolver('MTZ', inst, opcoes, registro, construir_modelo, solucao_inicial)
+
+
+if __name__ == '__main__':
+    args = argumentos().parse_args()
+    registro = Registro('MTZ', args.registro, args.teste)
+    registro.perfilar(args.perfil)
+
+    # Leitura da entrada
+    with registro.fase('leitura'):
+        inst = ler_instancia()
+    resolver(inst, args, registro)
@@ -1,15 +1,25 @@
-from pyomo.environ import Var, ConcreteModel, Objective, ConstraintList, SolverFactory, Binary, NonNegativeReals, minimize
+import resource
+import time
+
+from pyomo.environ import Var, Block, ConcreteModel, Objective, ConstraintList, Binary, NonNegativeReals, minimize
 import networkx as nx
 import matplotlib.pyplot as plt
-
-def print_steiner_tree(modelo):
+from instancia import ler_instancia
+from reducoes import imprimir_solucao_original
+from heuristicas import distancias
+import compactas
+from registro import Registro, memoria_pico, imprimir_relaxacao
+from separacao import FluxoMaximo
+from benders import resolver_benders
+
+def print_steiner_tree(modelo, d):
     # Criando o grafo
     G = nx.Graph()
 
-    # Adicionando arestas do grafo baseadas nas variáveis x
+    # Adicionando arestas do grafo baseadas nas variáveis x (vértices exibidos a partir de 1)
     for (i, j) in modelo.x:
         if modelo.x[i, j].value == 1:
-            G.add_edge(i, j, weight=d[(i, j)])
+            G.add_edge(i + 1, j + 1, weight=d[(i, j)])
 
     # Posicionando os vértices
     pos = nx.spring_layout(G)
@@ -22,96 +32,207 @@ def print_steiner_tree(modelo):
     # Exibindo o grafo
     plt.title('Árvore de Steiner')
     plt.show()
-    
-# Leitura da entrada
-n, m = map(int, input().split())  # Número de vértices e número de arestas
 
-# Dados de entrada
-V = set(range(1, n + 1))  # Conjunto de vértices
-E = set()  # Conjunto de arestas
-d = {}  # Distâncias das arestas
 
-# Leitura das arestas
-for _ in range(m):
-    v, u, w = map(int, input().split())
-    E.add((v, u))  # Adiciona aresta ao conjunto E
-    d[(v, u)] = w  # Define a distância da aresta
-    E.add((u, v))  # Adiciona a aresta reversa
-    d[(u, v)] = w  # Define a distância da aresta
+def construir_modelo(inst, fixados=(), mercadorias=None):
+    """Modelo com as mercadorias dadas (por padrão, todos os terminais exceto a raiz)."""
+    arcos = inst.arcos
 
-# Leitura do número de nós terminais
-t = int(input())
+    # Criando o modelo
+    modelo = ConcreteModel()
 
-# Conjunto de nós terminais
-T = set(int(input()) for _ in range(t))
+    # Variáveis binárias x
+    modelo.x = Var(arcos, within=Binary)
+    x = [modelo.x[a] for a in arcos]
+    for a in fixados:
+        x[a].fix(0)  # Arcos eliminados por custo reduzido
 
-print('------------ Leitura completa ------------')
+    # Função objetivo: minimizar a soma das distâncias das arestas em x
+    modelo.objetivo = Objective(expr=inst.custo_fixo + sum(w * x[a] for a, w in enumerate(inst.peso)), sense=minimize)
 
-# Criando o modelo
-modelo = ConcreteModel()
+    # Restrições de binaridade
+    modelo.restricao_binaridade = ConstraintList()
+    for a in range(len(arcos)):
+        modelo.restricao_binaridade.add(x[a] <= 1)
 
-# Variáveis binárias x
-modelo.x = Var(E, within=Binary)
+    # Fluxo só nos arcos não fixados
+    modelo.livres = [a for a in range(len(arcos)) if a not in fixados]
+    modelo.mercadorias = []
+    for k in (inst.T_r if mercadorias is None else mercadorias):
+        adicionar_mercadoria(modelo, inst, k)
 
-# Variáveis de fluxo f para cada nó terminal em T
-modelo.f = Var(E, T - {1}, within=NonNegativeReals)
+    return modelo
 
-# Função objetivo: minimizar a soma das distâncias das arestas em x
-modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
 
-# Restrições de fluxo para cada mercadoria k ∈ T \ {1}
-modelo.restricao_fluxo_mercadoria = ConstraintList()
+def adicionar_mercadoria(modelo, inst, k):
+    """Cria as variáveis de fluxo f[., k] e as restrições da mercadoria k num bloco próprio."""
+    arcos = inst.arcos
+    bloco = Block()
+    modelo.add_component(f'mercadoria_{k}', bloco)
+    modelo.mercadorias.append(k)
 
-raiz = list(T)[0]  # Nó raiz
-T_r = T - {raiz}  # Conjunto de nós terminais sem a raiz
+    # Variáveis de fluxo f da mercadoria k
+    bloco.f = Var([arcos[a] for a in modelo.livres], within=NonNegativeReals)
+    f = {a: bloco.f[arcos[a]] for a in modelo.livres}
 
-for k in T_r:
-    for i in V:
+    # Restrições de fluxo da mercadoria k
+    bloco.restricao_fluxo_mercadoria = ConstraintList()
+    for i in range(inst.n):
+        entrada = [f[a] for a in inst.arcos_entrada(i) if a in f]
+        saida = [f[a] for a in inst.arcos_saida(i) if a in f]
+        if not entrada and not saida:
+            continue  # Vértice sem arcos livres
+        balanco = sum(entrada) - sum(saida)
         if i == k:
-            modelo.restricao_fluxo_mercadoria.add(
-                sum(modelo.f[j, i, k] for j in V if (j, i) in E) - sum(modelo.f[i, j, k] for j in V if (i, j) in E) == 1
-            )
-        elif i == raiz:
-            modelo.restricao_fluxo_mercadoria.add(
-                sum(modelo.f[j, i, k] for j in V if (j, i) in E) - sum(modelo.f[i, j, k] for j in V if (i, j) in E) == -1
-            )
+            bloco.restricao_fluxo_mercadoria.add(balanco == 1)
+        elif i == inst.raiz:
+            bloco.restricao_fluxo_mercadoria.add(balanco == -1)
         else:
-            modelo.restricao_fluxo_mercadoria.add(
-                sum(modelo.f[j, i, k] for j in V if (j, i) in E) - sum(modelo.f[i, j, k] for j in V if (i, j) in E) == 0
-            )
-
-# Restrições de capacidade de fluxo para cada mercadoria k ∈ T \ {1}
-modelo.restricao_capacidade = ConstraintList()
-for (i, j) in E:
-    for k in T_r:
-        modelo.restricao_capacidade.add(modelo.f[i, j, k] <= modelo.x[i, j])
-
-# Restrições de binaridade
-modelo.restricao_binaridade = ConstraintList()
-for (i, j) in E:
-    modelo.restricao_binaridade.add(modelo.x[i, j] <= 1)
-
-# Resolver o modelo
-solver = SolverFactory('glpk')
-solver.options['tmlim'] = 30 * 60
-solver.options['nopresol'] = ''  # Desativa o pré-processamento
-
-resultado = solver.solve(modelo, tee=True)
-
-# Imprimir a solução
-print("\nSolucao Otima Encontrada")
-
-# Extraindo informações do resultado
-LB = resultado.problem.lower_bound
-UB = resultado.problem.upper_bound
-relaxacao = modelo.objetivo()
-gap_relaxacao = ((UB - LB) / UB) * 100 if UB != 0 else float('inf')
-
-# Imprimir as informações solicitadas
-print("\nResumo da Execucao:")
-print(f"Valor da funcao objetivo: {modelo.objetivo()}")
-print(f"Melhor Limite Inferior (LB): {LB}")
-print(f"Melhor  Limite Superior (UB): {UB}")
-print(f"Relaxacao (LBR): {relaxacao}")
-print(f"Gap de Relaxacao (%): {gap_relaxacao}")
-print(f'--------------------------------------\n{resultado}')
+            bloco.restricao_fluxo_mercadoria.add(balanco == 0)
+
+    # Restrições de capacidade de fluxo da mercadoria k
+    bloco.restricao_capacidade = ConstraintList()
+    for a in modelo.livres:
+        bloco.restricao_capacidade.add(f[a] <= modelo.x[arcos[a]])
+    return bloco
+
+
+def mercadorias_iniciais(inst, quantidade):
+    """Os terminais mais distantes da raiz, que costumam determinar a forma da árvore."""
+    dist = distancias(inst, [inst.raiz])
+    return sorted(inst.T_r, key=lambda k: dist.get(k, 0), reverse=True)[:quantidade]
+
+
+def mercadorias_violadas(modelo, inst, eps=1e-6):
+    """Terminais fora do modelo que o x atual não liga à raiz com uma unidade de fluxo."""
+    x = [modelo.x[a].value or 0.0 for a in inst.arcos]
+    fluxo = FluxoMaximo(inst, x, eps)
+    incluidas = set(modelo.mercadorias)
+    return [
+        k for k in inst.T_r
+        if k not in incluidas and fluxo.calcular(inst.raiz, k, limite=1.0)[0] < 1 - eps
+    ]
+
+
+def solucao_inicial(modelo, inst, heuristica):
+    """Valores de x e f da árvore heurística (f[., k] segue o caminho da raiz até k)."""
+    na_arvore = set(heuristica.arcos)
+    for a, (i, j) in enumerate(inst.arcos):
+        modelo.x[i, j].value = 1 if a in na_arvore else 0
+    for k in modelo.mercadorias:
+        f = getattr(modelo, f'mercadoria_{k}').f
+        for indice in f:
+            f[indice].value = 0
+        v = k
+        while heuristica.pai[v] is not None:
+            a = heuristica.pai[v]
+            f[inst.cauda[a], inst.cabeca[a]].value = 1
+            v = inst.cauda[a]
+
+
+def tamanho(modelo):
+    return modelo.nvariables(), modelo.nconstraints()
+
+
+def argumentos():
+    parser = compactas.argumentos('Formulação de fluxo de múltiplas mercadorias para o problema de Steiner.')
+    parser.add_argument('--mercadorias-sob-demanda', action='store_true',
+                        help='Começa com poucas mercadorias e só acrescenta as que o x atual não atende (fluxo máximo). '
+                             'Só na montagem pelo Pyomo; o modo matriz inclui todas as mercadorias.')
+    parser.add_argument('--mercadorias-iniciais', type=int, default=1, help='Quantidade de mercadorias no primeiro modelo do modo sob demanda.')
+    parser.add_argument('--benders', action='store_true',
+                        help='Decomposição de Benders: mestre só com x e um subproblema de fluxo máximo por terminal, resolvidos em paralelo.')
+    parser.add_argument('--processos', type=int, default=None, help='Processos para os subproblemas de Benders (padrão: núcleos disponíveis, ou OMP_NUM_THREADS se definida).')
+    parser.add_argument('--cortes-aninhados', type=int, default=5, help='Cortes de Benders aninhados por terminal em cada rodada.')
+    parser.add_argument('--solver', choices=['highs', 'cbc', 'glpk'], default='highs',
+                        help='Solver do mestre de Benders (persistente highs/cbc, ou glpk).')
+    return parser
+
+
+def resolver(inst, opcoes=None, registro=None):
+    """Fluxo completo de múltiplas mercadorias (inclusive o modo sob demanda); devolve o Registro."""
+    opcoes = opcoes or argumentos().parse_args([])
+    registro = registro or Registro('MultiplaMercadoria')
+
+    inicio = time.perf_counter()
+
+    preparo = compactas.preparar(inst, opcoes, registro)
+    if preparo is None:
+        return registro
+    inst, reducao, heuristica = preparo.inst, preparo.reducao, preparo.heuristica
+
+    # Benders: o mestre só tem x; os fluxos viram cortes de viabilidade dos subproblemas
+    if opcoes.benders:
+        modelo = resolver_benders(inst, registro, preparo.fixados, heuristica, opcoes.solver, opcoes.processos, opcoes.cortes_aninhados)
+        dados = registro.dados
+        print("\nSolucao Otima Encontrada" if dados['status'] == 'optimal' else "\nLimite de tempo atingido")
+        print("\nResumo da Execucao:")
+        print(f"Valor da funcao objetivo: {modelo.objetivo()}")
+        print(f"Melhor Limite Inferior (LB): {dados['LB']}")
+        print(f"Melhor  Limite Superior (UB): {dados['UB']}")
+        imprimir_relaxacao(dados['UB'], dados['LBR'])
+        print(f"Cortes de Benders: {dados['cortes']} | Iteracoes LP: {dados['iteracoes_lp']} | Iteracoes: {dados['iteracoes']}")
+        print(f"Pico de memoria (RSS): {memoria_pico():.1f} MB")
+        print(f"Tempo total: {time.perf_counter() - inicio:.4f}")
+        if reducao is not None:
+            imprimir_solucao_original(reducao, modelo)
+        return registro
+
+    if opcoes.montagem == 'matriz':
+        compactas.resolver_matriz('MultiplaMercadoria', preparo, opcoes, registro)
+        return registro
+
+    mercadorias = None
+    if opcoes.mercadorias_sob_demanda:
+        mercadorias = mercadorias_iniciais(inst, opcoes.mercadorias_iniciais)
+    with registro.fase('montagem'):
+        modelo = construir_modelo(inst, preparo.fixados, mercadorias)
+
+    # No modo sob demanda, resolve e acrescenta as mercadorias violadas até todas serem atendidas
+    rodadas = 0
+    pico_variaveis, pico_restricoes = tamanho(modelo)
+    while True:
+        rodadas += 1
+        if heuristica is not None and heuristica.arestas is not None:
+            solucao_inicial(modelo, inst, heuristica)
+        # nopresol desativa o pré-processamento do GLPK
+        resultado = compactas.resolver_glpk(modelo, heuristica, registro, max(1, int(30 * 60 - (time.perf_counter() - inicio))),
+                                            {'nopresol': ''})
+        if not opcoes.mercadorias_sob_demanda:
+            break
+        with registro.fase('separacao'):
+            violadas = mercadorias_violadas(modelo, inst)
+        print(f"Rodada {rodadas}: {len(modelo.mercadorias)} mercadorias no modelo, {len(violadas)} violadas")
+        if not violadas or time.perf_counter() - inicio >= 30 * 60:
+            break
+        with registro.fase('montagem'):
+            for k in violadas:
+                adicionar_mercadoria(modelo, inst, k)
+        variaveis, restricoes = tamanho(modelo)
+        pico_variaveis, pico_restricoes = max(pico_variaveis, variaveis), max(pico_restricoes, restricoes)
+
+    # No modo sob demanda o modelo resolvido tem só parte das mercadorias; o LBR é o da formulação completa
+    completo = construir_modelo(inst) if opcoes.mercadorias_sob_demanda else None
+    compactas.resumo(modelo, resultado, preparo, opcoes, registro, completo)
+    print(f"Mercadorias no modelo: {len(modelo.mercadorias)} de {len(inst.T_r)} | Rodadas: {rodadas}")
+    print(f"Pico do modelo: {pico_variaveis} variaveis, {pico_restricoes} restricoes")
+    print(f"Pico de memoria (RSS): {memoria_pico():.1f} MB | "
+          f"solver: {resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024:.1f} MB")
+    print(f"Tempo total: {time.perf_counter() - inicio:.4f}")
+    registro.definir(mercadorias=len(modelo.mercadorias), iteracoes=rodadas, pico_variaveis=pico_variaveis,
+                     pico_restricoes=pico_restricoes)
+    if reducao is not None:
+        imprimir_solucao_original(reducao, modelo)
+    print(f'--------------------------------------\n{resultado}')
+    return registro
+
+
+if __name__ == '__main__':
+    args = argumentos().parse_args()
+    registro = Registro('MultiplaMercadoria', args.registro, args.teste)
+    registro.perfilar(args.perfil)
+
+    # Leitura da entrada
+    with registro.fase('leitura'):
+        inst = ler_instancia()
+    resolver(inst, args, registro)
@@ -1,139 +1,223 @@
+import argparse
+
 from pyomo.environ import (
     Var,
     Objective,
     ConstraintList,
-    SolverFactory,
     Boolean,
+    UnitInterval,
     ConcreteModel,
     minimize,
-    value,
-)
-
-# Leitura da entrada
-n, m = map(int, input().split())  # Número de vértices e número de arestas
-
-# Dados de entrada
-V = set(range(0, n))  # Conjunto de vértices
-E = set()  # Conjunto de arestas
-d = {}  # Distâncias das arestas
-
-# Leitura das arestas
-for _ in range(m):
-    v, u, w = map(int, input().split())
-    v, u = v - 1, u - 1
-    E.add((v, u))  # Adiciona aresta ao conjunto E
-    d[(v, u)] = w  # Define a distância da aresta
-    E.add((u, v))  # Adiciona a aresta reversa
-    d[(u, v)] = w  # Define a distância da aresta
-
-# Leitura do número de nós terminais
-t = int(input())
-
-# Conjunto de nós terminais
-T = list(int(input()) - 1 for _ in range(t))
-
-print("------------ Leitura completa ------------")
-
-raiz = T[0]  # Nó raiz
-T_r = T[1:]  # Conjunto de nós terminais sem a raiz
-
-# Definir o modeloo Pyomo
-modelo = ConcreteModel()
-
-# Variáveis binárias para indicar se uma aresta (i, j) está no conjunto da árvore de Steiner
-modelo.x = Var(E, within=Boolean)
-
-# Função objetivo: minimizar o custo total das arestas na árvore de Steiner
-modelo.objetivo = Objective(
-    expr=sum(modelo.x[i, j] * d[i, j] for (i, j) in E), sense=minimize
 )
-
-
-# Lista de restrições
-modelo.restricoes = ConstraintList()
-
-# Restrições de grau para nós terminais
-for k in T_r:
-    modelo.restricoes.add(sum(modelo.x[i, k] for i in V if (i, k) in E) == 1)
-
-
-# Função para busca em largura (BFS) para verificar conectividade
-def bfs(src):
-    eps = 0.0001  # Pequeno valor para comparação de float
-    queue = [src]  # Inicializa a fila com o nó fonte
-
-    visitados = [False for i in V]
-    visitados[src] = True
-
-    while len(queue):
-        v = queue.pop(0)
-        for u in V:
-            if (
-                ((v, u) in E)
-                and (not visitados[u])
-                and (
-                    (abs(1 - value(modelo.x[v, u])) < eps)
-                    or (abs(1 - value(modelo.x[u, v])) < eps)
-                )
-            ):
-                visitados[u] = True
-                queue.append(u)
-
-    return visitados
-
-
-# Resolver o modelo
-solver = SolverFactory("glpk")
-solver.options["tmlim"] = 1800
-solver.options["nopresol"] = ""  # Desativa o pré-processamento
-
-
-# Conjunto inicial de cortes
-L = []
-tempo_total = 0
-count = 1
-
-while True:
-    solver.options["tmlim"] = 1800
-    results = solver.solve(modelo, tee=True)
-    tempo_iteracao = results.solver.time
-    tempo_total += tempo_iteracao
-    print(f"Tempo na iteracao {count}: {tempo_iteracao}, Tempo total acumulado: {tempo_total}")
-
-    L_mudou = False
-    vistos  = [False] * n
-
-    for i in V:
-        if not vistos [i]:
-            S = bfs(i)
-            vistos  = [(vistos [i] or S[i]) for i in V]
-
-            tem_raiz = S[raiz]
-            tem_terminal = any(S[k] for k in T_r)
-
-            if not tem_raiz and tem_terminal:
-                conjunto_complementar  = [not S[i] for i in V]
-                L.append(conjunto_complementar )
-                L_mudou = True
-
-    if not L_mudou or tempo_total >= 1800:
-        break
-
-    for S in L:
-        modelo.restricoes.add(
-            sum(
-                modelo.x[i, j]
-                for i in V
-                for j in V
-                if (S[i]) and (not S[j]) and (i, j) in E
-            )
-            >= 1
-        )
-    count += 1
-
-# Imprimir as informações solicitadas
-print("\nResumo da Execucao:")
-print(f"Valor da funcao objetivo: {modelo.objetivo()}")
-print(f"Numero de Cortes: {len(L)}")
-print(f"Iteracoes: {count}")
-print(f"Total Time: {tempo_total}")
+import numpy as np
+from instancia import ler_instancia
+from reducoes import reduzir, imprimir_solucao_reduzida, imprimir_solucao_original
+from separacao import Separador
+from pool_cortes import PoolDeCortes
+from registro import Registro
+from resolvedor import Resolvedor
+
+
+def construir_modelo(inst):
+    arcos = inst.arcos
+
+    # Definir o modelo Pyomo
+    modelo = ConcreteModel()
+
+    # Variáveis binárias para indicar se uma aresta (i, j) está no conjunto da árvore de Steiner
+    modelo.x = Var(arcos, within=Boolean)
+
+    # Função objetivo: minimizar o custo total das arestas na árvore de Steiner
+    modelo.objetivo = Objective(
+        expr=inst.custo_fixo + sum(modelo.x[a] * w for a, w in zip(arcos, inst.peso)), sense=minimize
+    )
+
+    # Lista de restrições
+    modelo.restricoes = ConstraintList()
+
+    # Restrições de grau para nós terminais
+    for k in inst.T_r:
+        modelo.restricoes.add(sum(modelo.x[arcos[a]] for a in inst.arcos_entrada(k)) == 1)
+
+    return modelo
+
+
+def valores_x(modelo, arcos):
+    """Cópia de x em NumPy (indexada pelo id do arco), lida do modelo uma vez por rodada."""
+    return np.fromiter((modelo.x[a].value or 0.0 for a in arcos), dtype=float, count=len(arcos))
+
+
+def fase_relaxacao(modelo, inst, resolvedor, pool, separador, tmlim, tol_estagnacao=1e-4, max_estagnado=0):
+    """Planos de corte sobre a relaxação linear com separação por corte mínimo.
+
+    Resolve o PL, separa os cortes dirigidos violados pela solução fracionária e
+    repete até não haver corte violado. Com max_estagnado > 0, para também
+    quando o limite inferior não sobe por max_estagnado rodadas seguidas: os PLs
+    são degenerados e o limite fica parado por várias rodadas antes de voltar a
+    subir, então a janela deve ser longa. Os cortes do pool não envelhecem nesta
+    fase. Devolve (iterações, cortes, tempo).
+    """
+    arcos = inst.arcos
+    for a in arcos:
+        modelo.x[a].domain = UnitInterval
+
+    iteracoes = cortes = 0
+    tempo = 0
+    limite_anterior = None
+    estagnado = 0
+    while tempo < tmlim:
+        resolvedor.resolver(tee=False)
+        tempo += resolvedor.tempo_resolucao
+        iteracoes += 1
+        limite = modelo.objetivo()
+
+        S_violados = separador.fracionario(valores_x(modelo, arcos))
+        novos = sum(pool.adicionar(S) for S in S_violados)
+        print(f"Iteracao LP {iteracoes}: limite {limite}, cortes violados {len(S_violados)}, "
+              f"atualizacao {resolvedor.tempo_atualizacao:.4f}, resolucao {resolvedor.tempo_resolucao:.4f}, "
+              f"separacao {separador.tempos[-1]:.4f}, tempo acumulado {tempo}")
+        cortes += novos
+
+        if not novos:
+            break
+        if not max_estagnado:
+            continue
+        if limite_anterior is not None and limite - limite_anterior <= tol_estagnacao * max(1.0, abs(limite)):
+            estagnado += 1
+            if estagnado >= max_estagnado:
+                break
+        else:
+            estagnado = 0
+        limite_anterior = limite
+
+    for a in arcos:
+        modelo.x[a].domain = Boolean
+    return iteracoes, cortes, tempo
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description='Planos de corte para o problema de Steiner.')
+    parser.add_argument('--sem-reducao', action='store_true', help='Não aplica os testes de redução antes de montar o modelo.')
+    parser.add_argument('--separacao', choices=['fracionaria', 'inteira'], default='fracionaria',
+                        help='fracionaria: cortes sobre a relaxação linear (corte mínimo) antes das rodadas inteiras; inteira: apenas rodadas inteiras.')
+    parser.add_argument('--solver', choices=['highs', 'cbc', 'glpk'], default='highs',
+                        help='Solver persistente (highs/cbc via APPSI) ou glpk; sem o persistente instalado usa o GLPK.')
+    parser.add_argument('--idade-cortes', type=int, default=10,
+                        help='Rodadas inteiras seguidas com folga após as quais um corte é desativado, sem fase fracionária (0 mantém todos).')
+    parser.add_argument('--idade-cortes-mip', type=int, default=100,
+                        help='O mesmo depois da fase fracionária: soluções inteiras deixam cortes do PL folgados, e reativar um custa um MIP.')
+    parser.add_argument('--processos', type=int, default=None,
+                        help='Processos para os cortes mínimos por terminal da separação fracionária (padrão: OMP_NUM_THREADS ou 1).')
+    parser.add_argument('--cortes-aninhados', type=int, default=3,
+                        help='Cortes mínimos aninhados por terminal em cada rodada da separação fracionária.')
+    parser.add_argument('--estagnacao', type=int, default=0,
+                        help='Rodadas seguidas sem subir o limite após as quais a fase fracionária para (0: só para sem corte violado).')
+    parser.add_argument('--registro', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução.')
+    parser.add_argument('--teste', default=None, help='Nome do teste gravado no registro.')
+    parser.add_argument('--perfil', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
+    return parser
+
+
+def resolver(inst, opcoes=None, registro=None):
+    """Fase fracionária e rodadas inteiras de planos de corte; devolve o Registro com cortes e iterações."""
+    opcoes = opcoes or argumentos().parse_args([])
+    registro = registro or Registro('PlanosDeCorte')
+    registro.instancia(inst)
+
+    print("------------ Leitura completa ------------")
+
+    # Reduções do grafo antes de montar o modelo
+    reducao = None
+    if not opcoes.sem_reducao:
+        with registro.fase('reducao'):
+            reducao = reduzir(inst)
+        inst = reducao.instancia
+        if reducao.resolvida:
+            imprimir_solucao_reduzida(reducao)
+            print("Numero de Cortes: 0")
+            print("Iteracoes: 0")
+            print(f"Total Time: {reducao.tempo}")
+            registro.definir(status='reducao', LB=reducao.custo_fixo, UB=reducao.custo_fixo, iteracoes=0, cortes=0)
+            return registro
+
+    arcos = inst.arcos
+
+    with registro.fase('montagem'):
+        modelo = construir_modelo(inst)
+
+    # Resolver o modelo (nopresol desativa o pré-processamento do GLPK)
+    resolvedor = Resolvedor(modelo, backend=opcoes.solver, tmlim=1800, opcoes_glpk={"nopresol": ""})
+
+    # Pool de cortes: só cortes inéditos entram no modelo
+    pool = PoolDeCortes(modelo, inst, idade_max=opcoes.idade_cortes, resolvedor=resolvedor)
+    separador = Separador(inst, opcoes.processos, opcoes.cortes_aninhados, reversos=True)
+
+    # Fase de relaxação linear com separação fracionária
+    iteracoes_lp, cortes_lp, tempo_total = 0, 0, 0
+    if opcoes.separacao == 'fracionaria':
+        with registro.fase('relaxacao_lp'):
+            iteracoes_lp, cortes_lp, tempo_total = fase_relaxacao(modelo, inst, resolvedor, pool, separador, 1800,
+                                                                  max_estagnado=opcoes.estagnacao)
+        separador.fechar()
+        # Os cortes do PL ficam folgados em muitas soluções inteiras; com a idade curta, seriam desativados e cada
+        # reativação custaria uma resolução inteira a mais
+        pool.idade_max = opcoes.idade_cortes_mip
+
+    count = 1
+    atualizacao = 0.0  # Envio das linhas ao solver nas rodadas inteiras; a fase fracionária já conta as suas
+
+    while True:
+        with registro.fase('resolucao'):
+            resolvedor.resolver(tee=True)
+        tempo_iteracao = resolvedor.tempo_resolucao
+        tempo_total += tempo_iteracao
+        atualizacao += resolvedor.tempo_atualizacao
+        print(f"Tempo na iteracao {count}: {tempo_iteracao}, Tempo total acumulado: {tempo_total}")
+        print(f"Atualizacao do modelo na iteracao {count}: {resolvedor.tempo_atualizacao}")
+
+        with registro.fase('separacao'):
+            x = valores_x(modelo, arcos)
+            pool.envelhecer(x)
+            # Componentes sem a raiz com terminal: o complemento dá o corte violado
+            novos = sum(pool.adicionar(S) for S in separador.componentes(x))
+        print(f"Separacao na iteracao {count}: {separador.tempos[-1]:.4f}")
+
+        if not novos or tempo_total >= 1800:
+            break
+
+        count += 1
+
+    # Imprimir as informações solicitadas
+    print("\nResumo da Execucao:")
+    print(f"Valor da funcao objetivo: {modelo.objetivo()}")
+    print(f"Numero de Cortes: {pool.inseridos}")
+    print(f"Iteracoes: {count}")
+    print(f"Iteracoes LP: {iteracoes_lp}")
+    print(f"Cortes LP: {cortes_lp}")
+    print(f"Total Time: {tempo_total}")
+    pool.imprimir()
+    resolvedor.imprimir_tempos()
+    print(f"Tempo de separacao: {separador.tempo:.4f} em {separador.rodadas} rodadas")
+    fases = registro.dados['fases']
+    fases['resolucao'] -= atualizacao
+    fases['atualizacao'] = fases.get('atualizacao', 0.0) + atualizacao
+    # Sem cortes novos a solução inteira não tem subcircuito e é viável; só é ótima se o MIP também terminou. O limite
+    # inferior é o do MIP, que vale para o problema com todos os cortes
+    LB, UB = resolvedor.limites()
+    registro.definir(status='optimal' if not novos and resolvedor.otimo() else 'tempo', LB=LB, UB=UB if not novos else None,
+                     iteracoes=count, cortes=pool.inseridos, iteracoes_lp=iteracoes_lp, cortes_lp=cortes_lp, solver=resolvedor.backend,
+                     tempos_separacao=separador.tempos)
+    if reducao is not None:
+        imprimir_solucao_original(reducao, modelo)
+    return registro
+
+
+if __name__ == '__main__':
+    args = argumentos().parse_args()
+    registro = Registro('PlanosDeCorte', args.registro, args.teste)
+    registro.perfilar(args.perfil)
+
+    # Leitura da entrada
+    with registro.fase('leitura'):
+        inst = ler_instancia()
+    resolver(inst, args, registro)
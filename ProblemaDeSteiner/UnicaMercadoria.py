@@ -1,86 +1,84 @@
-from pyomo.environ import ConcreteModel, Var, Objective, ConstraintList, SolverFactory, Binary, NonNegativeReals, minimize, Constraint
+from pyomo.environ import ConcreteModel, Var, Objective, ConstraintList, Binary, NonNegativeReals, minimize, Constraint
+from instancia import ler_instancia
+import compactas
+from registro import Registro
 
-# Leitura da entrada
-n, m = map(int, input().split())  # Número de vértices e número de arestas
 
-# Dados de entrada
-V = set(range(1, n + 1))  # Conjunto de vértices
-E = set()  # Conjunto de arestas
-d = {}  # Distâncias das arestas
+def construir_modelo(inst, fixados=()):
+    arcos = inst.arcos
+    T_r = inst.T_r  # Conjunto de nós terminais sem a raiz
 
-# Leitura das arestas
-for _ in range(m):
-    v, u, w = map(int, input().split())
-    E.add((v, u))  # Adiciona aresta ao conjunto E
-    d[(v, u)] = w  # Define a distância da aresta
-    E.add((u, v))  # Adiciona a aresta reversa
-    d[(u, v)] = w  # Define a distância da aresta
+    # Criando o modelo
+    modelo = ConcreteModel()
 
-# Leitura do número de nós terminais
-t = int(input())
+    # Variáveis binárias x
+    modelo.x = Var(arcos, within=Binary)
+    x = [modelo.x[a] for a in arcos]
 
-# Conjunto de nós terminais
-T = set(int(input()) for _ in range(t))
+    # Variáveis de fluxo f
+    modelo.f = Var(arcos, within=NonNegativeReals)
+    f = [modelo.f[a] for a in arcos]
+    for a in fixados:
+        x[a].fix(0)  # Arcos eliminados por custo reduzido
+        f[a].fix(0)
 
-print('------------ Leitura completa ------------')
+    # Função objetivo: minimizar a soma das distâncias das arestas em x
+    modelo.objetivo = Objective(expr=inst.custo_fixo + sum(w * x[a] for a, w in enumerate(inst.peso)), sense=minimize)
 
-# Criando o modelo
-modelo = ConcreteModel()
+    # Lista de restrições
+    modelo.restricoes = ConstraintList()
 
-# Variáveis binárias x
-modelo.x = Var(E, within=Binary)
+    def balanco(i):
+        return sum(f[a] for a in inst.arcos_entrada(i)) - sum(f[a] for a in inst.arcos_saida(i))
 
-# Variáveis de fluxo f
-modelo.f = Var(E, within=NonNegativeReals)
+    # Restrições de fluxo para nós terminais
+    for i in T_r:
+        modelo.restricoes.add(balanco(i) == 1)
 
-# Função objetivo: minimizar a soma das distâncias das arestas em x
-modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
+    # Restrições de fluxo para nós não terminais
+    for i in range(inst.n):
+        if not inst.eh_terminal[i]:
+            modelo.restricoes.add(balanco(i) == 0)
 
-# Lista de restrições
-modelo.restricoes = ConstraintList()
+    # Restrições de capacidade de fluxo
+    for a in range(len(arcos)):
+        modelo.restricoes.add(f[a] <= len(T_r) * x[a])
 
-raiz = list(T)[0]  # Nó raiz
-T_r = T - {raiz}  # Conjunto de nós terminais sem a raiz
+    # Restrições de binaridade já estão definidas pelas variáveis binárias
 
-# Restrições de fluxo para nós terminais
-for i in T_r:
-    modelo.restricoes.add(
-        sum(modelo.f[j, i] for j in V if (j, i) in E) - sum(modelo.f[i, j] for j in V if (i, j) in E) == 1
-    )
+    # Restrições de não negatividade já estão definidas pelas variáveis de fluxo
 
-# Restrições de fluxo para nós não terminais
-for i in V - T:
-    modelo.restricoes.add(
-        sum(modelo.f[j, i] for j in V if (j, i) in E) - sum(modelo.f[i, j] for j in V if (i, j) in E) == 0
-    )
+    return modelo
 
-# Restrições de capacidade de fluxo
-for (i, j) in E:
-    modelo.restricoes.add(modelo.f[i, j] <= len(T_r) * modelo.x[i, j])
 
-# Restrições de binaridade já estão definidas pelas variáveis binárias
+def solucao_inicial(modelo, inst, heuristica):
+    """Valores de x e f da árvore heurística (f leva um fluxo por terminal abaixo do arco)."""
+    abaixo = {v: int(inst.eh_terminal[v] and v != inst.raiz) for v in heuristica.pai}
+    for a in reversed(heuristica.arcos):
+        abaixo[inst.cauda[a]] += abaixo[inst.cabeca[a]]
+    na_arvore = set(heuristica.arcos)
+    for a, arco in enumerate(inst.arcos):
+        modelo.x[arco].value = 1 if a in na_arvore else 0
+        modelo.f[arco].value = abaixo[inst.cabeca[a]] if a in na_arvore else 0
 
-# Restrições de não negatividade já estão definidas pelas variáveis de fluxo
 
-# Resolver o modelo
-solver = SolverFactory('glpk')
-solver.options['tmlim'] = 1800
-resultado = solver.solve(modelo, tee=True)
+def argumentos():
+    return compactas.argumentos('Formulação de fluxo de única mercadoria para o problema de Steiner.')
 
-# Imprimir a solução
-print("\nSolucao Otima Encontrada")
 
-# Extraindo informações do resultado
-LB = resultado.problem.lower_bound
-UB = resultado.problem.upper_bound
-relaxacao = modelo.objetivo()
-gap_relaxacao = ((UB - LB) / UB) * 100 if UB != 0 else float('inf')
+def resolver(inst, opcoes=None, registro=None):
+    """Mesmo fluxo do MTZ.py com a formulação de única mercadoria; devolve o Registro."""
+    opcoes = opcoes or argumentos().parse_args([])
+    registro = registro or Registro('UnicaMercadoria')
+    return compactas.resolver('UnicaMercadoria', inst, opcoes, registro, construir_modelo, solucao_inicial)
 
-# Imprimir as informações solicitadas
-print("\nResumo da Execucao:")
-print(f"Valor da funcao objetivo: {modelo.objetivo()}")
-print(f"Melhor Limite Inferior (LB): {LB}")
-print(f"Melhor  Limite Superior (UB): {UB}")
-print(f"Relaxacao (LBR): {relaxacao}")
-print(f"Gap de Relaxacao (%): {gap_relaxacao}")
-print(f'--------------------------------------\n{resultado}')
+
+if __name__ == '__main__':
+    args = argumentos().parse_args()
+    registro = Registro('UnicaMercadoria', args.registro, args.teste)
+    registro.perfilar(args.perfil)
+
+    # Leitura da entrada
+    with registro.fase('leitura'):
+        inst = ler_instancia()
+    resolver(inst, args, registro)
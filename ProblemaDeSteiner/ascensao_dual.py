@@ -0,0 +1,102 @@
+import heapq
+import time
+
+INF = float('inf')
+
+
+class AscensaoDual:
+    """Ascensão dual de Wong sobre a formulação de cortes dirigidos (raiz = T[0]).
+
+    Enquanto algum terminal k não for alcançável a partir da raiz por arcos de
+    custo reduzido zero, toma o conjunto C dos vértices que chegam a k por
+    esses arcos, aumenta a variável dual do corte δ-(C) pelo menor custo
+    reduzido de δ-(C) e desconta esse valor dos arcos do corte. A soma dos
+    aumentos é um limite inferior, obtido sem resolver nenhum PL.
+    """
+
+    def __init__(self, inst):
+        inicio = time.perf_counter()
+        self.inst = inst
+        self.custo_reduzido = list(inst.peso)
+        self.limite = inst.custo_fixo
+        self.cortes = 0
+
+        pendentes = list(inst.T_r)
+        while pendentes:
+            k = pendentes.pop(0)
+            C = self._componente(k)
+            if inst.raiz in C:
+                continue
+            entrada = [a for v in C for a in inst.arcos_entrada(v) if inst.cauda[a] not in C]
+            if not entrada:
+                self.limite = INF  # Terminal inalcançável
+                break
+            delta = min(self.custo_reduzido[a] for a in entrada)
+            for a in entrada:
+                self.custo_reduzido[a] -= delta
+            self.limite += delta
+            self.cortes += 1
+            pendentes.append(k)
+        self.tempo = time.perf_counter() - inicio
+
+    def _componente(self, k):
+        """Vértices que alcançam k usando apenas arcos de custo reduzido zero."""
+        inst = self.inst
+        C = {k}
+        pilha = [k]
+        while pilha:
+            v = pilha.pop()
+            for a in inst.arcos_entrada(v):
+                u = inst.cauda[a]
+                if u not in C and self.custo_reduzido[a] == 0:
+                    C.add(u)
+                    pilha.append(u)
+        return C
+
+    def _dijkstra(self, fontes, arcos_de, extremo):
+        inst = self.inst
+        dist = [INF] * inst.n
+        heap = []
+        for v in fontes:
+            dist[v] = 0
+            heap.append((0, v))
+        heapq.heapify(heap)
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for a in arcos_de(v):
+                u = extremo[a]
+                nd = d + self.custo_reduzido[a]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    heapq.heappush(heap, (nd, u))
+        return dist
+
+    def fixar(self, limite_superior):
+        """Arcos que podem ser fixados em zero por custo reduzido.
+
+        Qualquer arborescência com o arco (i, j) custa pelo menos
+        LB + d(raiz, i) + c(i, j) + d(j, T), com distâncias nos custos
+        reduzidos; se isso passa de limite_superior o arco não está em
+        nenhuma solução tão boa quanto a heurística.
+        """
+        inst = self.inst
+        if self.limite == INF or limite_superior is None:
+            return set()
+        da_raiz = self._dijkstra([inst.raiz], inst.arcos_saida, inst.cabeca)
+        ate_terminal = self._dijkstra(inst.T_r, inst.arcos_entrada, inst.cauda)
+        fixados = set()
+        for a in range(len(inst.peso)):
+            i, j = inst.cauda[a], inst.cabeca[a]
+            if j == inst.raiz or self.limite + da_raiz[i] + self.custo_reduzido[a] + ate_terminal[j] > limite_superior:
+                fixados.add(a)
+        return fixados
+
+    def imprimir(self, fixados=None):
+        print('------------ Ascensao dual ------------')
+        print(f"Limite inferior (ascensao dual): {self.limite}")
+        print(f"Cortes com dual positivo: {self.cortes}")
+        if fixados is not None:
+            print(f"Arcos fixados em zero: {len(fixados)} de {len(self.inst.peso)}")
+        print(f"Tempo da ascensao dual: {self.tempo:.4f}")
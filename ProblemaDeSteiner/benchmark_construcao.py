@@ -0,0 +1,113 @@
+import argparse
+import time
+
+from pyomo.environ import ConcreteModel, Var, Objective, ConstraintList, Binary, NonNegativeReals, NonNegativeIntegers, minimize
+
+import MTZ
+import UnicaMercadoria
+import MultiplaMercadoria
+from geradores import aleatorio_esparso
+from instancia import ler_instancia
+
+
+# Construções antigas, que varrem todos os vértices de V para cada restrição
+def mtz_antigo(V, E, d, T, raiz):
+    n, t = len(V), len(T)
+    modelo = ConcreteModel()
+    modelo.x = Var(E, within=Binary)
+    modelo.u = Var(V, within=NonNegativeIntegers, bounds=(0, n - 1))
+    modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
+    modelo.restricoes = ConstraintList()
+    for k in T:
+        if k != raiz:
+            modelo.restricoes.add(sum(modelo.x[i, k] for i in V if (i, k) in E) >= 1)
+    modelo.restricoes.add(sum(modelo.x[raiz, i] for i in V if (raiz, i) in E) >= 1)
+    for i in V:
+        if i not in T:
+            modelo.restricoes.add(sum(modelo.x[i, j] for j in V if (i, j) in E) <= t * sum(modelo.x[j, i] for j in V if (j, i) in E))
+    modelo.restricoes.add(modelo.u[raiz] == 0)
+    for j in V:
+        if j == raiz:
+            continue
+        for i in V:
+            if (i, j) in E:
+                modelo.restricoes.add(modelo.u[j] >= modelo.u[i] + (n - 1) * modelo.x[i, j] + (n - 3) * modelo.x[j, i] - (n - 2))
+    return modelo
+
+
+def unica_antigo(V, E, d, T, raiz):
+    T_r = T - {raiz}
+    modelo = ConcreteModel()
+    modelo.x = Var(E, within=Binary)
+    modelo.f = Var(E, within=NonNegativeReals)
+    modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
+    modelo.restricoes = ConstraintList()
+    for i in V - {raiz}:
+        modelo.restricoes.add(
+            sum(modelo.f[j, i] for j in V if (j, i) in E) - sum(modelo.f[i, j] for j in V if (i, j) in E) == (1 if i in T_r else 0)
+        )
+    for (i, j) in E:
+        modelo.restricoes.add(modelo.f[i, j] <= len(T_r) * modelo.x[i, j])
+    return modelo
+
+
+def multipla_antigo(V, E, d, T, raiz):
+    T_r = T - {raiz}
+    modelo = ConcreteModel()
+    modelo.x = Var(E, within=Binary)
+    modelo.f = Var(E, T_r, within=NonNegativeReals)
+    modelo.objetivo = Objective(expr=sum(d[i, j] * modelo.x[i, j] for i, j in E), sense=minimize)
+    modelo.restricao_fluxo_mercadoria = ConstraintList()
+    for k in T_r:
+        for i in V:
+            rhs = 1 if i == k else (-1 if i == raiz else 0)
+            modelo.restricao_fluxo_mercadoria.add(
+                sum(modelo.f[j, i, k] for j in V if (j, i) in E) - sum(modelo.f[i, j, k] for j in V if (i, j) in E) == rhs
+            )
+    modelo.restricao_capacidade = ConstraintList()
+    for (i, j) in E:
+        for k in T_r:
+            modelo.restricao_capacidade.add(modelo.f[i, j, k] <= modelo.x[i, j])
+    modelo.restricao_binaridade = ConstraintList()
+    for (i, j) in E:
+        modelo.restricao_binaridade.add(modelo.x[i, j] <= 1)
+    return modelo
+
+
+FORMULACOES = {
+    'MTZ': (mtz_antigo, MTZ.construir_modelo),
+    'UnicaMercadoria': (unica_antigo, UnicaMercadoria.construir_modelo),
+    'MultiplaMercadoria': (multipla_antigo, MultiplaMercadoria.construir_modelo),
+}
+
+
+def cronometrar(construtor, *args):
+    inicio = time.perf_counter()
+    construtor(*args)
+    return time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara o tempo de construção dos modelos (varredura de V x listas de adjacência).')
+    parser.add_argument('--testes', nargs='*', default=['tests/16.txt', 'tests/17.txt', 'tests/18.txt'])
+    parser.add_argument('--tamanhos', nargs='*', type=int, default=[200, 400, 800], help='Número de vértices dos grafos esparsos gerados.')
+    parser.add_argument('--terminais', type=float, default=0.1, help='Fração de vértices terminais nos grafos gerados.')
+    args = parser.parse_args()
+
+    instancias = []
+    for caminho in args.testes:
+        with open(caminho) as arquivo:
+            instancias.append((caminho, ler_instancia(arquivo)))
+    for n in args.tamanhos:
+        instancias.append((f'esparso-{n}', aleatorio_esparso(n, 4, args.terminais, semente=n)))
+
+    print(f"{'instancia':<16}{'n':>7}{'|E|':>7}{'|T|':>6}  {'formulacao':<20}{'antigo (s)':>12}{'adjacencia (s)':>16}{'ganho':>8}")
+    for nome, inst in instancias:
+        V = set(range(inst.n))
+        E = set(inst.arcos)
+        d = inst.distancias()
+        T = set(inst.terminais)
+        for formulacao, (antigo, novo) in FORMULACOES.items():
+            t_antigo = cronometrar(antigo, V, E, d, T, inst.raiz)
+            t_novo = cronometrar(novo, inst)
+            print(f"{nome:<16}{inst.n:>7}{inst.m:>7}{len(T):>6}  {formulacao:<20}{t_antigo:>12.3f}{t_novo:>16.3f}{t_antigo / t_novo:>7.1f}x")
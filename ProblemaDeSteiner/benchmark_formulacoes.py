@@ -0,0 +1,168 @@
+import argparse
+import importlib
+import json
+import os
+import shlex
+import statistics
+import sys
+import time
+
+from instancia import ler_instancia
+from lote import FORMULACOES, saida_para
+from registro import Registro
+
+METRICAS = ['leitura', 'montagem', 'resolucao', 'total']
+
+
+def valores_esperados(caminho='tests/output.txt'):
+    """Ótimo de cada teste: a linha i de output.txt corresponde a tests/i.txt."""
+    with open(caminho) as arquivo:
+        return {str(i): float(linha) for i, linha in enumerate(arquivo.read().split(), start=1)}
+
+
+def medir(modulo, formulacao, caminho, opcoes):
+    """Uma execução em processo, com a saída descartada; devolve os tempos por fase, nós, cortes e o valor."""
+    registro = Registro(formulacao)
+    inicio = time.perf_counter()
+    with open(os.devnull, 'w') as nulo, saida_para(nulo):
+        with registro.fase('leitura'):
+            with open(caminho) as entrada:
+                inst = ler_instancia(entrada)
+        modulo.resolver(inst, opcoes, registro)
+    # Tempo de parede: a soma das fases contaria duas vezes as que se sobrepõem (resolucao do PlanosDeCorte)
+    total = time.perf_counter() - inicio
+    dados = registro.dados
+    fases = dados['fases']
+    return {
+        'leitura': fases.get('leitura', 0.0),
+        'montagem': fases.get('montagem', 0.0) + fases.get('escrita', 0.0),
+        'resolucao': fases.get('resolucao', 0.0),
+        'total': total,
+        'nos': dados.get('nos'),
+        'cortes': dados.get('cortes'),
+        'valor': dados.get('UB'),
+        'status': dados.get('status'),
+    }
+
+
+def executar(formulacoes, testes, repeticoes, extras):
+    """{'<formulação>/<teste>': {métrica: [amostras]}}; a primeira repetição aquece imports e caches."""
+    resultados = {}
+    for formulacao in formulacoes:
+        modulo = importlib.import_module(formulacao)
+        # Opções que a formulação não conhece (por exemplo --montagem no PlanosDeCorte) são ignoradas
+        opcoes, _ = modulo.argumentos().parse_known_args(extras)
+        for caminho in testes:
+            teste = os.path.splitext(os.path.basename(caminho))[0]
+            amostras = {}
+            try:
+                for _ in range(repeticoes + 1):
+                    medida = medir(modulo, formulacao, caminho, opcoes)
+                    for chave, valor in medida.items():
+                        amostras.setdefault(chave, []).append(valor)
+            except Exception as e:
+                # Falha conta como resposta errada; os tempos dessa execução não entram na comparação
+                resultados[f'{formulacao}/{teste}'] = {'erro': f'{type(e).__name__}: {e}'}
+                print(f"{formulacao:<20}{teste:>6}  erro: {e}", file=sys.stderr)
+                continue
+            for metrica in METRICAS:
+                amostras[metrica] = amostras[metrica][1:]
+            resultados[f'{formulacao}/{teste}'] = amostras
+            print(f"{formulacao:<20}{teste:>6}  total {statistics.mean(amostras['total']):8.3f}s  "
+                  f"resolucao {statistics.mean(amostras['resolucao']):8.3f}s  valor {amostras['valor'][-1]}", file=sys.stderr)
+    return resultados
+
+
+def conferir(resultados, esperados, tolerancia=1e-6):
+    """Execuções cujo valor final difere do ótimo conhecido."""
+    erradas = []
+    for chave, amostras in resultados.items():
+        teste = chave.split('/')[1]
+        if 'erro' in amostras:
+            erradas.append((chave, amostras['erro'], esperados.get(teste)))
+            continue
+        if teste not in esperados:
+            continue
+        for valor in amostras['valor']:
+            if valor is None or abs(valor - esperados[teste]) > tolerancia:
+                erradas.append((chave, valor, esperados[teste]))
+                break
+    return erradas
+
+
+def comparar(base, atual, alfa=0.05, limiar=0.10, minimo=0.01):
+    """Pioras de tempo estatisticamente significativas (teste t de Welch, unilateral) acima do limiar relativo.
+
+    Diferenças abaixo de `minimo` segundos são ruído de medição e não contam.
+    Só esta comparação usa o SciPy; sem ele, as execuções sem base rodam normalmente.
+    """
+    try:
+        from scipy import stats
+    except ImportError:
+        raise SystemExit("scipy nao instalado (necessario para comparar com a base): pip install scipy")
+    pioras = []
+    for chave, amostras in atual.items():
+        if chave not in base or 'erro' in amostras or 'erro' in base[chave]:
+            continue
+        for metrica in METRICAS:
+            antes, depois = base[chave][metrica], amostras[metrica]
+            if len(antes) < 2 or len(depois) < 2:
+                continue
+            media_antes, media_depois = statistics.mean(antes), statistics.mean(depois)
+            if media_depois <= media_antes * (1 + limiar) or media_depois - media_antes < minimo:
+                continue
+            p = stats.ttest_ind(depois, antes, equal_var=False, alternative='greater').pvalue
+            if p < alfa:
+                pioras.append((chave, metrica, media_antes, media_depois, p))
+    return pioras
+
+
+def imprimir(resultados):
+    print(f"{'execucao':<28}" + ''.join(f"{m + ' (s)':>22}" for m in METRICAS) + f"{'nos':>10}{'cortes':>10}")
+    for chave, amostras in resultados.items():
+        if 'erro' in amostras:
+            print(f"{chave:<28}erro: {amostras['erro']}")
+            continue
+        colunas = ''
+        for metrica in METRICAS:
+            valores = amostras[metrica]
+            desvio = statistics.stdev(valores) if len(valores) > 1 else 0.0
+            colunas += f"{statistics.mean(valores):>13.4f} ± {desvio:<6.4f}"
+        print(f"{chave:<28}{colunas}{str(amostras['nos'][-1]):>10}{str(amostras['cortes'][-1]):>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark das formulações: tempos por fase, nós, cortes, conferência com tests/output.txt e comparação com uma base.')
+    parser.add_argument('--formulacoes', nargs='*', default=FORMULACOES, choices=FORMULACOES)
+    parser.add_argument('--testes', nargs='*', default=[f'tests/{i}.txt' for i in range(1, 19)])
+    parser.add_argument('--repeticoes', type=int, default=5, help='Repetições medidas por par (após uma de aquecimento).')
+    parser.add_argument('--opcoes', default='', help='Opções repassadas às formulações, por exemplo "--montagem matriz".')
+    parser.add_argument('--esperados', default='tests/output.txt')
+    parser.add_argument('--base', default='benchmark_base.json', help='Arquivo com as amostras de referência.')
+    parser.add_argument('--salvar-base', action='store_true', help='Grava esta execução como nova referência.')
+    parser.add_argument('--alfa', type=float, default=0.05, help='Nível de significância do teste de piora.')
+    parser.add_argument('--limiar', type=float, default=0.10, help='Piora relativa mínima para ser reportada.')
+    parser.add_argument('--minimo', type=float, default=0.01, help='Piora absoluta mínima (s) para ser reportada.')
+    args = parser.parse_args()
+
+    resultados = executar(args.formulacoes, args.testes, args.repeticoes, shlex.split(args.opcoes))
+    imprimir(resultados)
+
+    erradas = conferir(resultados, valores_esperados(args.esperados))
+    for chave, valor, esperado in erradas:
+        print(f"RESPOSTA ERRADA: {chave} obteve {valor}, esperado {esperado}")
+
+    pioras = []
+    if os.path.isfile(args.base) and not args.salvar_base:
+        with open(args.base) as arquivo:
+            pioras = comparar(json.load(arquivo), resultados, args.alfa, args.limiar, args.minimo)
+        for chave, metrica, antes, depois, p in pioras:
+            print(f"PIORA: {chave} {metrica} {antes:.4f}s -> {depois:.4f}s (+{(depois / antes - 1) * 100:.0f}%, p = {p:.3g})")
+        if not pioras:
+            print(f"Sem pioras significativas em relacao a {args.base}")
+    if args.salvar_base:
+        with open(args.base, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=1)
+        print(f"Base gravada em {args.base}")
+
+    sys.exit(1 if erradas or pioras else 0)
@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+
+from pyomo.environ import SolverFactory
+
+import MTZ
+import UnicaMercadoria
+import MultiplaMercadoria
+import matriz
+from geradores import aleatorio_esparso
+from instancia import ler_instancia
+
+FORMULACOES = {
+    'MTZ': MTZ.construir_modelo,
+    'UnicaMercadoria': UnicaMercadoria.construir_modelo,
+    'MultiplaMercadoria': MultiplaMercadoria.construir_modelo,
+}
+
+
+def pyomo(formulacao, inst, pasta):
+    """Construção por ConstraintList e escrita do LP pelo Pyomo."""
+    inicio = time.perf_counter()
+    modelo = FORMULACOES[formulacao](inst)
+    montagem = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    modelo.write(os.path.join(pasta, f'{formulacao}.lp'), io_options={'symbolic_solver_labels': False})
+    return modelo, montagem, time.perf_counter() - inicio
+
+
+def matricial(formulacao, inst, pasta):
+    """Montagem em COO com NumPy e escrita do MPS em bloco."""
+    inicio = time.perf_counter()
+    modelo = matriz.FORMULACOES[formulacao](inst)
+    montagem = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    modelo.escrever_mps(os.path.join(pasta, f'{formulacao}.mps'))
+    return modelo, montagem, time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara montagem + escrita do modelo pelo Pyomo e pela montagem matricial.')
+    parser.add_argument('--testes', nargs='*', default=['tests/16.txt', 'tests/17.txt', 'tests/18.txt'])
+    parser.add_argument('--tamanhos', nargs='*', type=int, default=[500, 2000, 8000], help='Número de vértices dos grafos esparsos gerados.')
+    parser.add_argument('--terminais', type=float, default=0.05, help='Fração de vértices terminais nos grafos gerados.')
+    parser.add_argument('--formulacoes', nargs='*', default=list(FORMULACOES), choices=list(FORMULACOES))
+    parser.add_argument('--resolver', action='store_true', help='Resolve os dois modelos e confere se o valor ótimo é o mesmo.')
+    args = parser.parse_args()
+
+    instancias = []
+    for caminho in args.testes:
+        with open(caminho) as arquivo:
+            instancias.append((caminho, ler_instancia(arquivo)))
+    for n in args.tamanhos:
+        instancias.append((f'esparso-{n}', aleatorio_esparso(n, 4, args.terminais, semente=n)))
+
+    print(f"{'instancia':<16}{'n':>7}{'|E|':>7}{'|T|':>6}  {'formulacao':<20}{'pyomo (s)':>11}{'matriz (s)':>12}{'ganho':>8}{'nnz':>10}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, inst in instancias:
+            for formulacao in args.formulacoes:
+                modelo_pyomo, montagem_p, escrita_p = pyomo(formulacao, inst, pasta)
+                modelo_matriz, montagem_m, escrita_m = matricial(formulacao, inst, pasta)
+                t_pyomo, t_matriz = montagem_p + escrita_p, montagem_m + escrita_m
+                print(f"{nome:<16}{inst.n:>7}{inst.m:>7}{len(inst.terminais):>6}  {formulacao:<20}"
+                      f"{t_pyomo:>11.3f}{t_matriz:>12.3f}{t_pyomo / t_matriz:>7.1f}x{modelo_matriz.nnz():>10}")
+                if args.resolver:
+                    SolverFactory('glpk').solve(modelo_pyomo)
+                    solucao = modelo_matriz.resolver(tee=False)
+                    iguais = solucao.valor is not None and abs(modelo_pyomo.objetivo() - solucao.valor) < 1e-6
+                    print(f"    otimo pyomo: {modelo_pyomo.objetivo()} | otimo matriz: {solucao.valor}"
+                          f" ({solucao.solver}) {'ok' if iguais else 'DIFERENTE'}")
@@ -0,0 +1,115 @@
+import os
+import time
+
+from pyomo.environ import Var, ConcreteModel, Objective, ConstraintList, Constraint, Boolean, UnitInterval, minimize
+from separacao import Separador, processos_padrao
+from pool_cortes import PoolDeCortes
+from resolvedor import Resolvedor
+
+
+def construir_mestre(inst, fixados=(), limite_superior=None):
+    """Problema mestre: só as variáveis x, com os cortes x(δ-(k)) >= 1 de cada terminal."""
+    arcos = inst.arcos
+    modelo = ConcreteModel()
+    modelo.x = Var(arcos, within=Boolean)
+    for a in fixados:
+        modelo.x[arcos[a]].fix(0)  # Arcos eliminados por custo reduzido
+    modelo.objetivo = Objective(expr=inst.custo_fixo + sum(w * modelo.x[arco] for arco, w in zip(arcos, inst.peso)), sense=minimize)
+    modelo.restricoes = ConstraintList()
+    for k in inst.T_r:
+        modelo.restricoes.add(sum(modelo.x[arcos[a]] for a in inst.arcos_entrada(k)) >= 1)
+    if limite_superior is not None:
+        # Limite superior da heurística como corte no objetivo
+        modelo.limite_heuristica = Constraint(expr=modelo.objetivo.expr <= limite_superior)
+    return modelo
+
+
+def _iterar(modelo, inst, resolvedor, pool, subproblemas, prazo, registro, rotulo, centro=None, alfa=0.5):
+    """Resolve o mestre e acrescenta os cortes dos subproblemas até nenhum terminal ser violado.
+
+    Com um centro (ponto viável de todos os cortes), a separação é estabilizada
+    (in-out): separa primeiro no ponto entre o centro e x. Um corte violado ali
+    também é violado por x; se nenhum for, o ponto passa a ser o centro e a
+    separação é feita no próprio x. Isso evita o vaivém das soluções do
+    mestre que faz o limite subir devagar.
+    """
+    arcos = inst.arcos
+    iteracoes = cortes = 0
+    while True:
+        with registro.fase('resolucao'):
+            # Cada mestre só tem o que resta do prazo; com o limite cheio, um MIP tardio passaria do dobro
+            resolvedor.resolver(tee=False, tmlim=prazo - time.perf_counter())
+        iteracoes += 1
+        x = [modelo.x[a].value or 0.0 for a in arcos]
+        with registro.fase('separacao'):
+            pool.envelhecer(x)
+            violados = []
+            if centro is not None:
+                ponto = [alfa * c + (1 - alfa) * v for c, v in zip(centro, x)]
+                violados = subproblemas.fracionario(ponto)
+                if not violados:
+                    centro = ponto
+            if not violados:
+                violados = subproblemas.fracionario(x)
+            novos = sum(pool.adicionar(S) for S in violados)
+        cortes += novos
+        print(f"Benders {rotulo} {iteracoes}: limite {modelo.objetivo()}, cortes violados {len(violados)}, "
+              f"resolucao {resolvedor.tempo_resolucao:.4f}, subproblemas {subproblemas.tempo:.4f}")
+        if not violados:
+            return iteracoes, cortes, True
+        if time.perf_counter() >= prazo:
+            return iteracoes, cortes, False
+
+
+def processos_benders():
+    """Processos dos subproblemas quando não informados: os núcleos disponíveis numa execução avulsa.
+
+    Os executores em lote definem OMP_NUM_THREADS de cada job; com ela, vale o
+    padrão do Separador, que não multiplica os jobs.
+    """
+    if os.environ.get('OMP_NUM_THREADS'):
+        return processos_padrao()
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+
+def resolver_benders(inst, registro, fixados=(), heuristica=None, solver='highs', processos=None, aninhados=5, tmlim=1800):
+    """Decomposição de Benders: relaxação linear (limite da múltiplas mercadorias) e depois o mestre inteiro.
+
+    Para x fixo, o fluxo da mercadoria k só precisa existir; não tem custo. O
+    subproblema de cada terminal é então de viabilidade e equivale a um fluxo
+    máximo raiz-k com capacidades x: se o valor for menor que 1, o corte mínimo
+    dá o corte de viabilidade x(δ+(S)) >= 1. Não há cortes de otimalidade. Os
+    subproblemas rodam em paralelo no Separador; sem processos, usam os
+    núcleos disponíveis, ou OMP_NUM_THREADS nos executores em lote.
+
+    Devolve o modelo mestre resolvido; limites, cortes e iterações vão para o registro.
+    """
+    prazo = time.perf_counter() + tmlim
+    with registro.fase('montagem'):
+        modelo = construir_mestre(inst, fixados, heuristica.valor if heuristica else None)
+    resolvedor = Resolvedor(modelo, backend=solver, tmlim=tmlim)
+    pool = PoolDeCortes(modelo, inst, idade_max=0, resolvedor=resolvedor)
+    subproblemas = Separador(inst, processos or processos_benders(), aninhados)
+    try:
+        # Relaxação linear: com todos os cortes de viabilidade, o limite é o da formulação de múltiplas mercadorias
+        for a in inst.arcos:
+            modelo.x[a].domain = UnitInterval
+        # Centro da estabilização: todos os arcos não fixados (viável, pois contém uma árvore ótima)
+        centro = [0.0 if a in fixados else 1.0 for a in range(len(inst.arcos))]
+        iteracoes_lp, cortes_lp, convergiu = _iterar(modelo, inst, resolvedor, pool, subproblemas, prazo, registro, 'LP', centro)
+        # Sem convergir, o valor é só o de um mestre parcial, não o limite da formulação
+        relaxacao = modelo.objetivo() if convergiu else None
+        for a in inst.arcos:
+            modelo.x[a].domain = Boolean
+
+        iteracoes, cortes, otimo = _iterar(modelo, inst, resolvedor, pool, subproblemas, prazo, registro, 'MIP')
+    finally:
+        subproblemas.fechar()
+
+    LB, UB = resolvedor.limites()
+    registro.definir(status='optimal' if otimo and resolvedor.otimo() else 'tempo', LB=LB, UB=modelo.objetivo() if otimo else None,
+                     LBR=relaxacao, iteracoes_lp=iteracoes_lp, cortes_lp=cortes_lp, iteracoes=iteracoes, cortes=pool.inseridos,
+                     processos=subproblemas.processos, tempo_subproblemas=subproblemas.tempo, solver=resolvedor.backend)
+    resolvedor.imprimir_tempos()
+    print(f"Subproblemas: {subproblemas.rodadas} rodadas em {subproblemas.processos} processos, {subproblemas.tempo:.4f} s")
+    return modelo
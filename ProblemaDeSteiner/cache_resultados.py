@@ -0,0 +1,109 @@
+# Contraparte de TrabalhoFinal/utils/result_cache.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+_IMPORT = re.compile(r'^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))', re.M)
+
+
+def versao_fonte(script):
+    """Hash do código do script e dos módulos locais que ele importa (recursivamente).
+
+    Mudar a formulação, as reduções ou o resolvedor muda a versão; mudar
+    bibliotecas instaladas (Pyomo, NumPy) não.
+    """
+    diretorio = os.path.dirname(os.path.abspath(script))
+    pendentes, vistos = [os.path.abspath(script)], set()
+    soma = hashlib.sha256()
+    while pendentes:
+        caminho = pendentes.pop()
+        if caminho in vistos:
+            continue
+        vistos.add(caminho)
+        with open(caminho, 'rb') as arquivo:
+            codigo = arquivo.read()
+        soma.update(os.path.relpath(caminho, diretorio).encode() + b'\0' + codigo)
+        for de, importado in _IMPORT.findall(codigo.decode(errors='ignore')):
+            local = os.path.join(diretorio, *(de or importado).split('.')) + '.py'
+            if os.path.isfile(local):
+                pendentes.append(local)
+    return soma.hexdigest()[:16]
+
+
+def chave_cache(*partes):
+    """Chave de conteúdo: hash das partes (instância, versão do código, opções) em JSON canônico."""
+    return hashlib.sha256(json.dumps(partes, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+class CacheResultados:
+    """Cache de resultados em disco endereçado por conteúdo, com descarte LRU por tamanho.
+
+    Cada entrada é um diretório <chave>/ com entrada.json (o resultado) e os
+    arquivos produzidos pela execução (log, registro). Uma consulta bem
+    sucedida atualiza o mtime do diretório; ao passar do limite, as entradas
+    usadas há mais tempo são apagadas primeiro.
+    """
+
+    def __init__(self, diretorio='cache', limite_mb=1024):
+        self.diretorio = diretorio
+        self.limite = limite_mb * 1024 * 1024
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _entrada(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def obter(self, chave):
+        """Resultado guardado para a chave, ou None."""
+        caminho = os.path.join(self._entrada(chave), 'entrada.json')
+        try:
+            with open(caminho) as arquivo:
+                entrada = json.load(arquivo)
+        except (OSError, json.JSONDecodeError):
+            return None
+        os.utime(self._entrada(chave))
+        return entrada
+
+    def restaurar(self, chave, nome, destino):
+        """Copia um arquivo guardado na entrada para o destino; falso se ele não existir."""
+        origem = os.path.join(self._entrada(chave), nome)
+        if not os.path.isfile(origem):
+            return False
+        shutil.copyfile(origem, destino)
+        return True
+
+    def ler(self, chave, nome):
+        with open(os.path.join(self._entrada(chave), nome)) as arquivo:
+            return arquivo.read()
+
+    def guardar(self, chave, entrada, arquivos=()):
+        """Guarda o resultado e cópias dos arquivos (pelo nome base); a entrada só aparece completa."""
+        temporario = tempfile.mkdtemp(dir=self.diretorio, prefix='.tmp-')
+        for caminho in arquivos:
+            if os.path.isfile(caminho):
+                shutil.copyfile(caminho, os.path.join(temporario, os.path.basename(caminho)))
+        with open(os.path.join(temporario, 'entrada.json'), 'w') as arquivo:
+            json.dump(entrada, arquivo, indent=1, default=str)
+        destino = self._entrada(chave)
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporario, destino)
+        self.podar()
+
+    def podar(self):
+        """Apaga as entradas menos recentemente usadas até o cache caber no limite."""
+        entradas, total = [], 0
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            if nome.startswith('.') or not os.path.isdir(caminho):
+                continue
+            tamanho = sum(e.stat().st_size for e in os.scandir(caminho) if e.is_file())
+            entradas.append((os.stat(caminho).st_mtime, tamanho, caminho))
+            total += tamanho
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite:
+                break
+            shutil.rmtree(caminho, ignore_errors=True)
+            total -= tamanho
@@ -0,0 +1,150 @@
+import argparse
+from types import SimpleNamespace
+
+from pyomo.environ import SolverFactory
+from reducoes import reduzir, imprimir_solucao_reduzida, imprimir_solucao_original, imprimir_arvore_original
+from heuristicas import SolucaoHeuristica, executar_heuristica
+from resolvedor import resolver_com_solucao_inicial
+from ascensao_dual import AscensaoDual
+from matriz import resolver_matricial, imprimir_resumo, registrar
+from registro import numero_de_nos, relaxacao_linear, imprimir_relaxacao
+
+
+def argumentos(descricao):
+    """Opções comuns às formulações compactas; cada script acrescenta as suas."""
+    parser = argparse.ArgumentParser(description=descricao)
+    parser.add_argument('--sem-reducao', action='store_true', help='Não aplica os testes de redução antes de montar o modelo.')
+    parser.add_argument('--sem-heuristica', action='store_true', help='Não usa a solução heurística como solução inicial.')
+    parser.add_argument('--sem-ascensao-dual', action='store_true', help='Não fixa arcos por custo reduzido da ascensão dual.')
+    parser.add_argument('--heuristic-only', action='store_true', help='Executa apenas as heurísticas, sem montar o modelo (grafos grandes).')
+    parser.add_argument('--montagem', choices=['pyomo', 'matriz'], default='pyomo',
+                        help='Monta o modelo pelo Pyomo ou direto em matriz esparsa (NumPy), escrita em MPS ou entregue ao HiGHS.')
+    parser.add_argument('--sem-relaxacao', action='store_true', help='Não resolve a relaxação linear da formulação (LBR).')
+    parser.add_argument('--registro', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução.')
+    parser.add_argument('--teste', default=None, help='Nome do teste gravado no registro.')
+    parser.add_argument('--perfil', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
+    return parser
+
+
+def preparar(inst, opcoes, registro):
+    """Redução, heurística e ascensão dual antes de montar o modelo.
+
+    Devolve (inst, reducao, heuristica, dual, fixados), ou None se a redução
+    resolveu a instância ou só a heurística foi pedida (o registro já está preenchido).
+    """
+    registro.instancia(inst)
+
+    print('------------ Leitura completa ------------')
+
+    # Reduções do grafo antes de montar o modelo
+    reducao = None
+    if not opcoes.sem_reducao:
+        with registro.fase('reducao'):
+            reducao = reduzir(inst)
+        inst = reducao.instancia
+        if reducao.resolvida:
+            imprimir_solucao_reduzida(reducao)
+            registro.definir(status='reducao', LB=reducao.custo_fixo, UB=reducao.custo_fixo, LBR=reducao.custo_fixo, nos=0)
+            return None
+
+    if opcoes.heuristic_only:
+        with registro.fase('heuristica'):
+            solucao = executar_heuristica(inst, reducao)
+        registro.definir(status='heuristica', UB=solucao.valor)
+        return None
+
+    # Solução heurística (limite superior e solução inicial)
+    heuristica = None
+    if not opcoes.sem_heuristica:
+        with registro.fase('heuristica'):
+            heuristica = SolucaoHeuristica(inst)
+        heuristica.imprimir()
+        registro.definir(heuristica=heuristica.valor)
+
+    # Ascensão dual: limite inferior e fixação de arcos por custo reduzido
+    dual, fixados = None, set()
+    if not opcoes.sem_ascensao_dual:
+        with registro.fase('ascensao_dual'):
+            dual = AscensaoDual(inst)
+            fixados = dual.fixar(heuristica.valor if heuristica else None)
+        dual.imprimir(fixados)
+        registro.definir(limite_dual=dual.limite, fixados=len(fixados))
+
+    return SimpleNamespace(inst=inst, reducao=reducao, heuristica=heuristica, dual=dual, fixados=fixados)
+
+
+def resolver_matriz(formulacao, preparo, opcoes, registro):
+    """Montagem matricial: sem construção de expressões do Pyomo."""
+    solucao, arcos, tempo_montagem = resolver_matricial(formulacao, preparo.inst, preparo.fixados, preparo.heuristica,
+                                                        relaxacao=not opcoes.sem_relaxacao)
+    registrar(registro, solucao, tempo_montagem)
+    print("\nSolucao Otima Encontrada")
+    imprimir_resumo(solucao, tempo_montagem, preparo.dual, preparo.fixados)
+    if preparo.reducao is not None:
+        imprimir_arvore_original(preparo.reducao, arcos)
+
+
+def resolver_glpk(modelo, heuristica, registro, tmlim=1800, opcoes_glpk=None):
+    """Resolve com o GLPK a partir da solução heurística, na fase 'resolucao' do registro."""
+    solver = SolverFactory('glpk')
+    solver.options['tmlim'] = tmlim
+    for chave, valor in (opcoes_glpk or {}).items():
+        solver.options[chave] = valor
+    with registro.fase('resolucao'):
+        resultado = resolver_com_solucao_inicial(solver, modelo, heuristica.valor if heuristica else None)
+    registro.descontar_solver('resolucao', resultado)
+    return resultado
+
+
+def resumo(modelo, resultado, preparo, opcoes, registro, modelo_lp=None):
+    """Registra e imprime limites, relaxação e gap da resolução pelo Pyomo.
+
+    O LBR é resolvido sobre modelo_lp, se dado (formulação completa quando o modelo resolvido é parcial).
+    """
+    # Imprimir a solução
+    print("\nSolucao Otima Encontrada")
+
+    # Extraindo informações do resultado
+    LB = resultado.problem.lower_bound
+    UB = resultado.problem.upper_bound
+    if not opcoes.sem_relaxacao:
+        with registro.fase('relaxacao'):
+            registro.definir(LBR=relaxacao_linear(modelo_lp or modelo))
+    registro.definir(status=str(resultado.solver.termination_condition), LB=LB, UB=UB, nos=numero_de_nos(resultado))
+
+    # Imprimir as informações solicitadas
+    print("\nResumo da Execucao:")
+    print(f"Valor da funcao objetivo: {modelo.objetivo()}")
+    print(f"Melhor Limite Inferior (LB): {LB}")
+    print(f"Melhor  Limite Superior (UB): {UB}")
+    imprimir_relaxacao(UB, registro.dados.get('LBR'))
+    if preparo.dual is not None:
+        print(f"Limite dual (ascensao dual): {preparo.dual.limite}")
+        print(f"Arcos fixados por custo reduzido: {len(preparo.fixados)}")
+
+
+def resolver(formulacao, inst, opcoes, registro, construir_modelo, solucao_inicial, tmlim=1800):
+    """Redução, heurística, ascensão dual, modelo e resumo de uma formulação compacta; devolve o Registro.
+
+    construir_modelo(inst, fixados) monta o modelo no Pyomo e
+    solucao_inicial(modelo, inst, heuristica) carrega nele a árvore heurística.
+    """
+    preparo = preparar(inst, opcoes, registro)
+    if preparo is None:
+        return registro
+    if opcoes.montagem == 'matriz':
+        resolver_matriz(formulacao, preparo, opcoes, registro)
+        return registro
+
+    inst, heuristica = preparo.inst, preparo.heuristica
+    with registro.fase('montagem'):
+        modelo = construir_modelo(inst, preparo.fixados)
+        if heuristica is not None and heuristica.arestas is not None:
+            solucao_inicial(modelo, inst, heuristica)
+
+    resultado = resolver_glpk(modelo, heuristica, registro, tmlim)
+    resumo(modelo, resultado, preparo, opcoes, registro)
+    if preparo.reducao is not None:
+        imprimir_solucao_original(preparo.reducao, modelo)
+    print(f'--------------------------------------\n{resultado}')
+    return registro
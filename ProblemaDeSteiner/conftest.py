@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from instancia import ler_instancia
+
+TESTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests')
+
+with open(os.path.join(TESTES, 'output.txt')) as arquivo:
+    OTIMOS = [int(linha) for linha in arquivo if linha.strip()]  # Ótimo do teste i na linha i
+
+
+def _ler_teste(teste):
+    with open(os.path.join(TESTES, f'{teste}.txt')) as arquivo:
+        return ler_instancia(arquivo), OTIMOS[int(teste) - 1]
+
+
+@pytest.fixture
+def ler_teste():
+    """Função que devolve (instância, valor ótimo) do teste tests/<teste>.txt."""
+    return _ler_teste
+
+
+@pytest.fixture(params=range(1, len(OTIMOS) + 1), ids=lambda i: f'teste{i}')
+def caso(request):
+    """(instância, valor ótimo) de cada teste em tests/1..18.txt."""
+    return _ler_teste(request.param)
@@ -1,82 +1,38 @@
-import re
+import argparse
 import csv
-import os
 
+from registro import ultimos_registros
 
-# Função para extrair informações do conteúdo do arquivo
-def extract_info(content):
-    # Regex para capturar LB e UB
-    lb_pattern = re.compile(r'>=\s*(\d+\.\d+e[+-]\d{2})')
-    ub_pattern = re.compile(r'Valor da funcao objetivo:\s*(-?\w+)')
-    # Regex para capturar o tempo de execução
-    time_pattern = re.compile(r'Time:\s+([\d\.]+)')
-    # Regex para capturar o número de nós
-    nodes_pattern = re.compile(r'% \(\d+;\s*(\d+)\)')
-    # Regex para capturar o valor da relaxação linear
-    lbr_pattern = re.compile(r'obj\s*=\s*([\d.]+e[\+\-]?\d+)\s*.*?', re.DOTALL)
-
-    lb, ub, execution_time, nodes, lbr = None, None, None, None, None
-
-
-    ub_match = ub_pattern.search(content)
-    if ub_match:
-        ub = ub_match.group(1)
-
-    lb_match = lb_pattern.findall(content)
-    if lb_match:
-        match = lb_match[-1]
-        if match == 'tree':
-            lb = ub
-        else:
-            lb = float(match)
-
-    time_match = time_pattern.search(content)
-    if time_match:
-        execution_time = time_match.group(1)
-
-    nodes_match = nodes_pattern.findall(content)
-    if nodes_match:
-        nodes = nodes_match[-1]       
-
-    lbr_match = lbr_pattern.findall(content)
-    if lbr_match:
-        print(lbr_match)
-        lbr = lbr_match[-1]
-
-    return lb, ub, execution_time, nodes, float(lbr)
 
 # Função para calcular o gap de relaxação linear
 def calculate_gap(ub, lbr):
+    if ub is None or not lbr:
+        return None
     return (float(ub) - float(lbr)) / float(lbr) * 100
 
 
-# Lista de arquivos de saída
-log_dir = './logs/'
-file_list = [os.path.join(log_dir, f) for f in os.listdir(log_dir) if os.path.isfile(os.path.join(log_dir, f))]
-
-# Nome do arquivo CSV de saída
-output_csv = 'compacts.csv'
+def escrever_csv(registros, saida):
+    """Uma linha por formulação compacta e teste (o último registro de cada) a partir do JSON Lines."""
+    # Campos do CSV
+    fields = ['formulation', 'test', 'LB', 'UB', 'relaxation (LBR)', 'relaxation gap (%)', 'runtime (s)', 'number of nodes']
 
-# Campos do CSV
-fields = ['formulation', 'test', 'LB', 'UB', 'relaxation (LBR)', 'relaxation gap (%)', 'runtime (s)', 'number of nodes']
+    # Abrindo o arquivo CSV para escrita
+    with open(saida, mode='w', newline='') as csv_file:
+        writer = csv.writer(csv_file, delimiter=';')
+        writer.writerow(fields)  # Escrevendo o cabeçalho
 
-# Abrindo o arquivo CSV para escrita
-with open(output_csv, mode='w', newline='') as csv_file:
-    writer = csv.writer(csv_file, delimiter = ';')
-    writer.writerow(fields)  # Escrevendo o cabeçalho
+        # Processando cada registro (último de cada formulação/teste)
+        for registro in ultimos_registros(registros, lambda r: r['formulacao'] != 'PlanosDeCorte'):
+            gap = calculate_gap(registro.get('UB'), registro.get('LBR'))
+            writer.writerow([registro['formulacao'], registro.get('teste'), registro.get('LB'), registro.get('UB'), registro.get('LBR'),
+                             f"{gap:.2f}%" if gap is not None else None, registro['fases'].get('resolucao'), registro.get('nos')])
 
-    # Processando cada arquivo
-    for file_name in file_list:
-        if 'PlanosDeCorte' in file_name:
-            continue
-        with open(file_name, 'r') as file:
-            print(file_name)
-            content = file.read()
-            lb, ub, execution_time, nodes, lbr = extract_info(content)
-            gap = calculate_gap(ub, lbr)
 
-            formulation, test = file_name.split('./logs/')[1].split('_')
-            teste = test.split('.txt')[0]
-            writer.writerow([formulation, test, lb, ub, lbr, f"{gap:.2f}%" if gap is not None else None, execution_time, nodes])
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera compacts.csv a partir dos registros das formulações compactas (sem ler os logs).')
+    parser.add_argument('registros', nargs='?', default='resultados.jsonl')
+    parser.add_argument('--saida', default='compacts.csv')
+    args = parser.parse_args()
 
-print(f"Informações extraídas e registradas em {output_csv}.")
+    escrever_csv(args.registros, args.saida)
+    print(f"Informações extraídas e registradas em {args.saida}.")
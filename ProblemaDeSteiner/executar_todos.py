@@ -1,44 +1,191 @@
-import subprocess
+import argparse
+import json
 import os
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache_resultados import CacheResultados, chave_cache, versao_fonte
+from instancia import ler_instancia
+from registro import acrescentar, hash_instancia
+
+
+def nome_log(log_dir, script, input_file):
+    # Nome do arquivo de log baseado no nome do script e do input
+    return os.path.join(log_dir, f"{os.path.splitext(os.path.basename(script))[0]}_{os.path.splitext(os.path.basename(input_file))[0]}.txt")
+
+
+def carregar_manifesto(caminho):
+    if os.path.isfile(caminho):
+        with open(caminho) as arquivo:
+            return json.load(arquivo)
+    return {}
+
+
+def salvar_manifesto(caminho, manifesto):
+    # Escreve em arquivo temporário e troca, para o manifesto nunca ficar pela metade
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def limitar_memoria(pid, megabytes):
+    """Limita o espaço de endereçamento do processo filho já criado (o glpsol herda o limite).
+
+    Usa prlimit logo após o Popen, e não preexec_fn: os jobs são lançados de
+    threads do ThreadPoolExecutor, e preexec_fn não é seguro com threads (o
+    filho pode travar antes do exec).
+    """
+    if megabytes:
+        limite = megabytes * 1024 * 1024
+        try:
+            resource.prlimit(pid, resource.RLIMIT_AS, (limite, limite))
+        except ProcessLookupError:
+            pass  # O processo já terminou
+
+
+def executar_job(script, input_file, log_file, tempo_limite, memoria, threads, registros=None):
+    """Executa um script com o input em um processo próprio e devolve o registro do manifesto."""
+    if not os.path.isfile(script):
+        raise FileNotFoundError(f"Script file not found: {script}")
+    if not os.path.isfile(input_file):
+        raise FileNotFoundError(f"Input file not found: {input_file}")
+    with open(input_file, 'r') as infile:
+        input_data = infile.read()
 
-def execute_scripts(script_files, input_files, log_dir):
+    # Um thread por solver: os jobs já ocupam todos os núcleos
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), OPENBLAS_NUM_THREADS=str(threads), MKL_NUM_THREADS=str(threads))
+    inicio = time.perf_counter()
+    # Sessão própria para matar o script e o solver filho juntos no estouro de tempo
+    comando = [sys.executable, script]
+    if registros:
+        # Cada formulação acrescenta seu registro (JSON Lines) ao arquivo comum
+        comando += ['--registro', os.path.abspath(registros), '--teste', os.path.splitext(os.path.basename(input_file))[0]]
+    process = subprocess.Popen(comando, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, env=env, start_new_session=True)
+    limitar_memoria(process.pid, memoria)
+    try:
+        stdout, stderr = process.communicate(input=input_data, timeout=tempo_limite)
+        status = 'ok' if process.returncode == 0 else 'falha'
+        if 'MemoryError' in stderr:
+            status = 'memoria'
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        stdout, stderr = process.communicate()
+        status = 'tempo'
+    duracao = time.perf_counter() - inicio
 
+    # Log escrito só no fim (arquivo temporário + troca): log parcial não conta como pronto
+    temporario = log_file + '.tmp'
+    with open(temporario, 'w') as log:
+        log.write(f"{stdout}\n")
+        if stderr:
+            log.write(f"Erros:\n{stderr}\n")
+        if status == 'tempo':
+            log.write(f"Tempo limite de {tempo_limite}s excedido\n")
+        log.write("\n" + "-"*80 + "\n\n")
+    os.replace(temporario, log_file)
+    return {'status': status, 'codigo': process.returncode, 'tempo': round(duracao, 3), 'log': log_file}
+
+
+def restaurar_do_cache(cache, chave, input_file, log_file, registros, refazer_tempo=False):
+    """Recria o log e o registro de um job a partir do cache; o registro leva o nome do teste atual.
+
+    A entrada é conferida antes de qualquer escrita: com refazer_tempo, uma
+    entrada que estourou o tempo é recusada sem sobrescrever o log nem
+    acrescentar o registro antigo aos registros.
+    """
+    entrada = cache.obter(chave)
+    if entrada is None or (refazer_tempo and entrada['manifesto']['status'] == 'tempo'):
+        return None
+    if not cache.restaurar(chave, 'log.txt', log_file):
+        return None
+    if registros and entrada.get('registro'):
+        teste = os.path.splitext(os.path.basename(input_file))[0]
+        linhas = [dict(json.loads(linha), teste=teste) for linha in cache.ler(chave, 'registro.jsonl').splitlines() if linha]
+        acrescentar(registros, ''.join(json.dumps(linha, default=str) + '\n' for linha in linhas))
+    return dict(entrada['manifesto'], log=log_file, cache=True)
+
+
+def guardar_no_cache(cache, chave, registro, log_file, registro_job):
+    """Guarda no cache os jobs concluídos (ou que estouraram o tempo, que é reprodutível com o mesmo limite)."""
+    if registro['status'] not in ('ok', 'tempo'):
+        return
+    arquivos = {'log.txt': log_file, 'registro.jsonl': registro_job}
+    with tempfile.TemporaryDirectory() as temporario:
+        copias = []
+        for nome, caminho in arquivos.items():
+            if os.path.isfile(caminho):
+                copias.append(os.path.join(temporario, nome))
+                shutil.copyfile(caminho, copias[-1])
+        cache.guardar(chave, {'manifesto': registro, 'registro': os.path.isfile(registro_job)}, copias)
+
+
+def execute_scripts(script_files, input_files, log_dir, jobs=None, tempo_limite=2000, memoria=None, threads=1,
+                    refazer_tempo=False, caminho_manifesto='manifesto.json', registros='resultados.jsonl', cache=None):
+    """Executa todos os pares (script, input) em paralelo, retomando pelo manifesto e pelo cache de resultados.
+
+    Cada job é identificado pelo conteúdo: hash da instância normalizada, versão
+    do código da formulação e opções do solver. Um job só é pulado se o
+    manifesto tiver a mesma chave (o log existente é desse conteúdo) ou se o
+    cache tiver o resultado, mesmo que calculado com outro nome de arquivo.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    manifesto = carregar_manifesto(caminho_manifesto)
+    versoes = {script: versao_fonte(script) for script in script_files}
+    opcoes = {'tempo_limite': tempo_limite, 'memoria': memoria, 'threads': threads}
+
+    pendentes = []
     for input_file in input_files:
+        with open(input_file) as entrada:
+            instancia = hash_instancia(ler_instancia(entrada))
         for script in script_files:
-            print(f"Modelo: {script} Input {input_file}")
-            # Cria um nome de arquivo de log baseado no nome do script e do input
-            log_file = os.path.join(log_dir, f"{os.path.splitext(os.path.basename(script))[0]}_{os.path.splitext(os.path.basename(input_file))[0]}.txt")
-                
-            try:
-                # Verifica se o arquivo de script e de input existem
-                if not os.path.isfile(script):
-                    raise FileNotFoundError(f"Script file not found: {script}")
-                if not os.path.isfile(input_file):
-                    raise FileNotFoundError(f"Input file not found: {input_file}")
-                if  os.path.isfile(log_file):
-                    print("JA PRONTO")
+            log_file = nome_log(log_dir, script, input_file)
+            chave_log = os.path.basename(log_file)
+            chave = chave_cache(instancia, os.path.basename(script), versoes[script], opcoes)
+            registro = manifesto.get(chave_log, {})
+            refazer = registro.get('status') == 'tempo' and refazer_tempo
+            if registro.get('chave') == chave and registro.get('status') in ('ok', 'tempo') and not refazer:
+                print(f"JA PRONTO ({registro['status']}): {chave_log}")
+                continue
+            if cache is not None and not refazer:
+                registro = restaurar_do_cache(cache, chave, input_file, log_file, registros, refazer_tempo)
+                if registro is not None:
+                    manifesto[chave_log] = dict(registro, chave=chave)
+                    salvar_manifesto(caminho_manifesto, manifesto)
+                    print(f"CACHE ({registro['status']}): {chave_log}")
                     continue
-                
-                # Abre o arquivo de input para leitura
-                with open(input_file, 'r') as infile:
-                    input_data = infile.read()
-                
-                # Executa o script com o input fornecido
-                process = subprocess.Popen(['python', script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                stdout, stderr = process.communicate(input=input_data)
-                
-                print(stdout, stderr)
-                # Verifica se o arquivo de log está sendo criado
-                if not os.path.exists(log_dir):
-                    raise OSError(f"Falha ao criar o diretório de logs: {log_dir}")
-                
-                # Escreve a saída e erros no arquivo de log
-                with open(log_file, 'w') as log:
-                    log.write(f"{stdout}\n")
-                    if stderr:
-                        log.write(f"Erros:\n{stderr}\n")
-                    log.write("\n" + "-"*80 + "\n\n")
-            
+            pendentes.append((chave_log, chave, script, input_file, log_file))
+
+    jobs = jobs or os.cpu_count() or 1
+    print(f"{len(pendentes)} jobs pendentes em {jobs} processos")
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futuros = {}
+        for chave_log, chave, script, input_file, log_file in pendentes:
+            # O registro de cada job vai para um arquivo próprio, guardado no cache e depois acrescentado ao comum
+            registro_job = log_file + '.jsonl'
+            if os.path.exists(registro_job):
+                os.remove(registro_job)
+            futuro = pool.submit(executar_job, script, input_file, log_file, tempo_limite, memoria, threads,
+                                 registro_job if registros else None)
+            futuros[futuro] = (chave_log, chave, script, input_file, log_file, registro_job)
+        for futuro in as_completed(futuros):
+            chave_log, chave, script, input_file, log_file, registro_job = futuros[futuro]
+            try:
+                registro = futuro.result()
+                if cache is not None:
+                    guardar_no_cache(cache, chave, registro, log_file, registro_job)
+                if registros and os.path.isfile(registro_job):
+                    with open(registro_job) as arquivo:
+                        acrescentar(registros, arquivo.read())
+                    os.remove(registro_job)
             except Exception as e:
                 # Em caso de erro, grava o erro no log
                 with open(f"{log_file.replace('logs/', 'logs/error_')}", 'w') as log:
@@ -46,8 +193,15 @@ def execute_scripts(script_files, input_files, log_dir):
                     log.write(f"Erro: {str(e)}\n")
                     log.write("\n" + "-"*80 + "\n\n")
                 print(f"Erro ao executar o script {script}. Veja o log em {log_file} para mais detalhes.")
+                registro = {'status': 'falha', 'erro': str(e), 'log': log_file}
+            manifesto[chave_log] = dict(registro, chave=chave)
+            salvar_manifesto(caminho_manifesto, manifesto)
+            print(f"Modelo: {script} Input {input_file} -> {registro['status']} ({registro.get('tempo', 0):.1f}s)")
 
-            
+    contagem = {}
+    for registro in manifesto.values():
+        contagem[registro['status']] = contagem.get(registro['status'], 0) + 1
+    print(f"Tempo total: {time.perf_counter() - inicio:.1f}s | " + ' | '.join(f"{s}: {q}" for s, q in sorted(contagem.items())))
 
 
 # Lista de arquivos de scripts a serem executados
@@ -83,5 +237,22 @@ input_files = [
 # Diretório onde os arquivos de log serão armazenados
 log_dir = 'logs/'
 
-# Executa os scripts com os inputs fornecidos e registra os logs
-execute_scripts(script_files, input_files, log_dir)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Executa todas as formulações em todos os testes, em paralelo e retomável.')
+    parser.add_argument('--jobs', type=int, default=None, help='Processos simultâneos (padrão: número de núcleos).')
+    parser.add_argument('--tempo-limite', type=float, default=2000, help='Tempo de parede máximo por job, em segundos.')
+    parser.add_argument('--memoria', type=int, default=None, help='Memória máxima por job, em MB (inclui o solver).')
+    parser.add_argument('--threads-solver', type=int, default=1, help='Threads por solver (OMP_NUM_THREADS dos jobs).')
+    parser.add_argument('--refazer-tempo', action='store_true', help='Executa de novo os jobs que estouraram o tempo.')
+    parser.add_argument('--manifesto', default='manifesto.json', help='Registro dos jobs concluídos, com falha ou sem tempo.')
+    parser.add_argument('--registros', default='resultados.jsonl', help='Arquivo JSON Lines com os resultados estruturados de cada job.')
+    parser.add_argument('--cache', default='cache/', help='Diretório do cache de resultados (por instância, código e opções).')
+    parser.add_argument('--cache-mb', type=int, default=1024, help='Tamanho máximo do cache; as entradas menos usadas saem primeiro.')
+    parser.add_argument('--sem-cache', action='store_true', help='Não consulta nem grava o cache.')
+    args = parser.parse_args()
+
+    # Executa os scripts com os inputs fornecidos e registra os logs
+    execute_scripts(script_files, input_files, log_dir, jobs=args.jobs, tempo_limite=args.tempo_limite,
+                    memoria=args.memoria, threads=args.threads_solver, refazer_tempo=args.refazer_tempo,
+                    caminho_manifesto=args.manifesto, registros=args.registros,
+                    cache=None if args.sem_cache else CacheResultados(args.cache, args.cache_mb))
@@ -0,0 +1,118 @@
+import argparse
+import math
+import random
+import sys
+
+from instancia import InstanciaSteiner, escrever_instancia, escrever_stp
+
+
+def sortear_terminais(rng, n, densidade):
+    """Sorteia max(2, densidade * n) terminais distintos."""
+    return rng.sample(range(n), min(n, max(2, round(densidade * n))))
+
+
+def aleatorio_esparso(n, grau_medio=4, densidade=0.1, semente=0, pesos=(1, 10)):
+    """Grafo conexo aleatório: árvore geradora aleatória mais arestas extras até o grau médio."""
+    rng = random.Random(semente)
+    arestas = [(v, rng.randrange(v), rng.randint(*pesos)) for v in range(1, n)]
+    vistos = {(min(u, v), max(u, v)) for u, v, _ in arestas}
+    alvo = min(n * grau_medio // 2, n * (n - 1) // 2)
+    while len(arestas) < alvo:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and (min(u, v), max(u, v)) not in vistos:
+            vistos.add((min(u, v), max(u, v)))
+            arestas.append((u, v, rng.randint(*pesos)))
+    return InstanciaSteiner(n, arestas, sortear_terminais(rng, n, densidade))
+
+
+def grade(linhas, colunas, densidade=0.1, semente=0, pesos=(1, 10)):
+    """Grade linhas x colunas com pesos aleatórios."""
+    rng = random.Random(semente)
+    arestas = []
+    for i in range(linhas):
+        for j in range(colunas):
+            v = i * colunas + j
+            if j + 1 < colunas:
+                arestas.append((v, v + 1, rng.randint(*pesos)))
+            if i + 1 < linhas:
+                arestas.append((v, v + colunas, rng.randint(*pesos)))
+    n = linhas * colunas
+    return InstanciaSteiner(n, arestas, sortear_terminais(rng, n, densidade))
+
+
+def geometrico(n, grau_medio=6, densidade=0.1, semente=0, escala=1000):
+    """Pontos uniformes no quadrado unitário ligados quando estão a menos de um raio.
+
+    O raio é escolhido para o grau médio pedido e os pares são buscados em
+    células de lado igual ao raio (tempo linear). O peso é a distância
+    euclidiana vezes a escala. Componentes desconexas são ligadas em cadeia.
+    """
+    rng = random.Random(semente)
+    pontos = [(rng.random(), rng.random()) for _ in range(n)]
+    raio = math.sqrt(grau_medio / (math.pi * max(n - 1, 1)))
+    celulas = {}
+    for v, (x, y) in enumerate(pontos):
+        celulas.setdefault((int(x / raio), int(y / raio)), []).append(v)
+
+    def peso(u, v):
+        return max(1, round(math.dist(pontos[u], pontos[v]) * escala))
+
+    arestas = []
+    for (cx, cy), vertices in celulas.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            vizinhos = celulas.get((cx + dx, cy + dy))
+            if not vizinhos:
+                continue
+            for i, u in enumerate(vertices):
+                for v in (vertices[i + 1:] if (dx, dy) == (0, 0) else vizinhos):
+                    if math.dist(pontos[u], pontos[v]) <= raio:
+                        arestas.append((u, v, peso(u, v)))
+
+    # Liga as componentes: o primeiro vértice de cada uma ao primeiro da anterior
+    pai = list(range(n))
+
+    def raiz(v):
+        while pai[v] != v:
+            pai[v] = pai[pai[v]]
+            v = pai[v]
+        return v
+
+    for u, v, _ in arestas:
+        pai[raiz(u)] = raiz(v)
+    representantes = sorted({raiz(v) for v in range(n)})
+    for u, v in zip(representantes, representantes[1:]):
+        arestas.append((u, v, peso(u, v)))
+    return InstanciaSteiner(n, arestas, sortear_terminais(rng, n, densidade))
+
+
+def hipercubo(dimensao, densidade=0.1, semente=0, pesos=(1, 1)):
+    """Hipercubo de 2^dimensao vértices (vizinhos diferem em um bit); pesos=(1, 1) dá as instâncias hc da SteinLib."""
+    rng = random.Random(semente)
+    n = 1 << dimensao
+    arestas = [(v, v ^ (1 << b), rng.randint(*pesos)) for v in range(n) for b in range(dimensao) if v < v ^ (1 << b)]
+    return InstanciaSteiner(n, arestas, sortear_terminais(rng, n, densidade))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera instâncias do problema de Steiner (reprodutíveis pela semente).')
+    parser.add_argument('tipo', choices=['esparso', 'grade', 'geometrico', 'hipercubo'])
+    parser.add_argument('tamanho', type=int, help='Vértices (esparso/geometrico), lado da grade ou dimensão do hipercubo.')
+    parser.add_argument('--grau', type=int, default=4, help='Grau médio (esparso/geometrico).')
+    parser.add_argument('--terminais', type=float, default=0.1, help='Fração de vértices terminais.')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--formato', choices=['txt', 'stp'], default='txt', help='txt: formato dos testes; stp: SteinLib.')
+    args = parser.parse_args()
+
+    if args.tipo == 'esparso':
+        inst = aleatorio_esparso(args.tamanho, args.grau, args.terminais, args.semente)
+    elif args.tipo == 'grade':
+        inst = grade(args.tamanho, args.tamanho, args.terminais, args.semente)
+    elif args.tipo == 'geometrico':
+        inst = geometrico(args.tamanho, args.grau, args.terminais, args.semente)
+    else:
+        inst = hipercubo(args.tamanho, args.terminais, args.semente)
+
+    if args.formato == 'stp':
+        escrever_stp(inst, sys.stdout, f'{args.tipo}-{args.tamanho}-{args.semente}')
+    else:
+        escrever_instancia(inst, sys.stdout)
@@ -0,0 +1,382 @@
+import argparse
+import heapq
+import time
+from collections import deque
+
+from instancia import ler_instancia
+
+INF = float('inf')
+
+
+class UniaoBusca:
+    def __init__(self, n):
+        self.pai = list(range(n))
+
+    def buscar(self, v):
+        while self.pai[v] != v:
+            self.pai[v] = self.pai[self.pai[v]]
+            v = self.pai[v]
+        return v
+
+    def unir(self, u, v):
+        u, v = self.buscar(u), self.buscar(v)
+        if u == v:
+            return False
+        self.pai[u] = v
+        return True
+
+
+# ----------------------------------------------------------------------
+# Utilitários sobre árvores (conjuntos de ids de arestas: a aresta e tem os arcos 2e e 2e + 1)
+# ----------------------------------------------------------------------
+def custo(inst, arestas):
+    return sum(inst.peso[2 * e] for e in arestas)
+
+
+def _extremos(inst, e):
+    return inst.cauda[2 * e], inst.cabeca[2 * e]
+
+
+def _adjacencia(inst, arestas):
+    adj = {}
+    for e in arestas:
+        u, v = _extremos(inst, e)
+        adj.setdefault(u, set()).add(e)
+        adj.setdefault(v, set()).add(e)
+    return adj
+
+
+def podar(inst, arestas):
+    """Remove folhas não terminais repetidamente."""
+    arestas = set(arestas)
+    adj = _adjacencia(inst, arestas)
+    folhas = [v for v, inc in adj.items() if len(inc) == 1 and not inst.eh_terminal[v]]
+    while folhas:
+        v = folhas.pop()
+        if len(adj[v]) != 1:
+            continue
+        e = adj[v].pop()
+        arestas.discard(e)
+        u, w = _extremos(inst, e)
+        outro = w if u == v else u
+        adj[outro].discard(e)
+        if len(adj[outro]) == 1 and not inst.eh_terminal[outro]:
+            folhas.append(outro)
+    return arestas
+
+
+def mst_induzida(inst, vertices):
+    """MST podada do subgrafo induzido por vertices, ou None se não conectar os terminais."""
+    candidatas = sorted(
+        (inst.peso[a], a // 2)
+        for v in vertices for a in inst.arcos_saida(v)
+        if a % 2 == 0 and inst.cabeca[a] in vertices
+    )
+    uf = UniaoBusca(inst.n)
+    arestas = set()
+    for _, e in candidatas:
+        if uf.unir(*_extremos(inst, e)):
+            arestas.add(e)
+    raiz = uf.buscar(inst.raiz)
+    if any(uf.buscar(k) != raiz for k in inst.T_r):
+        return None
+    return podar(inst, arestas)
+
+
+def orientar(inst, arestas):
+    """Arcos da árvore orientados a partir da raiz, em ordem de busca em largura.
+
+    Devolve (arcos, pai), onde pai[v] é o id do arco que entra em v.
+    """
+    adj = _adjacencia(inst, arestas)
+    pai = {inst.raiz: None}
+    arcos = []
+    fila = deque([inst.raiz])
+    while fila:
+        v = fila.popleft()
+        for e in adj.get(v, ()):
+            a = 2 * e if inst.cauda[2 * e] == v else 2 * e + 1
+            u = inst.cabeca[a]
+            if u not in pai:
+                pai[u] = a
+                arcos.append(a)
+                fila.append(u)
+    return arcos, pai
+
+
+def _dijkstra(inst, fontes, limite=INF, alvo=None, proibidos=()):
+    """Dijkstra a partir de várias fontes. Para no primeiro vértice com alvo[v] verdadeiro.
+
+    Devolve (dist, pred, encontrado), com pred[v] = arco usado para chegar a v.
+    """
+    dist = {v: 0 for v in fontes}
+    pred = {v: None for v in fontes}
+    heap = [(0, v) for v in fontes]
+    heapq.heapify(heap)
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue
+        if alvo is not None and alvo(v):
+            return dist, pred, v
+        for a in inst.arcos_saida(v):
+            if a // 2 in proibidos:
+                continue
+            u = inst.cabeca[a]
+            nd = d + inst.peso[a]
+            if nd < limite and nd < dist.get(u, INF):
+                dist[u] = nd
+                pred[u] = a
+                heapq.heappush(heap, (nd, u))
+    return dist, pred, None
+
+
+def distancias(inst, fontes):
+    """Distâncias de caminho mínimo a partir das fontes (dicionário dos vértices alcançados)."""
+    return _dijkstra(inst, fontes)[0]
+
+
+def _caminho(inst, pred, v):
+    """Arestas do caminho até v seguindo pred."""
+    arestas = []
+    while pred[v] is not None:
+        a = pred[v]
+        arestas.append(a // 2)
+        v = inst.cauda[a]
+    return arestas
+
+
+# ----------------------------------------------------------------------
+# Construção
+# ----------------------------------------------------------------------
+def caminhos_minimos(inst):
+    """Heurística de Takahashi-Matsuyama: liga, a partir da raiz, sempre o terminal mais próximo da árvore.
+
+    O Dijkstra é incremental: os vértices que entram na árvore viram fontes
+    com distância 0 e só as distâncias que melhoram são propagadas.
+    """
+    dist = [INF] * inst.n
+    pred = [None] * inst.n
+    heap = []
+
+    def semear(vertices):
+        for v in vertices:
+            dist[v] = 0
+            pred[v] = None
+            heapq.heappush(heap, (0, v))
+
+    def propagar():
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for a in inst.arcos_saida(v):
+                u = inst.cabeca[a]
+                nd = d + inst.peso[a]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    pred[u] = a
+                    heapq.heappush(heap, (nd, u))
+
+    arestas = set()
+    restantes = set(inst.T_r)
+    semear([inst.raiz])
+    while restantes:
+        propagar()
+        k = min(restantes, key=lambda t: dist[t])
+        if dist[k] == INF:
+            return None  # Terminais desconexos
+        novos = []
+        v = k
+        while pred[v] is not None:
+            a = pred[v]
+            arestas.add(a // 2)
+            novos.append(v)
+            v = inst.cauda[a]
+        semear(novos)
+        restantes -= set(novos)
+    return arestas
+
+
+def mst_distancias(inst):
+    """Heurística da MST na rede de distâncias (versão de Mehlhorn com regiões de Voronoi)."""
+    dist, pred, _ = _dijkstra(inst, inst.terminais)
+    # Terminal de origem (região de Voronoi) de cada vértice alcançado
+    base = {v: v for v in inst.terminais}
+    for v in dist:
+        caminho = []
+        while v not in base:
+            caminho.append(v)
+            v = inst.cauda[pred[v]]
+        for u in caminho:
+            base[u] = base[v]
+
+    candidatas = []
+    for e in range(inst.m):
+        u, v = _extremos(inst, e)
+        if u in base and v in base and base[u] != base[v]:
+            candidatas.append((dist[u] + inst.peso[2 * e] + dist[v], e))
+    candidatas.sort()
+
+    uf = UniaoBusca(inst.n)
+    vertices = set(inst.terminais)
+    for _, e in candidatas:
+        u, v = _extremos(inst, e)
+        if uf.unir(base[u], base[v]):
+            for x in (u, v):
+                vertices.add(x)
+                for f in _caminho(inst, pred, x):
+                    vertices.update(_extremos(inst, f))
+    return mst_induzida(inst, vertices)
+
+
+# ----------------------------------------------------------------------
+# Busca local
+# ----------------------------------------------------------------------
+def _caminhos_chave(inst, arestas):
+    """Caminhos da árvore entre vértices chave (terminais ou de grau >= 3)."""
+    adj = _adjacencia(inst, arestas)
+    chave = {v for v, inc in adj.items() if inst.eh_terminal[v] or len(inc) >= 3}
+    caminhos = []
+    usadas = set()
+    for s in chave:
+        for e in adj[s]:
+            if e in usadas:
+                continue
+            caminho, internos, v = [e], [], s
+            while True:
+                u, w = _extremos(inst, caminho[-1])
+                v = w if u == v else u
+                if v in chave:
+                    break
+                internos.append(v)
+                caminho.append(next(f for f in adj[v] if f != caminho[-1]))
+            usadas.update(caminho)
+            caminhos.append((custo(inst, caminho), caminho, internos, s))
+    caminhos.sort(reverse=True)
+    return caminhos
+
+
+def troca_caminhos_chave(inst, arestas, prazo):
+    """Troca um caminho chave por um caminho mínimo mais barato entre os dois lados da árvore."""
+    melhorou = True
+    while melhorou and time.perf_counter() < prazo:
+        melhorou = False
+        for c, caminho, internos, s in _caminhos_chave(inst, arestas):
+            if time.perf_counter() >= prazo:
+                break
+            resto = arestas - set(caminho)
+            # Componente que contém s depois de retirar o caminho
+            adj = _adjacencia(inst, resto)
+            lado_s = {s}
+            fila = [s]
+            while fila:
+                v = fila.pop()
+                for e in adj.get(v, ()):
+                    for u in _extremos(inst, e):
+                        if u not in lado_s:
+                            lado_s.add(u)
+                            fila.append(u)
+            outro_lado = {v for e in arestas for v in _extremos(inst, e)} - lado_s - set(internos)
+            _, pred, v = _dijkstra(inst, lado_s, limite=c, alvo=outro_lado.__contains__)
+            if v is None:
+                continue
+            novas = podar(inst, resto | set(_caminho(inst, pred, v)))
+            if custo(inst, novas) < custo(inst, arestas):
+                arestas = novas
+                melhorou = True
+                break
+    return arestas
+
+
+def insercao_eliminacao(inst, arestas, prazo):
+    """Busca local por vértices de Steiner: inserir ou retirar um vértice e refazer a MST."""
+    melhor = custo(inst, arestas)
+    melhorou = True
+    while melhorou and time.perf_counter() < prazo:
+        melhorou = False
+        vertices = set(_adjacencia(inst, arestas)) | {inst.raiz}
+        steiner = [v for v in vertices if not inst.eh_terminal[v]]
+        fora = {
+            inst.cabeca[a] for v in vertices for a in inst.arcos_saida(v)
+            if inst.cabeca[a] not in vertices
+        }
+        candidatos = [vertices - {v} for v in steiner] + [vertices | {v} for v in fora]
+        for conjunto in candidatos:
+            if time.perf_counter() >= prazo:
+                break
+            novas = mst_induzida(inst, conjunto)
+            if novas is not None and custo(inst, novas) < melhor:
+                arestas, melhor = novas, custo(inst, novas)
+                melhorou = True
+                break
+    return arestas
+
+
+def busca_local(inst, arestas, limite_tempo=10.0, max_vertices_insercao=2000):
+    """Alterna troca de caminhos chave e inserção/eliminação de vértices até não melhorar."""
+    prazo = time.perf_counter() + limite_tempo
+    while time.perf_counter() < prazo:
+        antes = custo(inst, arestas)
+        arestas = troca_caminhos_chave(inst, arestas, prazo)
+        if inst.n <= max_vertices_insercao:
+            arestas = insercao_eliminacao(inst, arestas, prazo)
+        if custo(inst, arestas) >= antes:
+            break
+    return arestas
+
+
+class SolucaoHeuristica:
+    def __init__(self, inst, limite_tempo=10.0):
+        inicio = time.perf_counter()
+        self.custos = {}
+        candidatas = []
+        for nome, heuristica in (('caminhos minimos', caminhos_minimos), ('MST das distancias', mst_distancias)):
+            arestas = heuristica(inst)
+            if arestas is not None:
+                candidatas.append(arestas)
+                self.custos[nome] = inst.custo_fixo + custo(inst, arestas)
+        self.arestas = min(candidatas, key=lambda arestas: custo(inst, arestas)) if candidatas else None
+        if self.arestas is not None and limite_tempo > 0:
+            self.arestas = busca_local(inst, self.arestas, limite_tempo)
+            self.custos['busca local'] = inst.custo_fixo + custo(inst, self.arestas)
+        self.valor = None if self.arestas is None else inst.custo_fixo + custo(inst, self.arestas)
+        self.arcos, self.pai = orientar(inst, self.arestas or ())
+        self.tempo = time.perf_counter() - inicio
+
+    def imprimir(self):
+        print('------------ Heuristica ------------')
+        for nome, valor in self.custos.items():
+            print(f"Heuristica {nome}: {valor}")
+        print(f"Melhor solucao heuristica: {self.valor}")
+        print(f"Tempo da heuristica: {self.tempo:.4f}")
+
+
+def executar_heuristica(inst, reducao=None, limite_tempo=10.0):
+    """Modo somente heurística: imprime o resumo sem montar nenhum modelo."""
+    solucao = SolucaoHeuristica(inst, limite_tempo)
+    solucao.imprimir()
+    print("\nResumo da Execucao:")
+    print(f"Valor da funcao objetivo: {solucao.valor}")
+    print(f"Melhor  Limite Superior (UB): {solucao.valor}")
+    if reducao is not None and solucao.arestas is not None:
+        arestas, valor = reducao.expandir([inst.arcos[a] for a in solucao.arcos])
+        print(f"Arestas da arvore no grafo original: {len(arestas)} | Custo: {valor}")
+    return solucao
+
+
+if __name__ == '__main__':
+    from reducoes import reduzir
+
+    parser = argparse.ArgumentParser(description='Heurísticas primais para o problema de Steiner (sem MIP).')
+    parser.add_argument('--sem-reducao', action='store_true', help='Não aplica os testes de redução.')
+    parser.add_argument('--tempo-busca-local', type=float, default=10.0, help='Limite de tempo da busca local (s).')
+    args = parser.parse_args()
+
+    inst = ler_instancia()
+    print('------------ Leitura completa ------------')
+    reducao = None
+    if not args.sem_reducao:
+        reducao = reduzir(inst)
+        inst = reducao.instancia
+    executar_heuristica(inst, reducao, args.tempo_busca_local)
@@ -0,0 +1,158 @@
+import itertools
+import sys
+
+
+class InstanciaSteiner:
+    """Instância do problema de Steiner com o grafo em listas de adjacência (CSR).
+
+    Os vértices são numerados de 0 a n - 1. Cada aresta {u, v} dá origem a dois
+    arcos com ids consecutivos: 2e = (u, v) e 2e + 1 = (v, u), de modo que o
+    reverso de um arco a é sempre a ^ 1.
+    """
+
+    def __init__(self, n, arestas, terminais, custo_fixo=0):
+        self.n = n
+        self.custo_fixo = custo_fixo  # Custo de arestas já fixadas fora do modelo (reduções)
+        self.terminais = list(dict.fromkeys(terminais))
+        self.raiz = self.terminais[0]  # Nó raiz
+        self.T_r = self.terminais[1:]  # Terminais sem a raiz
+        self.eh_terminal = [False] * n
+        for k in self.terminais:
+            self.eh_terminal[k] = True
+
+        # Remove laços e arestas paralelas (fica a de menor peso)
+        menor = {}
+        for u, v, w in arestas:
+            if u == v:
+                continue
+            chave = (u, v) if u < v else (v, u)
+            if chave not in menor or w < menor[chave]:
+                menor[chave] = w
+
+        # Arcos e pesos indexados pelo id do arco
+        self.cauda = []
+        self.cabeca = []
+        self.peso = []
+        for (u, v), w in menor.items():
+            self.cauda += [u, v]
+            self.cabeca += [v, u]
+            self.peso += [w, w]
+        self.m = len(menor)
+
+        self.saida_ptr, self.saida = self._csr(self.cauda)
+        self.entrada_ptr, self.entrada = self._csr(self.cabeca)
+
+    def _csr(self, extremo):
+        # Contagem por vértice seguida de soma de prefixos
+        ptr = [0] * (self.n + 1)
+        for v in extremo:
+            ptr[v + 1] += 1
+        for v in range(self.n):
+            ptr[v + 1] += ptr[v]
+        pos = ptr[:-1]
+        ids = [0] * len(extremo)
+        for a, v in enumerate(extremo):
+            ids[pos[v]] = a
+            pos[v] += 1
+        return ptr, ids
+
+    @property
+    def arcos(self):
+        """Lista de arcos (i, j) na ordem dos ids."""
+        return list(zip(self.cauda, self.cabeca))
+
+    def arcos_saida(self, v):
+        return self.saida[self.saida_ptr[v]:self.saida_ptr[v + 1]]
+
+    def arcos_entrada(self, v):
+        return self.entrada[self.entrada_ptr[v]:self.entrada_ptr[v + 1]]
+
+    def grau(self, v):
+        return self.saida_ptr[v + 1] - self.saida_ptr[v]
+
+    def vizinhos(self, v):
+        """Pares (vizinho, peso) de v."""
+        return [(self.cabeca[a], self.peso[a]) for a in self.arcos_saida(v)]
+
+    def distancias(self):
+        """Dicionário d[i, j] com o peso de cada arco."""
+        return {(i, j): w for i, j, w in zip(self.cauda, self.cabeca, self.peso)}
+
+
+def ler_instancia(fluxo=None):
+    """Lê uma instância no formato dos testes (vértices numerados a partir de 1) ou no formato SteinLib (.stp)."""
+    fluxo = sys.stdin if fluxo is None else fluxo
+    primeira = fluxo.readline()
+    while primeira and not primeira.strip():
+        primeira = fluxo.readline()
+    if primeira.split()[:1] in (['33D32945'], ['SECTION']):
+        return ler_stp(itertools.chain([primeira], fluxo))
+    tokens = iter(primeira.split() + fluxo.read().split())
+    n, m = int(next(tokens)), int(next(tokens))  # Número de vértices e número de arestas
+    arestas = []
+    for _ in range(m):
+        v, u, w = int(next(tokens)), int(next(tokens)), int(next(tokens))
+        arestas.append((v - 1, u - 1, w))
+    t = int(next(tokens))  # Número de nós terminais
+    terminais = [int(next(tokens)) - 1 for _ in range(t)]
+    return InstanciaSteiner(n, arestas, terminais)
+
+
+def ler_stp(linhas):
+    """Lê uma instância SteinLib linha a linha (seções Graph e Terminals).
+
+    Arestas (E) e arcos (A) viram arestas não direcionadas; se a seção de
+    terminais tiver Root, ele vira a raiz (primeiro terminal). Os pesos têm
+    de ser inteiros, como nas formulações; um peso fracionário é erro, e não
+    é truncado (o que mudaria a instância e o ótimo).
+    """
+    n, arestas, terminais, raiz = 0, [], [], None
+    secao = None
+    for numero, linha in enumerate(linhas, start=1):
+        partes = linha.split()
+        if not partes or partes[0].startswith('#'):
+            continue
+        chave = partes[0].upper()
+        if chave == 'SECTION':
+            secao = partes[1].upper()
+        elif chave in ('END', 'EOF'):
+            secao = None
+        elif secao == 'GRAPH':
+            if chave == 'NODES':
+                n = int(partes[1])
+            elif chave in ('E', 'A'):
+                peso = float(partes[3])
+                if not peso.is_integer():
+                    raise ValueError(f"Linha {numero}: peso {partes[3]} não é inteiro; as formulações supõem custos inteiros")
+                arestas.append((int(partes[1]) - 1, int(partes[2]) - 1, int(peso)))
+        elif secao == 'TERMINALS':
+            if chave == 'T':
+                terminais.append(int(partes[1]) - 1)
+            elif chave in ('ROOT', 'ROOTP'):
+                raiz = int(partes[1]) - 1
+    if raiz is not None:
+        terminais = [raiz] + [t for t in terminais if t != raiz]
+    return InstanciaSteiner(n, arestas, terminais)
+
+
+def _arestas(inst):
+    return [(inst.cauda[a], inst.cabeca[a], inst.peso[a]) for a in range(0, len(inst.peso), 2)]
+
+
+def escrever_instancia(inst, fluxo):
+    """Escreve no formato dos testes (entrada padrão dos scripts)."""
+    arestas = _arestas(inst)
+    fluxo.write(f"{inst.n} {len(arestas)}\n")
+    fluxo.write(''.join(f"{u + 1} {v + 1} {w}\n" for u, v, w in arestas))
+    fluxo.write(f"{len(inst.terminais)}\n")
+    fluxo.write(''.join(f"{t + 1}\n" for t in inst.terminais))
+
+
+def escrever_stp(inst, fluxo, nome='instancia'):
+    arestas = _arestas(inst)
+    fluxo.write(f"33D32945 STP File, STP Format Version 1.0\n\nSECTION Comment\nName \"{nome}\"\nEND\n\n")
+    fluxo.write(f"SECTION Graph\nNodes {inst.n}\nEdges {len(arestas)}\n")
+    fluxo.write(''.join(f"E {u + 1} {v + 1} {w}\n" for u, v, w in arestas))
+    fluxo.write(f"END\n\nSECTION Terminals\nTerminals {len(inst.terminais)}\n")
+    fluxo.write(''.join(f"T {t + 1}\n" for t in inst.terminais))
+    fluxo.write("END\n\nEOF\n")
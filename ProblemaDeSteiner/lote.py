@@ -0,0 +1,116 @@
+import argparse
+import importlib
+import os
+import shlex
+import sys
+import time
+import traceback
+from contextlib import contextmanager, redirect_stdout
+from multiprocessing import Pool
+
+from executar_todos import carregar_manifesto, salvar_manifesto, nome_log, input_files
+from instancia import ler_instancia
+from registro import Registro, zerar_pico_memoria
+
+FORMULACOES = ['MultiplaMercadoria', 'UnicaMercadoria', 'MTZ', 'PlanosDeCorte']
+
+_modulos = {}
+
+
+def _iniciar(formulacoes):
+    """Inicialização de cada processo do lote: Pyomo e as formulações são importados uma vez só.
+
+    O lote já ocupa um processo por núcleo (e os dele não podem ter filhos),
+    então solver e separação ficam em um thread por job.
+    """
+    os.environ['OMP_NUM_THREADS'] = '1'
+    for formulacao in formulacoes:
+        _modulos[formulacao] = importlib.import_module(formulacao)
+
+
+@contextmanager
+def saida_para(log):
+    """Redireciona sys.stdout e o descritor 1 (saída do HiGHS e do glpsol) para o log do job."""
+    sys.stdout.flush()
+    original = os.dup(1)
+    os.dup2(log.fileno(), 1)
+    try:
+        with redirect_stdout(log):
+            yield
+    finally:
+        sys.stdout.flush()
+        log.flush()
+        os.dup2(original, 1)
+        os.close(original)
+
+
+def _executar(tarefa):
+    formulacao, input_file, log_file, registros, extras = tarefa
+    modulo = _modulos[formulacao]
+    opcoes = modulo.argumentos().parse_args(extras)
+    teste = os.path.splitext(os.path.basename(input_file))[0]
+    registro = Registro(formulacao, registros, teste, salvar_na_saida=False)
+    zerar_pico_memoria()  # O pico registrado passa a ser o deste job, não o do processo
+    if opcoes.perfil:
+        base, extensao = os.path.splitext(opcoes.perfil)
+        registro.perfilar(f'{base}_{formulacao}_{teste}{extensao}')
+
+    inicio = time.perf_counter()
+    temporario = log_file + '.tmp'
+    with open(temporario, 'w') as log:
+        try:
+            # A saída que o script imprimiria (inclusive o log do solver) vai para o log do job
+            with saida_para(log):
+                with registro.fase('leitura'):
+                    with open(input_file) as entrada:
+                        inst = ler_instancia(entrada)
+                modulo.resolver(inst, opcoes, registro)
+            status = 'ok'
+        except Exception:
+            log.write(f"Erros:\n{traceback.format_exc()}\n")
+            registro.definir(status='erro')
+            status = 'falha'
+        log.write("\n" + "-"*80 + "\n\n")
+    os.replace(temporario, log_file)
+    registro.salvar()
+    return os.path.basename(log_file), {'status': status, 'tempo': round(time.perf_counter() - inicio, 3), 'log': log_file}
+
+
+def executar_lote(formulacoes, testes, log_dir, jobs=None, registros='resultados.jsonl', caminho_manifesto='manifesto.json',
+                  extras=(), max_tarefas=None):
+    """Resolve todos os pares (formulação, teste) em um processo de longa duração por núcleo."""
+    os.makedirs(log_dir, exist_ok=True)
+    manifesto = carregar_manifesto(caminho_manifesto)
+    tarefas = []
+    for input_file in testes:
+        for formulacao in formulacoes:
+            log_file = nome_log(log_dir, formulacao + '.py', input_file)
+            if manifesto.get(os.path.basename(log_file), {}).get('status') == 'ok':
+                continue
+            tarefas.append((formulacao, input_file, log_file, os.path.abspath(registros), list(extras)))
+
+    jobs = jobs or os.cpu_count() or 1
+    print(f"{len(tarefas)} tarefas pendentes em {jobs} processos")
+    inicio = time.perf_counter()
+    with Pool(jobs, initializer=_iniciar, initargs=(formulacoes,), maxtasksperchild=max_tarefas) as pool:
+        for chave, registro in pool.imap_unordered(_executar, tarefas):
+            manifesto[chave] = registro
+            salvar_manifesto(caminho_manifesto, manifesto)
+            print(f"{chave} -> {registro['status']} ({registro['tempo']:.2f}s)")
+    print(f"Tempo total: {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lote de execuções em processos de longa duração (um por núcleo), sem reiniciar o Python a cada job.')
+    parser.add_argument('--formulacoes', nargs='*', default=FORMULACOES, choices=FORMULACOES)
+    parser.add_argument('--testes', nargs='*', default=input_files)
+    parser.add_argument('--jobs', type=int, default=None, help='Processos no lote (padrão: número de núcleos).')
+    parser.add_argument('--opcoes', default='', help='Opções repassadas a cada formulação, por exemplo "--montagem matriz".')
+    parser.add_argument('--max-tarefas', type=int, default=None, help='Reinicia o processo após esse número de tarefas (libera memória).')
+    parser.add_argument('--registros', default='resultados.jsonl')
+    parser.add_argument('--manifesto', default='manifesto.json')
+    parser.add_argument('--logs', default='logs/')
+    args = parser.parse_args()
+
+    executar_lote(args.formulacoes, args.testes, args.logs, jobs=args.jobs, registros=args.registros, caminho_manifesto=args.manifesto,
+                  extras=shlex.split(args.opcoes), max_tarefas=args.max_tarefas)
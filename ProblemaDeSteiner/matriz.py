@@ -0,0 +1,468 @@
+# Contraparte de TrabalhoFinal/utils/matrix_model.py (MatrixModel): os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from registro import memoria_pico, imprimir_relaxacao
+
+INF = float('inf')
+
+
+class ModeloMatricial:
+    """Programa linear inteiro em forma de matriz esparsa, montado direto com NumPy.
+
+    As restrições são guardadas em COO (linha, coluna, valor) com sentido
+    ('E', 'L' ou 'G') e lado direito por linha. O modelo é escrito em MPS livre
+    de uma vez só ou entregue direto ao HiGHS (highspy), sem passar pela
+    construção de expressões do Pyomo.
+    """
+
+    def __init__(self, custo, inferior, superior, inteira, constante=0.0):
+        self.custo = np.asarray(custo, dtype=float)
+        self.inferior = np.asarray(inferior, dtype=float)
+        self.superior = np.asarray(superior, dtype=float)
+        self.inteira = np.asarray(inteira, dtype=bool)
+        self.constante = constante
+        self._linhas, self._colunas, self._valores = [], [], []
+        self._sentidos, self._lados = [], []
+        self.num_linhas = 0
+
+    @property
+    def num_colunas(self):
+        return len(self.custo)
+
+    def adicionar_linhas(self, linhas, colunas, valores, sentido, lado):
+        """Acrescenta um bloco de linhas. linhas são índices locais 0..len(lado)-1 do bloco."""
+        lado = np.asarray(lado, dtype=float)
+        self._linhas.append(np.asarray(linhas, dtype=np.int64) + self.num_linhas)
+        self._colunas.append(np.asarray(colunas, dtype=np.int64))
+        self._valores.append(np.broadcast_to(np.asarray(valores, dtype=float), len(self._colunas[-1])))
+        self._sentidos.append(np.full(len(lado), sentido))
+        self._lados.append(lado)
+        self.num_linhas += len(lado)
+
+    def coo(self):
+        linhas = np.concatenate(self._linhas) if self._linhas else np.zeros(0, dtype=np.int64)
+        colunas = np.concatenate(self._colunas) if self._colunas else np.zeros(0, dtype=np.int64)
+        valores = np.concatenate(self._valores) if self._valores else np.zeros(0)
+        return linhas, colunas, valores
+
+    @property
+    def sentidos(self):
+        return np.concatenate(self._sentidos) if self._sentidos else np.zeros(0, dtype='<U1')
+
+    @property
+    def lados(self):
+        return np.concatenate(self._lados) if self._lados else np.zeros(0)
+
+    def csc(self):
+        """Matriz por colunas: (início de cada coluna, índices de linha, valores)."""
+        linhas, colunas, valores = self.coo()
+        ordem = np.lexsort((linhas, colunas))
+        inicio = np.zeros(self.num_colunas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(colunas, minlength=self.num_colunas), out=inicio[1:])
+        return inicio, linhas[ordem], valores[ordem]
+
+    def relaxar(self):
+        """Cópia do modelo com todas as colunas contínuas (relaxação linear)."""
+        relaxado = ModeloMatricial(self.custo, self.inferior, self.superior, np.zeros(self.num_colunas, dtype=bool), self.constante)
+        relaxado._linhas, relaxado._colunas, relaxado._valores = list(self._linhas), list(self._colunas), list(self._valores)
+        relaxado._sentidos, relaxado._lados = list(self._sentidos), list(self._lados)
+        relaxado.num_linhas = self.num_linhas
+        return relaxado
+
+    def nnz(self):
+        return sum(len(c) for c in self._colunas)
+
+    # ------------------------------------------------------------------
+    # Escrita em MPS livre
+    # ------------------------------------------------------------------
+    def escrever_mps(self, caminho):
+        inicio, linhas, valores = self.csc()
+        sentidos, lados = self.sentidos, self.lados
+        saida = ['NAME MODELO', 'ROWS', ' N OBJ']
+        saida += [f' {s} R{i}' for i, s in enumerate(sentidos)]
+        saida.append('COLUMNS')
+        inteira_aberta = False
+        for j in range(self.num_colunas):
+            if self.inteira[j] != inteira_aberta:
+                saida.append(f" M{j} 'MARKER' '{'INTORG' if self.inteira[j] else 'INTEND'}'")
+                inteira_aberta = bool(self.inteira[j])
+            if self.custo[j] != 0:
+                saida.append(f' C{j} OBJ {self.custo[j]:.17g}')
+            saida += [f' C{j} R{i} {v:.17g}' for i, v in zip(linhas[inicio[j]:inicio[j + 1]].tolist(), valores[inicio[j]:inicio[j + 1]].tolist())]
+        if inteira_aberta:
+            saida.append(" MFIM 'MARKER' 'INTEND'")
+        saida.append('RHS')
+        saida += [f' RHS R{i} {v:.17g}' for i, v in enumerate(lados.tolist()) if v != 0]
+        saida.append('BOUNDS')
+        for j, (lb, ub) in enumerate(zip(self.inferior.tolist(), self.superior.tolist())):
+            if lb == ub:
+                saida.append(f' FX BND C{j} {lb:.17g}')
+                continue
+            if lb == -INF:
+                saida.append(f' MI BND C{j}')
+            elif lb != 0:
+                saida.append(f' LO BND C{j} {lb:.17g}')
+            if ub != INF:
+                saida.append(f' UP BND C{j} {ub:.17g}')
+            elif self.inteira[j]:
+                saida.append(f' PL BND C{j}')
+        saida.append('ENDATA\n')
+        with open(caminho, 'w') as arquivo:
+            arquivo.write('\n'.join(saida))
+
+    # ------------------------------------------------------------------
+    # Resolução
+    # ------------------------------------------------------------------
+    def resolver(self, tmlim=1800, solucao_inicial=None, limite_superior=None, tee=True):
+        """Resolve com o HiGHS se o highspy estiver instalado; senão escreve o MPS e chama o glpsol."""
+        if limite_superior is not None:
+            # Limite superior conhecido entra como corte de objetivo
+            colunas = np.flatnonzero(self.custo)
+            self.adicionar_linhas(np.zeros(len(colunas)), colunas, self.custo[colunas], 'L',
+                                  [limite_superior - self.constante])
+        try:
+            import highspy  # noqa: F401
+        except ImportError:
+            return self._resolver_glpk(tmlim, tee)
+        return self._resolver_highs(tmlim, solucao_inicial, tee)
+
+    def _resolver_highs(self, tmlim, solucao_inicial, tee):
+        import highspy
+
+        inicio_escrita = time.perf_counter()
+        inicio, linhas, valores = self.csc()
+        sentidos, lados = self.sentidos, self.lados
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.num_colunas
+        lp.num_row_ = self.num_linhas
+        lp.col_cost_ = self.custo
+        lp.col_lower_ = self.inferior
+        lp.col_upper_ = self.superior
+        lp.row_lower_ = np.where(sentidos == 'L', -highspy.kHighsInf, lados)
+        lp.row_upper_ = np.where(sentidos == 'G', highspy.kHighsInf, lados)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = inicio
+        lp.a_matrix_.index_ = linhas
+        lp.a_matrix_.value_ = valores
+        lp.integrality_ = [highspy.HighsVarType.kInteger if i else highspy.HighsVarType.kContinuous for i in self.inteira]
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', tee)
+        h.setOptionValue('time_limit', float(tmlim))
+        if os.environ.get('OMP_NUM_THREADS'):
+            h.setOptionValue('threads', int(os.environ['OMP_NUM_THREADS']))
+        h.passModel(lp)
+        if solucao_inicial is not None:
+            sol = highspy.HighsSolution()
+            sol.col_value = list(solucao_inicial)
+            h.setSolution(sol)
+        tempo_escrita = time.perf_counter() - inicio_escrita
+
+        inicio_resolucao = time.perf_counter()
+        h.run()
+        tempo_resolucao = time.perf_counter() - inicio_resolucao
+        info = h.getInfo()
+        status = h.modelStatusToString(h.getModelStatus())
+        x = np.array(h.getSolution().col_value) if info.primal_solution_status else None
+        valor = None if x is None else info.objective_function_value + self.constante
+        lb = info.mip_dual_bound + self.constante if self.inteira.any() else valor
+        solucao = Solucao('highs', status, valor, lb, x, tempo_escrita, tempo_resolucao)
+        solucao.nos = info.mip_node_count if self.inteira.any() else 0
+        return solucao
+
+    def _resolver_glpk(self, tmlim, tee):
+        with tempfile.TemporaryDirectory() as pasta:
+            mps = os.path.join(pasta, 'modelo.mps')
+            sol = os.path.join(pasta, 'solucao.txt')
+            inicio = time.perf_counter()
+            self.escrever_mps(mps)
+            tempo_escrita = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            processo = subprocess.run(['glpsol', '--freemps', mps, '--tmlim', str(int(tmlim)), '-w', sol],
+                                      capture_output=True, text=True)
+            tempo_resolucao = time.perf_counter() - inicio
+            if tee:
+                print(processo.stdout)
+            status, valor, x, mip = 'erro', None, None, True
+            if os.path.isfile(sol):
+                x = np.zeros(self.num_colunas)
+                with open(sol) as arquivo:
+                    for linha in arquivo:
+                        partes = linha.split()
+                        if not partes:
+                            continue
+                        if partes[0] == 's':
+                            # s mip LINHAS COLUNAS STATUS OBJ  /  s bas LINHAS COLUNAS STATUS_P STATUS_D OBJ
+                            mip = partes[1] == 'mip'
+                            status = {'o': 'optimal', 'f': 'feasible', 'n': 'infeasible', 'u': 'undefined'}.get(partes[4], partes[4])
+                            valor = float(partes[-1]) + self.constante
+                        elif partes[0] == 'j':
+                            # j COLUNA VALOR  /  j COLUNA STATUS PRIMAL DUAL
+                            x[int(partes[1]) - 1] = float(partes[2] if mip else partes[3])
+        lb = valor if status == 'optimal' else None
+        return Solucao('glpk', status, valor, lb, x, tempo_escrita, tempo_resolucao)
+
+
+class Solucao:
+    def __init__(self, solver, status, valor, limite_inferior, x, tempo_escrita, tempo_resolucao):
+        self.solver = solver
+        self.status = status
+        self.valor = valor
+        self.limite_inferior = limite_inferior
+        self.x = x
+        self.tempo_escrita = tempo_escrita
+        self.tempo_resolucao = tempo_resolucao
+        self.nos = None  # O arquivo de solução do glpsol não informa os nós
+        self.relaxacao = None
+
+
+# ----------------------------------------------------------------------
+# Formulações do problema de Steiner
+# ----------------------------------------------------------------------
+def _vetores(inst):
+    cauda = np.asarray(inst.cauda, dtype=np.int64)
+    cabeca = np.asarray(inst.cabeca, dtype=np.int64)
+    peso = np.asarray(inst.peso, dtype=float)
+    eh_terminal = np.asarray(inst.eh_terminal, dtype=bool)
+    return cauda, cabeca, peso, eh_terminal
+
+
+def _numerar(mascara):
+    """Índice sequencial de linha para cada posição verdadeira da máscara (-1 nas demais)."""
+    indice = np.full(len(mascara), -1, dtype=np.int64)
+    indice[mascara] = np.arange(int(mascara.sum()))
+    return indice
+
+
+def _colunas_x(inst, fixados, extras_inferior, extras_superior, extras_inteira, extras_custo):
+    """Custos e limites com as colunas x (uma por arco) seguidas das colunas extras."""
+    num_arcos = len(inst.peso)
+    superior_x = np.ones(num_arcos)
+    if fixados:
+        superior_x[list(fixados)] = 0  # Arcos eliminados por custo reduzido
+    custo = np.concatenate([np.asarray(inst.peso, dtype=float), extras_custo])
+    inferior = np.concatenate([np.zeros(num_arcos), extras_inferior])
+    superior = np.concatenate([superior_x, extras_superior])
+    inteira = np.concatenate([np.ones(num_arcos, dtype=bool), extras_inteira])
+    return custo, inferior, superior, inteira
+
+
+def matriz_mtz(inst, fixados=()):
+    n, num_arcos = inst.n, len(inst.peso)
+    t = len(inst.terminais)
+    cauda, cabeca, _, eh_terminal = _vetores(inst)
+    arcos = np.arange(num_arcos)
+
+    # Colunas: x (arcos) e u (vértices), com u[raiz] = 0
+    superior_u = np.full(n, n - 1.0)
+    superior_u[inst.raiz] = 0
+    custo, inferior, superior, inteira = _colunas_x(inst, fixados, np.zeros(n), superior_u, np.ones(n, dtype=bool), np.zeros(n))
+    modelo = ModeloMatricial(custo, inferior, superior, inteira, inst.custo_fixo)
+    u = num_arcos + np.arange(n)
+
+    # Cada terminal (exceto a raiz) recebe um arco
+    eh_Tr = eh_terminal.copy()
+    eh_Tr[inst.raiz] = False
+    linha_Tr = _numerar(eh_Tr)
+    mascara = eh_Tr[cabeca]
+    modelo.adicionar_linhas(linha_Tr[cabeca[mascara]], arcos[mascara], 1.0, 'G', np.ones(int(eh_Tr.sum())))
+
+    # A raiz está conectada
+    if inst.T_r:
+        mascara = cauda == inst.raiz
+        modelo.adicionar_linhas(np.zeros(int(mascara.sum())), arcos[mascara], 1.0, 'G', [1.0])
+
+    # Grau dos não terminais: saída <= t * entrada
+    linha_nt = _numerar(~eh_terminal)
+    sai, entra = ~eh_terminal[cauda], ~eh_terminal[cabeca]
+    modelo.adicionar_linhas(
+        np.concatenate([linha_nt[cauda[sai]], linha_nt[cabeca[entra]]]),
+        np.concatenate([arcos[sai], arcos[entra]]),
+        np.concatenate([np.ones(int(sai.sum())), np.full(int(entra.sum()), -float(t))]),
+        'L', np.zeros(int((~eh_terminal).sum())),
+    )
+
+    # MTZ: u[j] - u[i] - (n-1) x[i, j] - (n-3) x[j, i] >= -(n-2), para j != raiz
+    mascara = cabeca != inst.raiz
+    a = arcos[mascara]
+    r = np.arange(len(a))
+    modelo.adicionar_linhas(
+        np.concatenate([r, r, r, r]),
+        np.concatenate([u[cabeca[a]], u[cauda[a]], a, a ^ 1]),
+        np.concatenate([np.ones(len(a)), -np.ones(len(a)), np.full(len(a), -(n - 1.0)), np.full(len(a), -(n - 3.0))]),
+        'G', np.full(len(a), -(n - 2.0)),
+    )
+    return modelo
+
+
+def matriz_unica(inst, fixados=()):
+    num_arcos = len(inst.peso)
+    cauda, cabeca, _, eh_terminal = _vetores(inst)
+    arcos = np.arange(num_arcos)
+
+    # Colunas: x (arcos) e f (arcos)
+    superior_f = np.full(num_arcos, INF)
+    if fixados:
+        superior_f[list(fixados)] = 0
+    custo, inferior, superior, inteira = _colunas_x(inst, fixados, np.zeros(num_arcos), superior_f,
+                                                   np.zeros(num_arcos, dtype=bool), np.zeros(num_arcos))
+    modelo = ModeloMatricial(custo, inferior, superior, inteira, inst.custo_fixo)
+    f = num_arcos + arcos
+
+    # Balanço de fluxo em todos os vértices exceto a raiz: entrada - saída = 1 (terminal) ou 0
+    com_balanco = np.ones(inst.n, dtype=bool)
+    com_balanco[inst.raiz] = False
+    linha = _numerar(com_balanco)
+    entra, sai = com_balanco[cabeca], com_balanco[cauda]
+    modelo.adicionar_linhas(
+        np.concatenate([linha[cabeca[entra]], linha[cauda[sai]]]),
+        np.concatenate([f[entra], f[sai]]),
+        np.concatenate([np.ones(int(entra.sum())), -np.ones(int(sai.sum()))]),
+        'E', eh_terminal[com_balanco].astype(float),
+    )
+
+    # Capacidade: f[a] <= |T_r| x[a]
+    modelo.adicionar_linhas(np.concatenate([arcos, arcos]), np.concatenate([f, arcos]),
+                            np.concatenate([np.ones(num_arcos), np.full(num_arcos, -float(len(inst.T_r)))]),
+                            'L', np.zeros(num_arcos))
+    return modelo
+
+
+def matriz_multipla(inst, fixados=()):
+    n, num_arcos = inst.n, len(inst.peso)
+    cauda, cabeca, _, _ = _vetores(inst)
+    livres = np.array([a for a in range(num_arcos) if a not in fixados], dtype=np.int64)
+    L, K = len(livres), len(inst.T_r)
+
+    # Colunas: x (arcos) e f[., k] (arcos livres) para cada mercadoria
+    custo, inferior, superior, inteira = _colunas_x(inst, fixados, np.zeros(L * K), np.full(L * K, INF),
+                                                   np.zeros(L * K, dtype=bool), np.zeros(L * K))
+    modelo = ModeloMatricial(custo, inferior, superior, inteira, inst.custo_fixo)
+
+    for indice, k in enumerate(inst.T_r):
+        f = num_arcos + indice * L + np.arange(L)
+        # Balanço: entrada - saída = 1 em k, -1 na raiz, 0 nos demais
+        lado = np.zeros(n)
+        lado[k], lado[inst.raiz] = 1, -1
+        modelo.adicionar_linhas(np.concatenate([cabeca[livres], cauda[livres]]), np.concatenate([f, f]),
+                                np.concatenate([np.ones(L), -np.ones(L)]), 'E', lado)
+        # Capacidade: f[a, k] <= x[a]
+        r = np.arange(L)
+        modelo.adicionar_linhas(np.concatenate([r, r]), np.concatenate([f, livres]),
+                                np.concatenate([np.ones(L), -np.ones(L)]), 'L', np.zeros(L))
+    return modelo
+
+
+FORMULACOES = {
+    'MTZ': matriz_mtz,
+    'UnicaMercadoria': matriz_unica,
+    'MultiplaMercadoria': matriz_multipla,
+}
+
+
+# ----------------------------------------------------------------------
+# Solução inicial (árvore heurística) na ordem das colunas de cada formulação
+# ----------------------------------------------------------------------
+def _x_arvore(inst, heuristica):
+    x = np.zeros(len(inst.peso))
+    x[list(heuristica.arcos)] = 1
+    return x
+
+
+def inicial_mtz(inst, heuristica, fixados=()):
+    """x e u da árvore heurística (u é a profundidade a partir da raiz, 1 fora da árvore)."""
+    u = np.ones(inst.n)
+    u[inst.raiz] = 0
+    for a in heuristica.arcos:
+        u[inst.cabeca[a]] = u[inst.cauda[a]] + 1
+    return np.concatenate([_x_arvore(inst, heuristica), u])
+
+
+def inicial_unica(inst, heuristica, fixados=()):
+    """x e f da árvore heurística (f leva um fluxo por terminal abaixo do arco)."""
+    abaixo = {v: int(inst.eh_terminal[v] and v != inst.raiz) for v in heuristica.pai}
+    for a in reversed(heuristica.arcos):
+        abaixo[inst.cauda[a]] += abaixo[inst.cabeca[a]]
+    f = np.zeros(len(inst.peso))
+    for a in heuristica.arcos:
+        f[a] = abaixo[inst.cabeca[a]]
+    return np.concatenate([_x_arvore(inst, heuristica), f])
+
+
+def inicial_multipla(inst, heuristica, fixados=()):
+    """x e f[., k] da árvore heurística (f[., k] segue o caminho da raiz até k), só nos arcos livres."""
+    num_arcos = len(inst.peso)
+    livres = np.array([a for a in range(num_arcos) if a not in fixados], dtype=np.int64)
+    posicao = np.full(num_arcos, -1, dtype=np.int64)
+    posicao[livres] = np.arange(len(livres))
+    f = np.zeros((len(inst.T_r), len(livres)))
+    for indice, k in enumerate(inst.T_r):
+        v = k
+        while heuristica.pai[v] is not None:
+            a = heuristica.pai[v]
+            f[indice, posicao[a]] = 1
+            v = inst.cauda[a]
+    return np.concatenate([_x_arvore(inst, heuristica), f.ravel()])
+
+
+INICIAIS = {
+    'MTZ': inicial_mtz,
+    'UnicaMercadoria': inicial_unica,
+    'MultiplaMercadoria': inicial_multipla,
+}
+
+
+def resolver_matricial(formulacao, inst, fixados=(), heuristica=None, tmlim=1800, tee=True, relaxacao=False):
+    """Monta a formulação em forma matricial e resolve. Devolve (solucao, arcos escolhidos, tempo de montagem).
+
+    Com relaxacao=True também resolve a relaxação linear (solucao.relaxacao),
+    montada sem os arcos fixados e antes do corte de objetivo da heurística.
+    """
+    inicio = time.perf_counter()
+    modelo = FORMULACOES[formulacao](inst, fixados)
+    tempo_montagem = time.perf_counter() - inicio
+    lp = None
+    if relaxacao:
+        lp = (FORMULACOES[formulacao](inst) if fixados else modelo).relaxar()
+    limite = inicial = None
+    if heuristica is not None and heuristica.valor is not None:
+        # A árvore heurística vai como solução inicial (HiGHS) e o valor dela como corte de objetivo
+        limite = heuristica.valor
+        inicial = INICIAIS[formulacao](inst, heuristica, fixados)
+    solucao = modelo.resolver(tmlim, solucao_inicial=inicial, limite_superior=limite, tee=tee)
+    if lp is not None:
+        solucao.relaxacao = lp.resolver(tmlim, tee=False).valor
+    arcos = []
+    if solucao.x is not None:
+        arcos = [inst.arcos[a] for a in np.flatnonzero(solucao.x[:len(inst.peso)] > 0.5)]
+    return solucao, arcos, tempo_montagem
+
+
+def registrar(registro, solucao, tempo_montagem):
+    """Copia limites, nós e tempos da resolução matricial para o registro da execução."""
+    registro.dados['fases'].update(montagem=tempo_montagem, escrita=solucao.tempo_escrita, resolucao=solucao.tempo_resolucao)
+    registro.dados['memoria_fases']['resolucao'] = memoria_pico()
+    registro.definir(status=solucao.status, LB=solucao.limite_inferior, UB=solucao.valor, LBR=solucao.relaxacao, nos=solucao.nos)
+
+
+def imprimir_resumo(solucao, tempo_montagem, dual=None, fixados=()):
+    """Mesmo resumo impresso pelos scripts com Pyomo, acrescido dos tempos da montagem matricial."""
+    LB, UB = solucao.limite_inferior, solucao.valor
+    print("\nResumo da Execucao:")
+    print(f"Valor da funcao objetivo: {solucao.valor}")
+    print(f"Melhor Limite Inferior (LB): {LB}")
+    print(f"Melhor  Limite Superior (UB): {UB}")
+    imprimir_relaxacao(UB, solucao.relaxacao)
+    if dual is not None:
+        print(f"Limite dual (ascensao dual): {dual.limite}")
+        print(f"Arcos fixados por custo reduzido: {len(fixados)}")
+    print(f"Status: {solucao.status} ({solucao.solver})")
+    print(f"Tempo de montagem da matriz: {tempo_montagem:.4f}")
+    print(f"Tempo de escrita do modelo: {solucao.tempo_escrita:.4f}")
+    print(f"Time: {solucao.tempo_resolucao:.4f}")
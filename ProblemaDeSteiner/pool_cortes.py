@@ -0,0 +1,88 @@
+import numpy as np
+
+from separacao import arcos_do_corte
+
+
+class PoolDeCortes:
+    """Pool de cortes dirigidos x(δ+(S)) >= 1 sem repetição.
+
+    Cada corte é identificado pela máscara de bits do conjunto S (lado da raiz),
+    o que dá hash e comparação baratos. Só cortes inéditos viram restrições no
+    modelo; cortes folgados por mais de idade_max rodadas seguidas são
+    desativados (deixam de ir para o arquivo LP) e voltam a ser ativados se a
+    separação os encontrar de novo. idade_max = 0 desliga o envelhecimento.
+    Se houver um Resolvedor persistente, as mudanças são repassadas a ele.
+    """
+
+    def __init__(self, modelo, inst, idade_max=10, eps=1e-6, resolvedor=None):
+        self.modelo = modelo
+        self.resolvedor = resolvedor
+        self.inst = inst
+        self.arcos = inst.arcos
+        self.idade_max = idade_max
+        self.eps = eps
+        self.cortes = {}  # máscara -> [restrição, ids dos arcos, idade]
+        self.inseridos = 0  # Cortes inéditos colocados no modelo
+        self.duplicados = 0  # Cortes separados que já estavam ativos no modelo
+        self.reaproveitados = 0  # Cortes removidos por idade e reativados do pool
+        self.removidos = 0  # Desativações por idade
+
+    @staticmethod
+    def mascara(S):
+        m = 0
+        for v in S:
+            m |= 1 << v
+        return m
+
+    def adicionar(self, S):
+        """Insere o corte de S se ele ainda não estiver ativo. Devolve True se o modelo mudou."""
+        chave = self.mascara(S)
+        corte = self.cortes.get(chave)
+        if corte is not None:
+            restricao = corte[0]
+            corte[2] = 0
+            if restricao.active:
+                self.duplicados += 1
+                return False
+            restricao.activate()
+            self._notificar('adicionar', restricao)
+            self.reaproveitados += 1
+            return True
+        ids = arcos_do_corte(self.inst, frozenset(S))
+        restricao = self.modelo.restricoes.add(sum(self.modelo.x[self.arcos[a]] for a in ids) >= 1)
+        self.cortes[chave] = [restricao, ids, 0]
+        self._notificar('adicionar', restricao)
+        self.inseridos += 1
+        return True
+
+    def _notificar(self, operacao, restricao):
+        if self.resolvedor is not None:
+            getattr(self.resolvedor, operacao)([restricao])
+
+    def envelhecer(self, x):
+        """Atualiza a idade dos cortes ativos com a solução x (indexada pelo id do arco)."""
+        if not self.idade_max:
+            return
+        x = np.asarray(x, dtype=float)
+        for corte in self.cortes.values():
+            restricao, ids, idade = corte
+            if not restricao.active:
+                continue
+            if x[ids].sum() > 1 + self.eps:
+                corte[2] = idade + 1
+                if corte[2] > self.idade_max:
+                    restricao.deactivate()
+                    self._notificar('remover', restricao)
+                    self.removidos += 1
+            else:
+                corte[2] = 0
+
+    @property
+    def ativos(self):
+        return sum(1 for restricao, _, _ in self.cortes.values() if restricao.active)
+
+    def imprimir(self):
+        print(f"Cortes no pool: {len(self.cortes)} | Ativos: {self.ativos}")
+        print(f"Cortes duplicados descartados: {self.duplicados}")
+        print(f"Cortes reaproveitados do pool: {self.reaproveitados}")
+        print(f"Cortes removidos por idade: {self.removidos}")
@@ -0,0 +1,296 @@
+import heapq
+import time
+
+from instancia import InstanciaSteiner
+
+
+class Reducao:
+    """Reduz uma instância de Steiner antes da construção de qualquer formulação.
+
+    Testes aplicados até não haver mais mudanças:
+      - remoção de não terminais de grau 0 ou 1;
+      - contração de não terminais de grau 2 (u - v - w vira a aresta u - w);
+      - terminais de grau 1 e teste do vizinho mais próximo, que fixam arestas
+        presentes em alguma árvore ótima e contraem o terminal no vizinho;
+      - teste do caminho de gargalo (distância especial de Steiner limitada):
+        a aresta (u, v) sai se existe um caminho u-v cujos trechos entre
+        terminais são todos mais curtos que ela.
+
+    Cada aresta da instância reduzida guarda a lista de arestas originais que
+    representa, o que permite levar a solução de volta ao grafo original.
+    """
+
+    def __init__(self, inst, limite_busca=200):
+        inicio = time.perf_counter()
+        self.original = inst
+        self.limite_busca = limite_busca  # Vértices examinados por busca no teste de gargalo
+
+        n = inst.n
+        self.adj = [dict() for _ in range(n)]  # adj[u][v] = id da aresta atual
+        self.peso = []  # Peso de cada aresta atual
+        self.origem = []  # Arestas originais representadas por cada aresta atual
+        for e in range(inst.m):
+            self._nova_aresta(inst.cauda[2 * e], inst.cabeca[2 * e], inst.peso[2 * e], [e])
+
+        self.ativo = [True] * n
+        self.terminal = list(inst.eh_terminal)
+        self.num_terminais = len(inst.terminais)
+        self.contraido_em = list(range(n))  # Vértice que absorveu cada vértice contraído
+        self.fixadas = []  # Arestas originais que certamente estão na solução
+        self.custo_fixo = 0
+        self.estatisticas = {
+            'grau 1': 0,
+            'grau 2': 0,
+            'terminal de grau 1': 0,
+            'vizinho mais proximo': 0,
+            'caminho de gargalo': 0,
+        }
+
+        self._reduzir()
+        self.instancia = self._montar_instancia()
+        self.tempo = time.perf_counter() - inicio
+
+    # ------------------------------------------------------------------
+    # Operações sobre o grafo atual
+    # ------------------------------------------------------------------
+    def _nova_aresta(self, u, v, w, origem):
+        e = self.adj[u].get(v)
+        if e is not None:
+            # Aresta paralela: fica a mais barata
+            if w < self.peso[e]:
+                self.peso[e] = w
+                self.origem[e] = origem
+            return
+        e = len(self.peso)
+        self.peso.append(w)
+        self.origem.append(origem)
+        self.adj[u][v] = e
+        self.adj[v][u] = e
+
+    def _remove_aresta(self, u, v):
+        del self.adj[u][v]
+        del self.adj[v][u]
+
+    def _remove_vertice(self, v):
+        for u in list(self.adj[v]):
+            self._remove_aresta(v, u)
+        self.ativo[v] = False
+
+    def _contrai(self, t, v):
+        """Fixa a aresta (t, v) e funde o terminal t em v."""
+        e = self.adj[t][v]
+        self.fixadas += self.origem[e]
+        self.custo_fixo += self.peso[e]
+        self._remove_aresta(t, v)
+        for x, f in list(self.adj[t].items()):
+            self._remove_aresta(t, x)
+            self._nova_aresta(v, x, self.peso[f], self.origem[f])
+        self.ativo[t] = False
+        if self.terminal[v]:
+            self.num_terminais -= 1
+        self.terminal[v] = True
+        self.contraido_em[t] = v
+
+    # ------------------------------------------------------------------
+    # Testes
+    # ------------------------------------------------------------------
+    def _teste_grau(self):
+        mudou = False
+        pendentes = [v for v in range(len(self.adj)) if self.ativo[v]]
+        while pendentes:
+            v = pendentes.pop()
+            if not self.ativo[v]:
+                continue
+            vizinhos = list(self.adj[v])
+            if not self.terminal[v]:
+                if len(vizinhos) <= 1:
+                    self._remove_vertice(v)
+                    self.estatisticas['grau 1'] += 1
+                elif len(vizinhos) == 2:
+                    u, w = vizinhos
+                    e, f = self.adj[v][u], self.adj[v][w]
+                    peso, origem = self.peso[e] + self.peso[f], self.origem[e] + self.origem[f]
+                    self._remove_vertice(v)
+                    self._nova_aresta(u, w, peso, origem)
+                    self.estatisticas['grau 2'] += 1
+                else:
+                    continue
+            elif len(vizinhos) == 1 and self.num_terminais > 1:
+                self._contrai(v, vizinhos[0])
+                self.estatisticas['terminal de grau 1'] += 1
+            else:
+                continue
+            mudou = True
+            pendentes += vizinhos
+        return mudou
+
+    def _dijkstra(self, origem, limite):
+        """Distâncias a partir de origem, exploradas apenas até o valor limite."""
+        dist = {origem: 0}
+        heap = [(0, origem)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            if self.terminal[v] and v != origem:
+                return d
+            for u, e in self.adj[v].items():
+                nd = d + self.peso[e]
+                if nd <= limite and nd < dist.get(u, nd + 1):
+                    dist[u] = nd
+                    heapq.heappush(heap, (nd, u))
+        return None
+
+    def _teste_vizinho_mais_proximo(self):
+        mudou = False
+        for t in range(len(self.adj)):
+            if not (self.ativo[t] and self.terminal[t]) or len(self.adj[t]) < 2 or self.num_terminais <= 1:
+                continue
+            # As duas arestas mais baratas incidentes em t
+            (c1, v), (c2, _) = heapq.nsmallest(2, ((self.peso[e], u) for u, e in self.adj[t].items()))
+            # Terminal mais próximo de v (diferente de t) dentro de c2 - c1
+            self.terminal[t] = False
+            d = 0 if self.terminal[v] else self._dijkstra(v, c2 - c1)
+            self.terminal[t] = True
+            if d is not None and c1 + d <= c2:
+                self._contrai(t, v)
+                self.estatisticas['vizinho mais proximo'] += 1
+                mudou = True
+        return mudou
+
+    def _distancia_gargalo(self, u, v, limite):
+        """Limitante superior da distância especial entre u e v sem usar a aresta (u, v).
+
+        O rótulo de cada vértice é o maior trecho entre terminais do caminho;
+        o trecho é zerado ao passar por um terminal.
+        """
+        melhor = {u: 0}
+        heap = [(0, 0, u)]
+        examinados = 0
+        while heap and examinados < self.limite_busca:
+            gargalo, trecho, x = heapq.heappop(heap)
+            if gargalo > melhor.get(x, gargalo):
+                continue
+            examinados += 1
+            for y, e in self.adj[x].items():
+                if x == u and y == v:
+                    continue
+                novo_trecho = trecho + self.peso[e]
+                novo_gargalo = max(gargalo, novo_trecho)
+                if novo_gargalo >= limite:
+                    continue
+                if y == v:
+                    return novo_gargalo
+                if novo_gargalo < melhor.get(y, limite):
+                    melhor[y] = novo_gargalo
+                    heapq.heappush(heap, (novo_gargalo, 0 if self.terminal[y] else novo_trecho, y))
+        return None
+
+    def _teste_caminho_gargalo(self):
+        mudou = False
+        for u in range(len(self.adj)):
+            if not self.ativo[u]:
+                continue
+            for v, e in list(self.adj[u].items()):
+                if v < u:
+                    continue
+                if self._distancia_gargalo(u, v, self.peso[e]) is not None:
+                    self._remove_aresta(u, v)
+                    self.estatisticas['caminho de gargalo'] += 1
+                    mudou = True
+        return mudou
+
+    def _reduzir(self):
+        while True:
+            mudou = self._teste_grau()
+            mudou = self._teste_vizinho_mais_proximo() or mudou
+            mudou = self._teste_caminho_gargalo() or mudou
+            if not mudou:
+                break
+        # Com um único terminal restante a árvore é formada só pelas arestas fixadas
+        if self.num_terminais <= 1:
+            for v in range(len(self.adj)):
+                if self.ativo[v] and not self.terminal[v]:
+                    self._remove_vertice(v)
+
+    # ------------------------------------------------------------------
+    # Instância reduzida e mapeamento de volta
+    # ------------------------------------------------------------------
+    def _representante(self, v):
+        while self.contraido_em[v] != v:
+            v = self.contraido_em[v]
+        return v
+
+    def _montar_instancia(self):
+        self.rotulo = [v for v in range(len(self.adj)) if self.ativo[v]]  # Vértice reduzido -> original
+        novo = {v: i for i, v in enumerate(self.rotulo)}
+        arestas = []
+        self.origem_reduzida = []  # Arestas originais de cada aresta reduzida
+        for u in self.rotulo:
+            for v, e in self.adj[u].items():
+                if u < v:
+                    arestas.append((novo[u], novo[v], self.peso[e]))
+                    self.origem_reduzida.append(self.origem[e])
+        terminais = [novo[self._representante(t)] for t in self.original.terminais]
+        return InstanciaSteiner(len(self.rotulo), arestas, terminais, custo_fixo=self.custo_fixo)
+
+    @property
+    def resolvida(self):
+        """Verdadeiro quando a redução já determinou a solução por completo."""
+        return len(self.instancia.terminais) <= 1
+
+    def expandir(self, arcos):
+        """Leva arcos (i, j) escolhidos na instância reduzida às arestas do grafo original.
+
+        Devolve a lista de arestas originais (u, v, peso), já com as fixadas, e o custo total.
+        """
+        inst = self.instancia
+        id_arco = {a: i for i, a in enumerate(inst.arcos)}
+        arestas = set(self.fixadas)
+        for a in arcos:
+            arestas.update(self.origem_reduzida[id_arco[a] // 2])
+        orig = self.original
+        solucao = [(orig.cauda[2 * e], orig.cabeca[2 * e], orig.peso[2 * e]) for e in sorted(arestas)]
+        return solucao, sum(w for _, _, w in solucao)
+
+    def imprimir(self):
+        orig, inst = self.original, self.instancia
+        print('------------ Reducao ------------')
+        print(f"Vertices removidos: {orig.n - inst.n} ({orig.n} -> {inst.n})")
+        print(f"Arestas removidas: {orig.m - inst.m} ({orig.m} -> {inst.m})")
+        print(f"Terminais: {len(orig.terminais)} -> {len(inst.terminais)}")
+        print(f"Arestas fixadas: {len(self.fixadas)} | Custo fixado: {self.custo_fixo}")
+        for teste, quantidade in self.estatisticas.items():
+            print(f"  Teste {teste}: {quantidade}")
+        print(f"Tempo de reducao: {self.tempo:.4f}")
+
+
+def reduzir(inst, **opcoes):
+    reducao = Reducao(inst, **opcoes)
+    reducao.imprimir()
+    return reducao
+
+
+def imprimir_solucao_reduzida(reducao):
+    """Resumo de execução quando a redução resolve a instância sem chamar o solver."""
+    print("\nSolucao Otima Encontrada pela reducao")
+    print("\nResumo da Execucao:")
+    print(f"Valor da funcao objetivo: {reducao.custo_fixo}")
+    print(f"Melhor Limite Inferior (LB): {reducao.custo_fixo}")
+    print(f"Melhor  Limite Superior (UB): {reducao.custo_fixo}")
+    print(f"Relaxacao (LBR): {reducao.custo_fixo}")
+    print("Gap de Relaxacao (%): 0.0")
+
+
+def arcos_escolhidos(modelo):
+    """Arcos (i, j) com x[i, j] = 1 na solução do modelo."""
+    return [a for a in modelo.x if modelo.x[a].value is not None and modelo.x[a].value > 0.5]
+
+
+def imprimir_solucao_original(reducao, modelo):
+    imprimir_arvore_original(reducao, arcos_escolhidos(modelo))
+
+
+def imprimir_arvore_original(reducao, arcos):
+    arestas, custo = reducao.expandir(arcos)
+    print(f"Arestas da arvore no grafo original: {len(arestas)} | Custo: {custo}")
@@ -0,0 +1,237 @@
+# Contraparte de TrabalhoFinal/utils/run_record.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import resource
+import time
+from contextlib import contextmanager
+
+
+def hash_instancia(inst):
+    """Hash do grafo normalizado (arestas ordenadas com menor extremo primeiro, terminais ordenados)."""
+    arestas = sorted((min(inst.cauda[a], inst.cabeca[a]), max(inst.cauda[a], inst.cabeca[a]), inst.peso[a])
+                     for a in range(0, len(inst.peso), 2))
+    texto = f"{inst.n}\n" + '\n'.join(f"{u} {v} {w}" for u, v, w in arestas) + f"\n{sorted(inst.terminais)}"
+    return hashlib.sha256(texto.encode()).hexdigest()[:16]
+
+
+def acrescentar(caminho, texto):
+    """Acrescenta o texto ao arquivo com uma única escrita em modo append (segura entre processos)."""
+    descritor = os.open(caminho, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descritor, texto.encode())
+    finally:
+        os.close(descritor)
+
+
+def memoria_pico():
+    """Pico de RSS do processo em MB (VmHWM do Linux; em outros sistemas, ru_maxrss)."""
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def zerar_pico_memoria():
+    """Reinicia o VmHWM, para medir o pico de cada job em processos de longa duração (lote.py)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+    except OSError:
+        pass
+
+
+class Registro:
+    """Registro estruturado de uma execução, gravado como uma linha JSON.
+
+    Guarda o hash da instância, a formulação, os tempos de cada fase, limites,
+    nós, cortes e iterações. Com caminho definido, a linha é acrescentada ao
+    arquivo na saída do script (inclusive pelos sys.exit antecipados), com uma
+    única escrita em modo append, de modo que vários jobs em paralelo podem
+    usar o mesmo arquivo.
+
+    Cada fase também conta as chamadas e anota o pico de memória ao terminar,
+    o que mostra qual fase elevou o pico. Com perfilar(), o perfil da execução
+    é gravado junto com o registro.
+    """
+
+    def __init__(self, formulacao, caminho=None, teste=None, salvar_na_saida=True):
+        self.caminho = caminho
+        self.dados = {'formulacao': formulacao, 'teste': teste, 'status': 'incompleto', 'fases': {}, 'chamadas': {}, 'memoria_fases': {}}
+        self._inicio = time.perf_counter()
+        self._ultima = {}  # Duração da última chamada de cada fase
+        self._salvo = False
+        self._perfil = None
+        self._salvar_na_saida = salvar_na_saida
+        if caminho and salvar_na_saida:
+            atexit.register(self.salvar)
+
+    def instancia(self, inst):
+        self.dados.update(instancia=hash_instancia(inst), n=inst.n, m=inst.m, terminais=len(inst.terminais))
+
+    @contextmanager
+    def fase(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fases, chamadas = self.dados['fases'], self.dados['chamadas']
+            self._ultima[nome] = time.perf_counter() - inicio
+            fases[nome] = fases.get(nome, 0.0) + self._ultima[nome]
+            chamadas[nome] = chamadas.get(nome, 0) + 1
+            self.dados['memoria_fases'][nome] = memoria_pico()
+
+    def descontar_solver(self, fase, resultado):
+        """Move da última chamada de `fase` para a fase 'escrita' o que não foi tempo do solver.
+
+        No Pyomo com GLPK a diferença é a escrita do arquivo LP e a leitura da
+        solução; sem o tempo do solver no resultado, nada é movido.
+        """
+        fases = self.dados['fases']
+        ultima = self._ultima.get(fase, 0.0)
+        tempo = resultado.solver.time
+        solver = min(tempo, ultima) if isinstance(tempo, (int, float)) and tempo > 0 else ultima
+        fases[fase] -= ultima - solver
+        fases['escrita'] = fases.get('escrita', 0.0) + ultima - solver
+
+    def perfilar(self, caminho):
+        """Perfila o resto da execução e grava o perfil ao salvar o registro.
+
+        Arquivos .html ou .txt usam o pyinstrument (amostragem, pouca
+        sobrecarga); os demais recebem o cProfile (.prof, para pstats ou snakeviz).
+        """
+        if not caminho:
+            return
+        if os.path.splitext(caminho)[1] in ('.html', '.txt'):
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise SystemExit("pyinstrument nao instalado: pip install pyinstrument (ou use um arquivo .prof para o cProfile)")
+            self._perfil = Profiler()
+            self._perfil.start()
+        else:
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        self.dados['perfil'] = caminho
+        if not self.caminho and self._salvar_na_saida:
+            atexit.register(self.salvar)
+
+    def _gravar_perfil(self):
+        perfil, caminho = self._perfil, self.dados['perfil']
+        self._perfil = None
+        if hasattr(perfil, 'dump_stats'):
+            perfil.disable()
+            perfil.dump_stats(caminho)
+            return
+        perfil.stop()
+        with open(caminho, 'w') as arquivo:
+            arquivo.write(perfil.output_html() if caminho.endswith('.html') else perfil.output_text())
+
+    def definir(self, **campos):
+        self.dados.update(campos)
+
+    def salvar(self):
+        if self._perfil is not None:
+            self._gravar_perfil()
+        if not self.caminho or self._salvo:
+            return
+        self._salvo = True
+        self.dados['tempo_total'] = time.perf_counter() - self._inicio
+        self.dados['memoria_pico'] = memoria_pico()
+        self.dados['memoria_solver'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        acrescentar(self.caminho, json.dumps(self.dados, default=str) + '\n')
+
+
+def numero_de_nos(resultado):
+    """Nós do branch-and-bound informados pelo Pyomo, quando o solver os reporta."""
+    try:
+        nos = resultado.solver.statistics.branch_and_bound.number_of_bounded_subproblems
+    except AttributeError:
+        return None
+    return None if nos is None or nos.__class__.__name__ == 'UndefinedData' else int(nos)
+
+
+def relaxacao_linear(modelo, tmlim=1800):
+    """Valor da relaxação linear da formulação (LBR), resolvida numa cópia do modelo.
+
+    O LBR é o limite da formulação, comparado entre elas no compactas.csv:
+    na cópia, os arcos fixados por custo reduzido são liberados e o corte de
+    objetivo da heurística (limite_heuristica) é desativado, porque os dois
+    dependem da heurística e da ascensão dual, não da formulação.
+    """
+    from pyomo.environ import SolverFactory, TransformationFactory, Var, value
+
+    relaxado = modelo.clone()
+    for var in relaxado.component_data_objects(Var):
+        var.unfix()
+    if relaxado.component('limite_heuristica') is not None:
+        relaxado.limite_heuristica.deactivate()
+    TransformationFactory('core.relax_integer_vars').apply_to(relaxado)
+    solver = SolverFactory('glpk')
+    solver.options['tmlim'] = tmlim
+    solver.solve(relaxado)
+    return value(relaxado.objetivo)
+
+
+def imprimir_relaxacao(UB, relaxacao):
+    """Linhas do LBR e do gap de relaxação no resumo; sem LBR, dizem isso."""
+    print(f"Relaxacao (LBR): {relaxacao if relaxacao is not None else 'nao calculada'}")
+    print(f"Gap de Relaxacao (%): {(UB - relaxacao) / UB * 100 if relaxacao is not None and UB else 'nao calculado'}")
+
+
+def ler_registros(caminho):
+    """Percorre o arquivo JSON Lines sem carregá-lo inteiro; linhas truncadas são ignoradas."""
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+
+
+def ultimos_registros(caminho, filtro=None):
+    """Último registro de cada (formulação, teste, instância); execuções repetidas substituem as anteriores."""
+    ultimos = {}
+    for registro in ler_registros(caminho):
+        if filtro is None or filtro(registro):
+            ultimos[registro['formulacao'], registro.get('teste'), registro.get('instancia')] = registro
+    return list(ultimos.values())
+
+
+def escrever_parquet(caminho_jsonl, caminho_parquet):
+    """Converte os registros para Parquet (colunar), com as fases em colunas fase_<nome> e memoria_<nome>."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("pyarrow nao instalado: pip install pyarrow")
+    linhas = []
+    for registro in ler_registros(caminho_jsonl):
+        registro = dict(registro)
+        for nome, tempo in registro.pop('fases', {}).items():
+            registro[f'fase_{nome}'] = tempo
+        for nome, memoria in registro.pop('memoria_fases', {}).items():
+            registro[f'memoria_{nome}'] = memoria
+        registro.pop('chamadas', None)
+        linhas.append(registro)
+    pq.write_table(pa.Table.from_pylist(linhas), caminho_parquet)
+    print(f"{len(linhas)} registros gravados em {caminho_parquet}.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converte os registros JSON Lines das execuções para Parquet.')
+    parser.add_argument('registros', nargs='?', default='resultados.jsonl')
+    parser.add_argument('--parquet', default='resultados.parquet')
+    args = parser.parse_args()
+    escrever_parquet(args.registros, args.parquet)
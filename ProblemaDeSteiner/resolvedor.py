@@ -0,0 +1,153 @@
+# Contraparte de TrabalhoFinal/utils/solver_backend.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import os
+import time
+
+from pyomo.environ import SolverFactory, Constraint
+
+
+class Resolvedor:
+    """Camada entre os laços de planos de corte e o solver.
+
+    Com backend 'highs' ou 'cbc' usa as interfaces persistentes (APPSI) do
+    Pyomo: o modelo é carregado uma vez e a cada iteração só as restrições
+    novas (ou removidas) são enviadas, reaproveitando a base da resolução
+    anterior. Se o solver persistente não estiver disponível, cai para o GLPK,
+    que reescreve o arquivo LP a cada chamada.
+
+    Cada chamada de resolver() registra o tempo de atualização do modelo
+    (envio de linhas, ou escrita do LP e leitura da solução no GLPK) separado
+    do tempo de resolução.
+    """
+
+    PERSISTENTES = ('highs', 'cbc')
+
+    def __init__(self, modelo, backend='glpk', tmlim=1800, opcoes_glpk=None):
+        self.modelo = modelo
+        self.tmlim = tmlim
+        self.pendentes_adicionar = []
+        self.pendentes_remover = []
+        self.historico = []  # (tempo de atualização, tempo de resolução) por chamada
+        self.ultimo = None
+
+        self.opt = self._persistente(backend) if backend in self.PERSISTENTES else None
+        self.persistente = self.opt is not None
+        if self.persistente:
+            self.backend = backend
+        else:
+            if backend != 'glpk':
+                print(f"Solver persistente '{backend}' indisponivel, usando GLPK")
+            self.backend = 'glpk'
+            self.opt = SolverFactory('glpk')
+            self.opt.options['tmlim'] = tmlim
+            for chave, valor in (opcoes_glpk or {}).items():
+                self.opt.options[chave] = valor
+
+    def _persistente(self, backend):
+        try:
+            from pyomo.contrib.appsi.solvers import Highs, Cbc
+        except ImportError:
+            return None
+        opt = {'highs': Highs, 'cbc': Cbc}[backend]()
+        if not opt.available():
+            return None
+        opt.config.time_limit = self.tmlim
+        # Sem solução viável (prazo sem incumbente, mestre inviável) o APPSI levantaria RuntimeError ao carregá-la;
+        # a solução é carregada em resolver() só quando existe
+        opt.config.load_solution = False
+        if backend == 'highs' and os.environ.get('OMP_NUM_THREADS'):
+            opt.highs_options = {'threads': int(os.environ['OMP_NUM_THREADS'])}
+        # As restrições novas são informadas explicitamente; não varre o modelo a cada resolução
+        opt.update_config.check_for_new_or_removed_constraints = False
+        opt.update_config.check_for_new_or_removed_vars = False
+        opt.update_config.check_for_new_or_removed_params = False
+        opt.update_config.update_constraints = False
+        opt.update_config.update_named_expressions = False
+        # Variáveis fixadas (custo reduzido) vão ao solver como limites, não como parâmetros que
+        # obrigariam a recalcular os lados direitos de todas as linhas a cada resolução
+        opt.update_config.treat_fixed_vars_as_params = False
+        inicio = time.perf_counter()
+        opt.set_instance(self.modelo)
+        self.historico.append((time.perf_counter() - inicio, 0.0))
+        return opt
+
+    def adicionar(self, restricoes):
+        """Registra restrições recém-criadas (ou reativadas) no modelo."""
+        if self.persistente:
+            self.pendentes_adicionar.extend(restricoes)
+
+    def remover(self, restricoes):
+        """Registra restrições desativadas no modelo."""
+        if self.persistente:
+            self.pendentes_remover.extend(restricoes)
+
+    def resolver(self, tee=False, tmlim=None):
+        """Com tmlim, esta resolução tem esse limite de tempo (s) em vez do informado na construção."""
+        limite = self.tmlim if tmlim is None else max(1.0, tmlim)
+        if self.persistente:
+            self.opt.config.time_limit = limite
+            inicio = time.perf_counter()
+            if self.pendentes_remover:
+                self.opt.remove_constraints(self.pendentes_remover)
+                self.pendentes_remover = []
+            if self.pendentes_adicionar:
+                self.opt.add_constraints(self.pendentes_adicionar)
+                self.pendentes_adicionar = []
+            atualizacao = time.perf_counter() - inicio
+
+            self.opt.config.stream_solver = tee
+            inicio = time.perf_counter()
+            self.ultimo = self.opt.solve(self.modelo)
+            if self.ultimo.best_feasible_objective is not None:
+                self.ultimo.solution_loader.load_vars()
+            resolucao = time.perf_counter() - inicio
+        else:
+            self.opt.options['tmlim'] = int(limite)
+            inicio = time.perf_counter()
+            self.ultimo = self.opt.solve(self.modelo, tee=tee)
+            total = time.perf_counter() - inicio
+            resolucao = min(self.ultimo.solver.time or total, total)
+            atualizacao = total - resolucao
+        self.historico.append((atualizacao, resolucao))
+        return self.ultimo
+
+    @property
+    def tempo_atualizacao(self):
+        return self.historico[-1][0]
+
+    @property
+    def tempo_resolucao(self):
+        return self.historico[-1][1]
+
+    def otimo(self):
+        """Verdadeiro se a última resolução terminou com otimalidade comprovada."""
+        if self.persistente:
+            return self.ultimo.termination_condition.name == 'optimal'
+        return str(self.ultimo.solver.termination_condition) == 'optimal'
+
+    def limites(self):
+        """(LB, UB) da última resolução."""
+        if self.persistente:
+            return self.ultimo.best_objective_bound, self.ultimo.best_feasible_objective
+        return self.ultimo.problem.lower_bound, self.ultimo.problem.upper_bound
+
+    def imprimir_tempos(self):
+        atualizacao = sum(a for a, _ in self.historico)
+        resolucao = sum(r for _, r in self.historico)
+        print(f"Solver: {self.backend}{' (persistente)' if self.persistente else ''}")
+        print(f"Tempo de atualizacao do modelo: {atualizacao:.4f}")
+        print(f"Tempo de resolucao: {resolucao:.4f}")
+
+
+def resolver_com_solucao_inicial(solver, modelo, limite_superior=None, tee=True):
+    """Resolve usando os valores atuais das variáveis como solução inicial.
+
+    Solvers que aceitam solução inicial pelo Pyomo (CBC, CPLEX, Gurobi) recebem
+    warmstart; o GLPK não aceita, então o valor da solução heurística entra
+    como limite superior do objetivo.
+    """
+    if solver.warm_start_capable():
+        return solver.solve(modelo, tee=tee, warmstart=True)
+    if limite_superior is not None and modelo.component('limite_heuristica') is None:
+        modelo.limite_heuristica = Constraint(expr=modelo.objetivo.expr <= limite_superior)
+    return solver.solve(modelo, tee=tee)
@@ -0,0 +1,226 @@
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+
+import numpy as np
+
+
+class FluxoMaximo:
+    """Fluxo máximo (Dinic) sobre os arcos de uma InstanciaSteiner.
+
+    A capacidade de cada arco é o valor de x na solução corrente. Como todo arco
+    a tem o reverso a ^ 1 no grafo, o fluxo é guardado de forma antissimétrica
+    (fluxo[a ^ 1] = -fluxo[a]) e o residual de a é capacidade[a] - fluxo[a].
+    """
+
+    def __init__(self, inst, capacidade, eps=1e-6):
+        self.inst = inst
+        self.capacidade = capacidade
+        self.eps = eps
+
+    def _residual(self, a):
+        return self.capacidade[a] - self.fluxo[a]
+
+    def _niveis(self, s):
+        inst = self.inst
+        nivel = [-1] * inst.n
+        nivel[s] = 0
+        fila = deque([s])
+        while fila:
+            v = fila.popleft()
+            for a in inst.arcos_saida(v):
+                u = inst.cabeca[a]
+                if nivel[u] < 0 and self._residual(a) > self.eps:
+                    nivel[u] = nivel[v] + 1
+                    fila.append(u)
+        return nivel
+
+    def _aumentar(self, s, t, nivel, atual, limite):
+        """Encontra um caminho aumentante no grafo de níveis e envia fluxo por ele."""
+        inst = self.inst
+        caminho = []
+        v = s
+        while v != t:
+            fim = inst.saida_ptr[v + 1]
+            while atual[v] < fim:
+                a = inst.saida[atual[v]]
+                u = inst.cabeca[a]
+                if nivel[u] == nivel[v] + 1 and self._residual(a) > self.eps:
+                    break
+                atual[v] += 1
+            if atual[v] < fim:
+                caminho.append(a)
+                v = u
+                continue
+            # Beco sem saída: retrocede
+            if v == s:
+                return 0
+            nivel[v] = -1
+            v = inst.cauda[caminho.pop()]
+            atual[v] += 1
+        f = min(limite, min(self._residual(a) for a in caminho))
+        for a in caminho:
+            self.fluxo[a] += f
+            self.fluxo[a ^ 1] -= f
+        return f
+
+    def calcular(self, s, t, limite=float('inf')):
+        """Valor do fluxo s-t, interrompido ao atingir limite, e o lado de s do corte mínimo."""
+        self.fluxo = [0.0] * len(self.capacidade)
+        total = 0.0
+        while total < limite - self.eps:
+            nivel = self._niveis(s)
+            if nivel[t] < 0:
+                break
+            atual = self.inst.saida_ptr[:-1]
+            while total < limite - self.eps:
+                f = self._aumentar(s, t, nivel, atual, limite - total)
+                if f <= self.eps:
+                    break
+                total += f
+        lado_s = frozenset(v for v, l in enumerate(self._niveis(s)) if l >= 0)
+        return total, lado_s
+
+    def lado_raiz_reverso(self, t):
+        """Lado da raiz do corte mínimo mais próximo de t (após calcular): os vértices que não alcançam t no residual."""
+        inst = self.inst
+        alcanca = [False] * inst.n
+        alcanca[t] = True
+        fila = deque([t])
+        while fila:
+            v = fila.popleft()
+            for a in inst.arcos_entrada(v):
+                u = inst.cauda[a]
+                if not alcanca[u] and self._residual(a) > self.eps:
+                    alcanca[u] = True
+                    fila.append(u)
+        return frozenset(v for v in range(inst.n) if not alcanca[v])
+
+
+def arcos_do_corte(inst, S):
+    """Ids dos arcos que saem do conjunto S (δ+(S))."""
+    return [a for v in S for a in inst.arcos_saida(v) if inst.cabeca[a] not in S]
+
+
+def processos_padrao():
+    """Processos da separação quando não informados: OMP_NUM_THREADS ou 1.
+
+    Os executores em lote já rodam um job por núcleo e definem OMP_NUM_THREADS
+    de cada job; usar os núcleos todos aqui multiplicaria os processos.
+    """
+    try:
+        return max(1, int(os.environ.get('OMP_NUM_THREADS', 1)))
+    except ValueError:
+        return 1
+
+
+_inst = None
+
+
+def _iniciar(inst):
+    """Inicialização dos processos de separação: a instância é enviada uma vez só."""
+    global _inst
+    _inst = inst
+
+
+def _cortes_terminais(tarefa):
+    """Cortes mínimos raiz-k de um grupo de terminais com capacidades x.
+
+    Devolve o lado da raiz dos cortes com valor menor que 1. Com aninhados > 1,
+    os arcos de cada corte encontrado passam a ter capacidade 1 e o fluxo é
+    recalculado, gerando até `aninhados` cortes disjuntos por terminal. Com
+    reversos, cada fluxo dá também o corte mínimo do lado do terminal, que é
+    outro corte quando o PL é degenerado e o lado da raiz se repete.
+    """
+    x, terminais, eps, aninhados, reversos = tarefa
+    violados = []
+    for k in terminais:
+        capacidade = list(x)
+        fluxo = FluxoMaximo(_inst, capacidade, eps)
+        for _ in range(aninhados):
+            valor, S = fluxo.calcular(_inst.raiz, k, limite=1.0)
+            if valor >= 1 - eps:
+                break
+            violados.append(S)
+            if reversos:
+                violados.append(fluxo.lado_raiz_reverso(k))
+            for a in arcos_do_corte(_inst, S):
+                capacidade[a] = 1.0
+    return violados
+
+
+class Separador:
+    """Separação dos cortes dirigidos a partir de uma cópia de x em NumPy.
+
+    componentes() trata soluções inteiras: une por union-find os extremos dos
+    arcos com x = 1 e devolve, para cada componente sem a raiz que tenha
+    terminal, o complemento dela (lado da raiz do corte violado). fracionario()
+    resolve um corte mínimo por terminal, com os terminais divididos em grupos
+    resolvidos em paralelo num pool de processos que recebe a instância uma vez
+    só. Guarda o tempo de cada rodada.
+    """
+
+    def __init__(self, inst, processos=None, aninhados=1, reversos=False, eps=1e-6):
+        self.inst = inst
+        self.eps = eps
+        self.aninhados = aninhados
+        self.reversos = reversos
+        self.processos = max(1, min(processos or processos_padrao(), len(inst.T_r)))
+        self.pool = None
+        self.cauda = np.asarray(inst.cauda, dtype=np.int64)
+        self.cabeca = np.asarray(inst.cabeca, dtype=np.int64)
+        self.terminais = np.asarray(inst.T_r, dtype=np.int64)
+        self.tempos = []  # Duração de cada rodada de separação
+
+    @property
+    def tempo(self):
+        return sum(self.tempos)
+
+    @property
+    def rodadas(self):
+        return len(self.tempos)
+
+    def componentes(self, x):
+        """Complementos das componentes (arcos com x = 1, sem direção) que têm terminal mas não a raiz."""
+        inicio = time.perf_counter()
+        x = np.asarray(x)
+        pai = list(range(self.inst.n))
+
+        def raiz(v):
+            while pai[v] != v:
+                pai[v] = pai[pai[v]]
+                v = pai[v]
+            return v
+
+        for a in np.flatnonzero(x > 1 - self.eps):
+            pai[raiz(int(self.cauda[a]))] = raiz(int(self.cabeca[a]))
+        rotulos = np.fromiter((raiz(v) for v in range(self.inst.n)), dtype=np.int64, count=self.inst.n)
+        isolados = set(rotulos[self.terminais].tolist()) - {int(rotulos[self.inst.raiz])}
+        conjuntos = [np.flatnonzero(rotulos != rotulo).tolist() for rotulo in sorted(isolados)]
+        self.tempos.append(time.perf_counter() - inicio)
+        return conjuntos
+
+    def fracionario(self, x):
+        """Conjuntos S distintos dos terminais cujo corte mínimo raiz-k com capacidades x vale menos que 1."""
+        inicio = time.perf_counter()
+        x = np.asarray(x, dtype=float).tolist()  # Listas são mais rápidas que arrays no Dinic em Python
+        terminais = list(self.inst.T_r)
+        if self.processos == 1:
+            _iniciar(self.inst)
+            grupos = [_cortes_terminais((x, terminais, self.eps, self.aninhados, self.reversos))]
+        else:
+            if self.pool is None:
+                self.pool = Pool(self.processos, initializer=_iniciar, initargs=(self.inst,))
+            tamanho = -(-len(terminais) // self.processos)
+            tarefas = [(x, terminais[i:i + tamanho], self.eps, self.aninhados, self.reversos) for i in range(0, len(terminais), tamanho)]
+            grupos = self.pool.map(_cortes_terminais, tarefas)
+        cortes = list(dict.fromkeys(S for grupo in grupos for S in grupo))
+        self.tempos.append(time.perf_counter() - inicio)
+        return cortes
+
+    def fechar(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
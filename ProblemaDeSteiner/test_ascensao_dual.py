@@ -0,0 +1,20 @@
+from ascensao_dual import AscensaoDual
+from heuristicas import SolucaoHeuristica
+from matriz import resolver_matricial
+
+
+def test_ascensao_dual_e_limite_inferior(caso):
+    inst, otimo = caso
+    dual = AscensaoDual(inst)
+    assert dual.limite <= otimo + 1e-6
+    assert min(dual.custo_reduzido) >= -1e-9
+
+
+def test_fixacao_por_custo_reduzido_preserva_o_otimo(caso):
+    inst, otimo = caso
+    dual = AscensaoDual(inst)
+    heuristica = SolucaoHeuristica(inst, limite_tempo=1.0)
+    fixados = dual.fixar(heuristica.valor)
+    assert fixados.isdisjoint(heuristica.arcos)
+    solucao, _, _ = resolver_matricial('UnicaMercadoria', inst, fixados, tee=False)
+    assert round(solucao.valor) == otimo
@@ -0,0 +1,62 @@
+import os
+import time
+
+from cache_resultados import CacheResultados, chave_cache, versao_fonte
+
+
+def escrever(caminho, texto):
+    with open(caminho, 'w') as arquivo:
+        arquivo.write(texto)
+
+
+def test_versao_muda_com_o_codigo_importado(tmp_path):
+    script = os.path.join(tmp_path, 'MTZ.py')
+    escrever(script, 'import numpy as np\nfrom reducoes import reduzir\n')
+    escrever(os.path.join(tmp_path, 'reducoes.py'), 'def reduzir(inst):\n    return inst\n')
+    escrever(os.path.join(tmp_path, 'outro.py'), 'x = 1\n')
+    versao = versao_fonte(script)
+
+    # Módulo que o script não importa não muda a versão
+    escrever(os.path.join(tmp_path, 'outro.py'), 'x = 2\n')
+    assert versao_fonte(script) == versao
+
+    # Módulo local importado muda
+    escrever(os.path.join(tmp_path, 'reducoes.py'), 'def reduzir(inst):\n    return None\n')
+    assert versao_fonte(script) != versao
+
+
+def test_chave_depende_de_cada_parte():
+    chave = chave_cache('instancia', 'MTZ.py', 'v1', {'montagem': 'matriz', 'tmlim': 1800})
+    assert chave == chave_cache('instancia', 'MTZ.py', 'v1', {'tmlim': 1800, 'montagem': 'matriz'})
+    assert chave != chave_cache('instancia', 'MTZ.py', 'v2', {'montagem': 'matriz', 'tmlim': 1800})
+    assert chave != chave_cache('instancia', 'MTZ.py', 'v1', {'montagem': 'pyomo', 'tmlim': 1800})
+    assert chave != chave_cache('outra', 'MTZ.py', 'v1', {'montagem': 'matriz', 'tmlim': 1800})
+
+
+def test_guardar_obter_restaurar(tmp_path):
+    cache = CacheResultados(os.path.join(tmp_path, 'cache'))
+    log = os.path.join(tmp_path, 'log.txt')
+    escrever(log, 'Valor da funcao objetivo: 82\n')
+    assert cache.obter('abc') is None
+
+    cache.guardar('abc', {'status': 'optimal'}, [log, os.path.join(tmp_path, 'inexistente.txt')])
+    assert cache.obter('abc') == {'status': 'optimal'}
+    destino = os.path.join(tmp_path, 'restaurado.txt')
+    assert cache.restaurar('abc', 'log.txt', destino)
+    assert cache.ler('abc', 'log.txt') == 'Valor da funcao objetivo: 82\n'
+    assert not cache.restaurar('abc', 'inexistente.txt', destino)
+
+
+def test_podar_apaga_as_menos_usadas(tmp_path):
+    cache = CacheResultados(os.path.join(tmp_path, 'cache'), limite_mb=1)
+    log = os.path.join(tmp_path, 'log.txt')
+    escrever(log, 'x' * 400 * 1024)
+    antes = time.time() - 60
+    for atraso, chave in ((10, 'a'), (0, 'b')):
+        cache.guardar(chave, {}, [log])
+        os.utime(cache._entrada(chave), (antes - atraso, antes - atraso))
+    cache.obter('a')  # A consulta torna 'a', a mais antiga, a usada mais recentemente
+
+    cache.guardar('c', {}, [log])
+    assert cache.obter('b') is None
+    assert cache.obter('a') is not None and cache.obter('c') is not None
@@ -0,0 +1,66 @@
+import csv
+import os
+
+import pytest
+
+import criar_compactas_csv
+import criar_cortes_csv
+import MTZ
+import UnicaMercadoria
+from registro import Registro
+
+
+def ler_csv(caminho):
+    with open(caminho, newline='') as arquivo:
+        return list(csv.DictReader(arquivo, delimiter=';'))
+
+
+def executar(modulo, formulacao, inst, teste, caminho):
+    """Roda a formulação pela montagem matricial e grava o registro em caminho, como com --registro."""
+    opcoes = modulo.argumentos().parse_args(['--montagem', 'matriz'])
+    modulo.resolver(inst, opcoes, Registro(formulacao, caminho, teste, salvar_na_saida=False)).salvar()
+
+
+def test_compactas_csv_a_partir_dos_registros(tmp_path, ler_teste):
+    registros = os.path.join(tmp_path, 'resultados.jsonl')
+    otimos = {}
+    for teste in ('1', '5'):
+        inst, otimos[teste] = ler_teste(teste)
+        executar(MTZ, 'MTZ', inst, teste, registros)
+        executar(UnicaMercadoria, 'UnicaMercadoria', inst, teste, registros)
+    executar(MTZ, 'MTZ', ler_teste('1')[0], '1', registros)  # Execução repetida substitui a anterior
+    Registro('PlanosDeCorte', registros, '1', salvar_na_saida=False).salvar()
+    with open(registros, 'a') as arquivo:
+        arquivo.write('{"formulacao": "MTZ", "tes')  # Linha truncada por um job interrompido
+
+    saida = os.path.join(tmp_path, 'compacts.csv')
+    criar_compactas_csv.escrever_csv(registros, saida)
+    linhas = ler_csv(saida)
+    assert sorted((l['formulation'], l['test']) for l in linhas) == [
+        ('MTZ', '1'), ('MTZ', '5'), ('UnicaMercadoria', '1'), ('UnicaMercadoria', '5')]
+    for linha in linhas:
+        otimo = otimos[linha['test']]
+        assert float(linha['UB']) == pytest.approx(otimo)
+        lbr = float(linha['relaxation (LBR)'])
+        assert lbr <= otimo + 1e-6
+        assert linha['relaxation gap (%)'] == f"{(otimo - lbr) / lbr * 100:.2f}%"
+        assert float(linha['runtime (s)']) >= 0
+
+
+def test_cortes_csv_so_com_planos_de_corte(tmp_path):
+    registros = os.path.join(tmp_path, 'resultados.jsonl')
+    for iteracoes in (3, 7):
+        registro = Registro('PlanosDeCorte', registros, '2', salvar_na_saida=False)
+        registro.definir(iteracoes=iteracoes, cortes=40, fases={'resolucao': 1.5})
+        registro.salvar()
+    Registro('MTZ', registros, '2', salvar_na_saida=False).salvar()
+
+    saida = os.path.join(tmp_path, 'cuts.csv')
+    criar_cortes_csv.escrever_csv(registros, saida)
+    assert ler_csv(saida) == [{'formulation': 'PlanosDeCorte', 'test': '2', 'iterations': '7', 'inserted cuts': '40', 'runtime (s)': '1.5'}]
+
+
+def test_gap_sem_relaxacao():
+    assert criar_compactas_csv.calculate_gap(82, None) is None
+    assert criar_compactas_csv.calculate_gap(None, 80) is None
+    assert criar_compactas_csv.calculate_gap(88, 80) == pytest.approx(10.0)
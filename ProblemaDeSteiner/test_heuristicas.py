@@ -0,0 +1,27 @@
+from heuristicas import SolucaoHeuristica, custo
+from reducoes import Reducao
+
+
+def test_heuristica_e_limite_superior(caso):
+    inst, otimo = caso
+    solucao = SolucaoHeuristica(inst, limite_tempo=1.0)
+    assert solucao.valor >= otimo
+    assert solucao.valor == inst.custo_fixo + custo(inst, solucao.arestas)
+    for nome, valor in solucao.custos.items():
+        assert valor >= otimo, nome
+
+    # A árvore orientada a partir da raiz alcança todos os terminais, com um arco por aresta
+    assert all(t in solucao.pai for t in inst.terminais)
+    assert len(solucao.arcos) == len(solucao.arestas)
+
+
+def test_heuristica_na_instancia_reduzida(caso):
+    inst, otimo = caso
+    reducao = Reducao(inst)
+    if reducao.resolvida:
+        return
+    reduzida = reducao.instancia
+    solucao = SolucaoHeuristica(reduzida, limite_tempo=1.0)
+    assert solucao.valor >= otimo
+    _, valor = reducao.expandir([reduzida.arcos[a] for a in solucao.arcos])
+    assert valor == solucao.valor
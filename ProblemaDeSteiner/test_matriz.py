@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from ascensao_dual import AscensaoDual
+from heuristicas import SolucaoHeuristica
+from matriz import FORMULACOES, ModeloMatricial, resolver_matricial
+from reducoes import Reducao
+
+
+@pytest.mark.parametrize('formulacao', sorted(FORMULACOES))
+def test_formulacao_matricial_acha_o_otimo(formulacao, caso):
+    """Mesmo caminho de --montagem matriz: redução, heurística, fixação pela ascensão dual."""
+    inst, otimo = caso
+    reducao = Reducao(inst)
+    if reducao.resolvida:
+        pytest.skip('resolvida pela reducao')
+    inst = reducao.instancia
+    heuristica = SolucaoHeuristica(inst, limite_tempo=1.0)
+    fixados = AscensaoDual(inst).fixar(heuristica.valor)
+    solucao, arcos, _ = resolver_matricial(formulacao, inst, fixados, heuristica, tee=False, relaxacao=True)
+    assert solucao.status.lower() == 'optimal'
+    assert round(solucao.valor) == otimo
+    assert solucao.limite_inferior == pytest.approx(otimo)
+    assert solucao.relaxacao <= otimo + 1e-6
+    assert reducao.expandir(arcos)[1] == otimo
+
+
+def test_mps_escrito_da_o_mesmo_otimo(caso, tmp_path):
+    """O MPS escrito (o que o glpsol lê) descreve o mesmo problema entregue direto ao HiGHS."""
+    highspy = pytest.importorskip('highspy')
+    inst, otimo = caso
+    caminho = os.path.join(tmp_path, 'modelo.mps')
+    FORMULACOES['UnicaMercadoria'](inst).escrever_mps(caminho)
+    highs = highspy.Highs()
+    highs.setOptionValue('output_flag', False)
+    highs.readModel(caminho)
+    highs.run()
+    assert round(highs.getInfo().objective_function_value + inst.custo_fixo) == otimo
+
+
+@pytest.mark.skipif(shutil.which('glpsol') is None, reason='glpsol nao instalado')
+def test_glpsol_concorda_com_highs(caso):
+    inst, otimo = caso
+    solucao = FORMULACOES['MTZ'](inst)._resolver_glpk(1800, tee=False)
+    assert solucao.status == 'optimal' and round(solucao.valor) == otimo
+
+
+def test_relaxar_so_muda_a_integralidade():
+    modelo = ModeloMatricial([1, 2], [0, 0], [1, 1], [True, True])
+    modelo.adicionar_linhas([0, 0], [0, 1], 1, 'G', [1])
+    relaxado = modelo.relaxar()
+    assert not relaxado.inteira.any() and modelo.inteira.all()
+    assert relaxado.num_linhas == modelo.num_linhas and relaxado.nnz() == modelo.nnz()
@@ -0,0 +1,76 @@
+import pytest
+
+from PlanosDeCorte import construir_modelo
+from pool_cortes import PoolDeCortes
+from separacao import arcos_do_corte
+
+
+class ResolvedorFalso:
+    """Guarda as restrições repassadas pelo pool, como faria um Resolvedor persistente."""
+
+    def __init__(self):
+        self.adicionadas, self.removidas = [], []
+
+    def adicionar(self, restricoes):
+        self.adicionadas += restricoes
+
+    def remover(self, restricoes):
+        self.removidas += restricoes
+
+
+@pytest.fixture
+def pool(ler_teste):
+    """Pool sobre o modelo do PlanosDeCorte de tests/1.txt."""
+    inst, _ = ler_teste(1)
+    return lambda idade_max: (PoolDeCortes(construir_modelo(inst), inst, idade_max, resolvedor=ResolvedorFalso()), inst)
+
+
+def test_corte_repetido_nao_entra_duas_vezes(pool):
+    cortes, inst = pool(idade_max=2)
+    S = [inst.raiz, inst.T_r[0]]
+    restricoes = len(cortes.modelo.restricoes)
+
+    assert cortes.adicionar(S)
+    assert not cortes.adicionar(list(reversed(S)))  # Mesma máscara em outra ordem
+    assert (cortes.inseridos, cortes.duplicados) == (1, 1)
+    assert len(cortes.modelo.restricoes) == restricoes + 1
+    assert len(cortes.resolvedor.adicionadas) == 1
+
+
+def test_corte_folgado_envelhece_e_volta_do_pool(pool):
+    cortes, inst = pool(idade_max=2)
+    # Todos os vértices menos um terminal com mais de um arco de entrada: o corte tem vários arcos
+    k = next(k for k in inst.T_r if len(inst.arcos_entrada(k)) > 1)
+    S = [v for v in range(inst.n) if v != k]
+    cortes.adicionar(S)
+    ids = arcos_do_corte(inst, frozenset(S))
+    restricao = cortes.cortes[cortes.mascara(S)][0]
+
+    folgado = [0.0] * len(inst.arcos)
+    for a in ids:
+        folgado[a] = 1.0
+    justo = [0.0] * len(inst.arcos)
+    justo[ids[0]] = 1.0
+
+    # Uma rodada justa zera a idade; só idade_max + 1 rodadas folgadas seguidas desativam o corte
+    cortes.envelhecer(folgado)
+    cortes.envelhecer(justo)
+    cortes.envelhecer(folgado)
+    cortes.envelhecer(folgado)
+    assert restricao.active and cortes.ativos == 1
+    cortes.envelhecer(folgado)
+    assert not restricao.active and cortes.ativos == 0
+    assert cortes.removidos == 1 and cortes.resolvedor.removidas == [restricao]
+
+    # Separado de novo, o corte é reativado sem criar outra restrição
+    assert cortes.adicionar(S)
+    assert restricao.active and (cortes.inseridos, cortes.reaproveitados) == (1, 1)
+    assert len(cortes.cortes) == 1
+
+
+def test_idade_zero_desliga_o_envelhecimento(pool):
+    cortes, inst = pool(idade_max=0)
+    cortes.adicionar([inst.raiz])
+    for _ in range(5):
+        cortes.envelhecer([1.0] * len(inst.arcos))
+    assert cortes.ativos == 1 and cortes.removidos == 0
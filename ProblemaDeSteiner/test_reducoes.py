@@ -0,0 +1,40 @@
+from matriz import resolver_matricial
+from reducoes import Reducao
+
+
+def conecta_terminais(inst, arestas):
+    """Verdadeiro se as arestas (u, v, peso) ligam todos os terminais da instância."""
+    pai = list(range(inst.n))
+
+    def raiz(v):
+        while pai[v] != v:
+            v = pai[v]
+        return v
+
+    for u, v, _ in arestas:
+        pai[raiz(u)] = raiz(v)
+    return len({raiz(t) for t in inst.terminais}) == 1
+
+
+def test_reducao_preserva_o_otimo(caso):
+    inst, otimo = caso
+    reducao = Reducao(inst)
+    reduzida = reducao.instancia
+    assert reduzida.n <= inst.n and reduzida.m <= inst.m
+    if reducao.resolvida:
+        assert reducao.custo_fixo == otimo
+        arestas, custo = reducao.expandir([])
+        assert custo == otimo and conecta_terminais(inst, arestas)
+        return
+
+    # O ótimo da instância reduzida já inclui o custo das arestas fixadas
+    solucao, arcos, _ = resolver_matricial('MTZ', reduzida, tee=False)
+    assert round(solucao.valor) == otimo
+
+    # expandir leva a árvore de volta ao grafo original com o mesmo custo
+    arestas, custo = reducao.expandir(arcos)
+    assert custo == otimo
+    originais = {(inst.cauda[2 * e], inst.cabeca[2 * e], inst.peso[2 * e]) for e in range(inst.m)}
+    assert set(arestas) <= originais
+    assert len(arestas) == len(set(arestas))
+    assert conecta_terminais(inst, arestas)
@@ -0,0 +1,94 @@
+from utils.vrp_utils import print_routes, plot_routes
+from utils.vrp_instance import read_instance
+from utils.vrp_heuristics import initial_routes
+from utils.column_generation import ColumnGeneration
+from utils.run_record import RunRecord
+import argparse
+import time
+import sys
+
+# Configurar o Argument Parser
+parser = argparse.ArgumentParser(description='Resolução do VRP por geração de colunas (rotas) com price-and-branch e plotagem das rotas.')
+parser.add_argument('--path', type=str, required=False, help='Caminho para salvar a imagem das rotas.')
+parser.add_argument('--plot', choices=['auto', 'defer', 'off'], default='auto',
+                    help='auto: salva a imagem em --path (sem janela) ou abre a janela; defer: só grava as rotas em .json ao lado de --path, para a imagem ser feita depois; off: sem gráfico.')
+parser.add_argument('--beam', type=int, default=8, help='Rótulos mantidos por ponto no pricing heurístico (0: só o pricing exato).')
+parser.add_argument('--columns', type=int, default=20, help='Colunas acrescentadas por veículo em cada rodada.')
+parser.add_argument('--heuristic', choices=['start', 'off'], default='start',
+                    help='start: rotas da heurística min-max como colunas iniciais, solução inicial do price-and-branch e resposta se ele não terminar.')
+parser.add_argument('--heuristic-time', type=float, default=30, help='Limite de tempo da busca local da heurística (s).')
+parser.add_argument('--record', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução (tempos por fase, memória, resultado).')
+parser.add_argument('--test', default=None, help='Nome do teste gravado no registro.')
+parser.add_argument('--profile', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
+args = parser.parse_args()
+if args.plot == 'defer' and not args.path:
+    parser.error('--plot defer precisa de --path')
+
+record = RunRecord('CG', args.record, args.test)
+record.profile(args.profile)
+tmlim = 30 * 60
+deadline = time.perf_counter() + tmlim
+
+# Leitura da entrada
+with record.phase('read'):
+    inst = read_instance()
+n, v = inst.n, inst.m
+V, K = inst.V, inst.K  # Pontos de visita e veículos
+record.instance(V, K)
+
+# Cálculo das distâncias entre os pontos
+with record.phase('distances'):
+    d = inst.compute_distances()
+
+# Heurística: rotas viáveis como colunas iniciais
+start = initial_routes(inst, record, args.heuristic_time) if args.heuristic == 'start' else None
+
+# Relaxação linear por geração de colunas
+cg = ColumnGeneration(inst, beam=args.beam, limit=args.columns)
+with record.phase('column_generation'):
+    lp_value = cg.solve_relaxation(start[0] if start else (), deadline - time.perf_counter())
+stats = cg.stats
+record.add_time('pricing', stats['pricing_time'])
+record.add_time('master', stats['master_time'])
+infeasible = cg.artificial() and stats['lp_bound'] is not None
+
+# Price-and-branch: particionamento inteiro sobre as colunas geradas
+result = None
+if not infeasible:
+    with record.phase('solve'):
+        result = cg.solve_integer(start, max(deadline - time.perf_counter(), 1))
+bound = stats['lp_bound']
+use_heuristic = start is not None and (result is None or result[1] > start[1])
+routes, objective = start if use_heuristic else result if result is not None else (None, None)
+# Ótima quando o valor inteiro alcança o limite da relaxação (com pricing exato)
+optimal = objective is not None and bound is not None and objective <= bound + 1e-6 * max(1.0, bound)
+record.set(status='infeasible' if infeasible else 'optimal' if optimal else 'heuristic' if use_heuristic else
+           'not optimal' if objective is not None else 'no solution', objective=objective, lp_bound=bound, lp_value=lp_value,
+           columns=stats['columns'], iterations=stats['iterations'], exact_pricing=stats['exact_pricing'],
+           pricing_time=stats['pricing_time'], master_time=stats['master_time'], mip_status=stats.get('mip_status'), solver='highs')
+
+print("\nResumo da Execucao:")
+print(f"Geracao de colunas: {stats['iterations']} rodadas ({stats['exact_pricing']} com pricing exato) | {stats['columns']} colunas")
+print(f"Relaxacao linear: {lp_value:.4f} | Limite inferior: {'-' if bound is None else f'{bound:.4f}'}")
+print(f"Tempo do mestre: {stats['master_time']:.4f} | Tempo de pricing: {stats['pricing_time']:.4f} | "
+      f"Price-and-branch: {stats.get('mip_status', '-')} em {stats.get('mip_time', 0.0):.4f}")
+print('--------------------------------------')
+if objective is None:
+    print("Nenhuma solução viavel encontrada.")
+    sys.exit()
+if optimal:
+    print("\nSolução Otima Encontrada")
+    print('-------------------------------------')
+if use_heuristic:
+    print("\nSolucao da heuristica")
+    print('-------------------------------------')
+print(f"Tempo para cobertura total: {objective:.2f} segundos")
+for i in range(v):
+    print(f"Veículo {i} Tempo Maximo de Voo {K[i]['b']/60:.2f} horas | Velocidade {K[i]['s']:.2f} m/s | Capacidade de cobertura {K[i]['c']/1000:.2f} km")
+print('-------------------------------------')
+
+# Imprimir as rotas de cada veículo
+with record.phase('routes'):
+    print_routes(routes, K, d)
+with record.phase('plot'):
+    plot_routes(routes, K, V, d, path=args.path, mode=args.plot)
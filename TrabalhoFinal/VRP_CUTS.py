@@ -1,157 +1,192 @@
-import math
-from utils.vrp_utils import print_routes, plot_routes
-from pyomo.environ import ConcreteModel, Var, Objective, NonNegativeReals, Boolean, minimize, ConstraintList, SolverFactory, Binary
+from utils.vrp_utils import print_routes, plot_routes, routes_from_model
+from utils.vrp_instance import read_instance
+from utils.matrix_model import build_vrp
+from utils.vrp_heuristics import initial_routes, load_start
+from utils.subtour_separation import SubtourSeparator
+from utils.solver_backend import SolverBackend
+from utils.run_record import RunRecord
+from pyomo.environ import ConcreteModel, Var, Objective, NonNegativeReals, Boolean, minimize, ConstraintList, Binary, UnitInterval
 import numpy as np  
-import networkx as nx
-import time 
 import argparse
 
 # Configurar o Argument Parser
 parser = argparse.ArgumentParser(description='Resolução do VRP e plotagem das rotas.')
 parser.add_argument('--path', type=str, required=False, help='Caminho para salvar a imagem das rotas.')
+parser.add_argument('--plot', choices=['auto', 'defer', 'off'], default='auto',
+                    help='auto: salva a imagem em --path (sem janela) ou abre a janela; defer: só grava as rotas em .json ao lado de --path, para a imagem ser feita depois; off: sem gráfico.')
+parser.add_argument('--solver', choices=['highs', 'cbc', 'glpk'], default='highs', help='Solver persistente (highs/cbc) ou glpk; sem o persistente instalado usa o GLPK.')
+parser.add_argument('--separation', choices=['fractional', 'integer'], default='fractional',
+                    help='fractional: corta subcircuitos na relaxação linear (corte mínimo sobre x agregado) antes das resoluções inteiras; integer: só nas soluções inteiras.')
+parser.add_argument('--heuristic', choices=['start', 'off'], default='start',
+                    help='start: rotas da heurística min-max como solução inicial das resoluções inteiras e como resposta se o solver não terminar.')
+parser.add_argument('--heuristic-time', type=float, default=30, help='Limite de tempo da busca local da heurística (s).')
+parser.add_argument('--record', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução (tempos por fase, memória, resultado).')
+parser.add_argument('--test', default=None, help='Nome do teste gravado no registro.')
+parser.add_argument('--profile', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
 args = parser.parse_args()
+if args.plot == 'defer' and not args.path:
+    parser.error('--plot defer precisa de --path')
 
-# Dados de entrada
-V = {}  # Conjunto de pontos de visita
-K = {}  # Conjunto de veículos
-d = {}  # Distâncias das arestas
+record = RunRecord('CUTS', args.record, args.test)
+record.profile(args.profile)
 
 # Leitura da entrada
-n, v = map(int, input("Digite o número de vértices e o número de veículos: ").split())  # Número de vértices e número de veículos
-
-# Leitura das coordenadas dos vértices
-for i in range(n):
-    x, y = map(int, input(f"Digite as coordenadas do ponto {i + 1}: ").split())
-    V[i] = (x, y)
-
-# Leitura dos veículos
-for i in range(v):
-    b, s = map(float, input(f"Digite o tempo de bateria (m) e a velocidade do veículo {i + 1} (m/s) ").split())
-    K[i] = {'b': b, 's': s, 'c': s*60*b}
+with record.phase('read'):
+    inst = read_instance()
+n, v = inst.n, inst.m
+V, K = inst.V, inst.K  # Pontos de visita e veículos
+record.instance(V, K)
 
 # Cálculo das distâncias entre os pontos
-for i in range(n):
-    for j in range(n):
-        if i != j:
-            d[(i, j)] = math.sqrt((V[i][0] - V[j][0])**2 + (V[i][1] - V[j][1])**2)
-
-
-# Criando o modelo
-model = ConcreteModel()
+with record.phase('distances'):
+    d = inst.compute_distances()
 
-# Variáveis binárias que determinam se o veículo k viaja do ponto i ao ponto j
-model.x = Var(((i, j, k) for k in K for i in V for j in V if i != j), within=Boolean, initialize=0)
+# Heurística: rotas viáveis para a solução inicial
+start = initial_routes(inst, record, args.heuristic_time) if args.heuristic == 'start' else None
 
-# Variáveis y determina se o ponto i é visitado pelo veículo k
-model.y = Var(V.keys(), K, within=Binary, initialize=0)
+# Criando o modelo: as restrições vêm da matriz de build_vrp (sem MTZ), montada com arrays de arcos
+with record.phase('build'):
+    matrix = build_vrp(inst, mtz=False)
+    model = ConcreteModel()
 
-# Variável auxiliar para o tempo máximo de viagem
-model.max_time = Var(within=NonNegativeReals, initialize=0)
+    # Variáveis binárias que determinam se o veículo k viaja do ponto i ao ponto j
+    model.x = Var(inst.x_index(), within=Boolean, initialize=0)
 
-# Função objetivo: minimizar o tempo máximo de cobertura de todos os pontos
-model.obj = Objective(expr=model.max_time, sense=minimize)
+    # Variáveis y determina se o ponto i é visitado pelo veículo k
+    model.y = Var(V.keys(), K, within=Binary, initialize=0)
 
-# Adicionando as restrições ao modelo
-model.cnst = ConstraintList()
+    # Variável auxiliar para o tempo máximo de viagem
+    model.max_time = Var(within=NonNegativeReals, initialize=0)
 
-# Cada ponto deve ser visitado exatamente uma vez por algum veículo, exceto o depósito
-for i in V:
-    if i == 0:   
-        # Cada veículo deve sair do depósito e retornar ao depósito
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j for k in K) == len(K))
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j for k in K) == len(K))
-    else:
-        #Se um veiculo chega no ponto i, ele deve sair do ponto i
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j for k in K) == 1)
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j for k in K) == 1)
-    for k in K:
-        # Se o veículo k visita o ponto i, então y[i, k] = 1
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j) == model.y[i, k])
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j) == model.y[i, k])
+    # Função objetivo: minimizar o tempo máximo de cobertura de todos os pontos
+    model.obj = Objective(expr=model.max_time, sense=minimize)
 
+    # Restrições na ordem das linhas da matriz: graus de saída e entrada, y, capacidade e tempo máximo por veículo
+    model.cnst = ConstraintList()
+    columns = list(model.x.values()) + [model.y[i, k] for k in K for i in V] + [model.max_time]
+    matrix.add_to_pyomo(columns, model.cnst)
 
-# Tempo de viagem não pode exceder a capacidade maxima do veículo e o tempo maximo 
-for k in K:
-    model.cnst.add(sum(d[i, j] * model.x[i, j, k] for i in V for j in V if i != j) <= K[k]['c'])
-    model.cnst.add(sum(d[i, j] * model.x[i, j, k] / K[k]['s'] for i in V for j in V if i != j) <= model.max_time)
-            
+    model.subtour_elimination = ConstraintList()
 
-model.subtour_elimination = ConstraintList()
 # Eliminação de subcircuito
-def find_arcs(model, V, K):
-    arcs = []
-    for i in V:
-        for j in V:
-            if i != j:
-                for k in K:
-                    if np.isclose(model.x[i, j, k].value, 1):
-                        arcs.append((i, j))
-    return arcs
-
-def find_subtours(arcs):
-    G = nx.DiGraph(arcs)
-    subtours = list(nx.strongly_connected_components(G))
-    return subtours
-
-def eliminate_subtours(model, subtours, V, K):
-    proceed = False
-    for S in subtours:
-        if 0 not in S:
-            proceed = True
-            Sout = {i for i in V if i not in S}
-            for h in S:
-                for k in K:
-                    model.subtour_elimination.add(
-                      model.y[h, k] <= sum(model.x[i, j, k] for i in S for j in Sout)
-                    )
-    return proceed
-
-def solve_step(model, solver, V, K):
-    sol = solver.solve(model, tee=True)
-    arcs = find_arcs(model, V, K)
-    subtours = find_subtours(arcs)
-    time.sleep(0.1)
-    proceed = eliminate_subtours(model, subtours, V, K)
-    return sol, proceed 
-
-def solve(model, solver, V, K, tmlim=30*60):
+def solution_arrays(model, inst):
+    """x por veículo e arco (ordem de inst.tail) e y por veículo e ponto, lidos de uma vez na ordem das colunas."""
+    x = np.fromiter((var.value or 0.0 for var in model.x.values()), dtype=float, count=len(model.x))
+    y = np.array([[model.y[i, k].value or 0.0 for i in inst.V] for k in inst.K])
+    return x.reshape(inst.m, -1), y
+
+def eliminate_subtours(model, cuts, separator):
+    """Cortes (S, k, h) do separador: y[h, k] <= x_k(δ+(S))."""
+    inst = separator.inst
+    new_cuts = []
+    arcs = {}
+    for S, k, h in cuts:
+        if S not in arcs:
+            cut = separator.cut_arcs(S)
+            arcs[S] = list(zip(inst.tail[cut].tolist(), inst.head[cut].tolist()))
+        new_cuts.append(model.subtour_elimination.add(model.y[h, k] <= sum(model.x[i, j, k] for i, j in arcs[S])))
+    return new_cuts
+
+def relax(model, relaxed):
+    """Troca o domínio de x e y entre [0, 1] e binário."""
+    for var in model.x.values():
+        var.domain = UnitInterval if relaxed else Boolean
+    for var in model.y.values():
+        var.domain = UnitInterval if relaxed else Binary
+
+def solve_relaxation(model, backend, separator, record, tmlim):
+    """Rodadas de LP com separação fracionária até nenhum corte violado; devolve (rodadas, limite inferior, tempo)."""
+    relax(model, True)
+    rounds, tm = 0, 0
+    while True:
+        backend.solve(tee=False)
+        tm += backend.solve_time
+        rounds += 1
+        with record.phase('separation'):
+            new_cuts = eliminate_subtours(model, separator.fractional(*solution_arrays(model, separator.inst)), separator)
+        backend.add_constraints(new_cuts)
+        print(f"Relaxacao {rounds}: limite {model.obj():.4f} | cortes violados {len(new_cuts)} | "
+              f"resolucao {backend.solve_time:.4f} s | separacao {separator.times[-1]:.4f} s")
+        if not new_cuts or tm >= tmlim:
+            break
+    bound = model.obj()
+    relax(model, False)
+    return rounds, bound, tm
+
+def solve_step(model, backend, separator, record, start=None):
+    if start is not None:
+        # A solução da heurística não tem subcircuitos: continua viável depois de qualquer corte
+        load_start(model, separator.inst, *start)
+    sol = backend.solve(tee=True, warmstart=start is not None)
+    with record.phase('separation'):
+        new_cuts = eliminate_subtours(model, separator.integer(*solution_arrays(model, separator.inst)), separator)
+    backend.add_constraints(new_cuts)
+    return sol, bool(new_cuts)
+
+def solve(model, backend, inst, record, tmlim=30*60, fractional=True, start=None):
+    separator = SubtourSeparator(inst)
     tm = 0
+    if fractional:
+        lp_rounds, lp_bound, tm = solve_relaxation(model, backend, separator, record, tmlim)
+        lp_cuts = len(separator.pool)
+        record.set(lp_rounds=lp_rounds, lp_bound=lp_bound, lp_cuts=lp_cuts)
     cuts = 0
     proceed = True
     while proceed:
-        sol, proceed = solve_step(model, solver, V, K)
-        tm += sol.solver.time
+        sol, proceed = solve_step(model, backend, separator, record, start)
+        tm += backend.solve_time
         cuts +=1
+        print(f"Iteracao {cuts}: atualizacao do modelo {backend.update_time:.4f} s | resolucao {backend.solve_time:.4f} s")
         if tm >= tmlim:
             break
     
     print("\nResumo da Execucao:")
     print(f'{sol}\n--------------------------------------')
+    if fractional:
+        print(f"Relaxacao linear: {lp_rounds} rodadas | limite {lp_bound:.4f} | {lp_cuts} cortes")
     print("Tempo total de execucao: ", tm)
     print("Numero de cortes: ", cuts)	
-    return sol
+    print(f"Cortes de subcircuito: {len(separator.pool)} | Tempo de separacao: {separator.time:.4f}")
+    backend.print_times()
+    record.add_time('update', sum(u for u, _ in backend.history))
+    record.add_time('solve', sum(s for _, s in backend.history))
+    record.set(iterations=cuts, cuts=len(model.subtour_elimination), solver=backend.backend, separation_time=separator.time)
+    return sol, not proceed
 
 # Resolver o modelo
-solver = SolverFactory('glpk')
-solver.options['tmlim'] = 30 * 60
-results = solve(model, solver, V, K, tmlim=30*60)
-
-if (results.solver.status == 'ok') :
-
-    if(results.solver.termination_condition == 'optimal'):
+backend = SolverBackend(model, backend=args.solver, tmlim=30 * 60)
+results, complete = solve(model, backend, inst, record, tmlim=30*60, fractional=args.separation == 'fractional', start=start)
+
+# Se o prazo acabou com cortes ainda entrando, a solução inteira tem subcircuitos: não é rota nem ótimo, e seu valor
+# só é limite inferior quando o modelo sem os cortes que faltam foi resolvido até o ótimo
+feasible = backend.ok() and complete
+# Sem solução inteira sem subcircuitos (ou pior que a da heurística), a resposta é a da heurística
+use_heuristic = start is not None and (not feasible or model.obj() > start[1])
+routes, objective = start if use_heuristic else (routes_from_model(model, v), model.obj()) if feasible else (None, None)
+status = ('heuristic' if use_heuristic else ('optimal' if backend.optimal() else 'not optimal') if feasible else
+          'time limit' if backend.ok() else 'infeasible')
+record.set(status=status, objective=objective, bound=model.obj() if backend.optimal() else None)
+
+if objective is not None:
+
+    if status == 'optimal':
         print("\nSolucao Otima Encontrada")
         print('-------------------------------------')
+    if use_heuristic:
+        print("\nSolucao da heuristica")
+        print('-------------------------------------')
     # Extraindo informações do resultado
-    print(f"Tempo para corbertura total: {model.obj():.2f} segundos")
+    print(f"Tempo para corbertura total: {objective:.2f} segundos")
     for i in range(v):
         print(f"Veiculo {i} Tempo Maximo de Voo {K[i]['b']/60:.2f} horas | Velocidade {K[i]['s']:.2f} m/s | Capacidade de corbetura {K[i]['c']/1000:.2f} km")
     print('-------------------------------------')
 
     # Imprimir as rotas de cada veículo
-    print_routes(model, K, V, d)
-    if args.path:
-        plot_routes(model, K, V, d, save= True, path= args.path)
-    else:
-        plot_routes(model, K, V, d)
+    with record.phase('routes'):
+        print_routes(routes, K, d)
+    with record.phase('plot'):
+        plot_routes(routes, K, V, d, path=args.path, mode=args.plot)
+elif status == 'time limit':
+    print("Tempo limite atingido com subcircuitos ainda sendo cortados: nenhuma rota viável.")
 else:
     print("Nenhuma solução viável encontrada.")
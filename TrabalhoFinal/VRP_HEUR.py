@@ -0,0 +1,58 @@
+from utils.vrp_utils import print_routes, plot_routes
+from utils.vrp_instance import read_instance
+from utils.vrp_heuristics import MinMaxHeuristic
+from utils.run_record import RunRecord
+import argparse
+
+# Configurar o Argument Parser
+parser = argparse.ArgumentParser(description='Heurística do VRP min-max (construção e busca local), sem solver, e plotagem das rotas.')
+parser.add_argument('--path', type=str, required=False, help='Caminho para salvar a imagem das rotas.')
+parser.add_argument('--plot', choices=['auto', 'defer', 'off'], default='auto',
+                    help='auto: salva a imagem em --path (sem janela) ou abre a janela; defer: só grava as rotas em .json ao lado de --path, para a imagem ser feita depois; off: sem gráfico.')
+parser.add_argument('--time', type=float, default=60, help='Limite de tempo da busca local (s).')
+parser.add_argument('--record', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução (tempos por fase, memória, resultado).')
+parser.add_argument('--test', default=None, help='Nome do teste gravado no registro.')
+parser.add_argument('--profile', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
+args = parser.parse_args()
+if args.plot == 'defer' and not args.path:
+    parser.error('--plot defer precisa de --path')
+
+record = RunRecord('HEUR', args.record, args.test)
+record.profile(args.profile)
+
+# Leitura da entrada
+with record.phase('read'):
+    inst = read_instance()
+n, v = inst.n, inst.m
+V, K = inst.V, inst.K  # Pontos de visita e veículos
+record.instance(V, K)
+
+# Cálculo das distâncias entre os pontos
+with record.phase('distances'):
+    d = inst.compute_distances()
+
+# Construção e busca local
+with record.phase('heuristic'):
+    heuristic = MinMaxHeuristic(inst, time_limit=args.time)
+    routes = heuristic.solve()
+stats = heuristic.stats
+record.set(status='heuristic' if stats['feasible'] else 'infeasible', objective=stats['value'], construction=stats['construction'],
+           initial=stats['initial'], moves=stats['moves'])
+
+print("\nResumo da Execucao:")
+print(f"Construcao: {stats['construction']} | Tempo maximo inicial: {stats['initial']:.2f} s | Tempo de construcao: {stats['build_time']:.4f}")
+print("Movimentos da busca local: " + ', '.join(f"{name} {count}" for name, count in stats['moves'].items()))
+print("Tempo total de execucao: ", stats['time'])
+print('--------------------------------------')
+if not stats['feasible']:
+    print("Rotas excedem a capacidade de cobertura de algum veículo.")
+print(f"Tempo para cobertura total: {stats['value']:.2f} segundos")
+for i in range(v):
+    print(f"Veículo {i} Tempo Maximo de Voo {K[i]['b']/60:.2f} horas | Velocidade {K[i]['s']:.2f} m/s | Capacidade de cobertura {K[i]['c']/1000:.2f} km")
+print('-------------------------------------')
+
+# Imprimir as rotas de cada veículo
+with record.phase('routes'):
+    print_routes(routes, K, d)
+with record.phase('plot'):
+    plot_routes(routes, K, V, d, path=args.path, mode=args.plot)
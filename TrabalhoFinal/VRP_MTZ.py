@@ -1,121 +1,144 @@
-import math
-from utils.vrp_utils import print_routes, plot_routes
+from utils.vrp_utils import print_routes, plot_routes, routes_from_model
+from utils.vrp_instance import read_instance
+from utils.matrix_model import build_vrp, solve_vrp_mtz
+from utils.vrp_heuristics import initial_routes, load_start
+from utils.run_record import RunRecord
 from pyomo.environ import ConcreteModel, Var, Objective, NonNegativeReals, Boolean, minimize, ConstraintList, SolverFactory, Binary
-import numpy as np  
-import time 
 import argparse
+import sys
 
 # Configurar o Argument Parser
 parser = argparse.ArgumentParser(description='Resolução do VRP e plotagem das rotas.')
 parser.add_argument('--path', type=str, required=False, help='Caminho para salvar a imagem das rotas.')
+parser.add_argument('--plot', choices=['auto', 'defer', 'off'], default='auto',
+                    help='auto: salva a imagem em --path (sem janela) ou abre a janela; defer: só grava as rotas em .json ao lado de --path, para a imagem ser feita depois; off: sem gráfico.')
+parser.add_argument('--backend', choices=['pyomo', 'matrix'], default='pyomo',
+                    help='Monta o modelo pelo Pyomo ou direto em matriz esparsa (NumPy), escrita em MPS ou entregue ao HiGHS.')
+parser.add_argument('--heuristic', choices=['start', 'off'], default='start',
+                    help='start: rotas da heurística min-max como solução inicial (HiGHS) ou limite de max_time (GLPK) e como resposta se o solver não encontrar solução.')
+parser.add_argument('--heuristic-time', type=float, default=30, help='Limite de tempo da busca local da heurística (s).')
+parser.add_argument('--record', default=None, help='Arquivo JSON Lines onde acrescentar o registro desta execução (tempos por fase, memória, resultado).')
+parser.add_argument('--test', default=None, help='Nome do teste gravado no registro.')
+parser.add_argument('--profile', default=None, help='Grava o perfil da execução: .prof (cProfile) ou .html/.txt (pyinstrument).')
 args = parser.parse_args()
+if args.plot == 'defer' and not args.path:
+    parser.error('--plot defer precisa de --path')
 
-# Dados de entrada
-V = {}  # Conjunto de pontos de visita
-K = {}  # Conjunto de veículos
-d = {}  # Distâncias das arestas
+record = RunRecord('MTZ', args.record, args.test)
+record.profile(args.profile)
 
 # Leitura da entrada
-n, v = map(int, input("Digite o número de vértices e o número de veículos: ").split())  # Número de vértices e número de veículos
+with record.phase('read'):
+    inst = read_instance()
+n, v = inst.n, inst.m
+V, K = inst.V, inst.K  # Pontos de visita e veículos
+record.instance(V, K)
 
-# Leitura das coordenadas dos vértices
-for i in range(n):
-    x, y = map(int, input(f"Digite as coordenadas do ponto {i + 1}: ").split())
-    V[i] = (x, y)
+# Cálculo das distâncias entre os pontos
+with record.phase('distances'):
+    d = inst.compute_distances()
+
+# Heurística: rotas viáveis para a solução inicial
+start = initial_routes(inst, record, args.heuristic_time) if args.heuristic == 'start' else None
+
+# Montagem matricial: sem construção de expressões do Pyomo
+if args.backend == 'matrix':
+    solution, routes, build_time = solve_vrp_mtz(inst, routes=start and start[0], value=start and start[1])
+    objective = solution.value
+    record.add_time('build', build_time)
+    record.add_time('write', solution.write_time)
+    record.add_time('solve', solution.solve_time)
+    if not solution.ok() and start is not None:
+        # Sem solução do solver, a resposta é a da heurística
+        routes, objective = start
+        print("\nSolucao da heuristica")
+    record.set(status=solution.status if solution.ok() or start is None else 'heuristic', solver=solution.solver,
+               bound=solution.bound, objective=objective)
+    if routes is None:
+        print("Nenhuma solução viavel encontrada.")
+        sys.exit()
+    print("\nResumo da Execucao:")
+    print(f"Status: {solution.status} ({solution.solver}) | Limite inferior: {solution.bound}")
+    print(f"Tempo de montagem da matriz: {build_time:.4f} | Escrita: {solution.write_time:.4f} | Resolucao: {solution.solve_time:.4f}")
+    print('--------------------------------------')
+    if solution.optimal():
+        print("\nSolução Otima Encontrada")
+        print('-------------------------------------')
+    print(f"Tempo para cobertura total: {objective:.2f} segundos")
+    for i in range(v):
+        print(f"Veículo {i} Tempo Maximo de Voo {K[i]['b']/60:.2f} horas | Velocidade {K[i]['s']:.2f} m/s | Capacidade de cobertura {K[i]['c']/1000:.2f} km")
+    print('-------------------------------------')
+    with record.phase('routes'):
+        print_routes(routes, K, d)
+    with record.phase('plot'):
+        plot_routes(routes, K, V, d, path=args.path, mode=args.plot)
+    sys.exit()
 
-# Leitura dos veículos
-for i in range(v):
-    b, s = map(float, input(f"Digite o tempo de bateria (m) e a velocidade do veículo {i + 1} (m/s) ").split())
-    K[i] = {'b': b, 's': s, 'c': s*60*b}
 
-# Cálculo das distâncias entre os pontos
-for i in range(n):
-    for j in range(n):
-        if i != j:
-            d[(i, j)] = math.sqrt((V[i][0] - V[j][0])**2 + (V[i][1] - V[j][1])**2)
-
-
-# Criando o modelo
-model = ConcreteModel()
-
-# Variáveis binárias que determinam se o veículo k viaja do ponto i ao ponto j
-model.x = Var(((i, j, k) for k in K for i in V for j in V if i != j), within=Boolean, initialize=0)
-
-# Variáveis y determina se o ponto i é visitado pelo veículo k
-model.y = Var(V.keys(), K, within=Binary, initialize=0)
-
-# Variável auxiliar para o tempo máximo de viagem
-model.max_time = Var(within=NonNegativeReals, initialize=0)
-
-# Variáveis auxiliares para eliminação de subcircuitos (MTZ)
-model.u = Var(V.keys(), within=NonNegativeReals, bounds=(0, n-1))
-
-# Função objetivo: minimizar o tempo máximo de cobertura de todos os pontos
-model.obj = Objective(expr=model.max_time, sense=minimize)
-
-# Adicionando as restrições ao modelo
-model.cnst = ConstraintList()
-
-# Cada ponto deve ser visitado exatamente uma vez por algum veículo, exceto o depósito
-for i in V:
-    if i == 0:   
-        # Cada veículo deve sair do depósito e retornar ao depósito
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j for k in K) == len(K))
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j for k in K) == len(K))
-    else:
-        # Se um veículo chega no ponto i, ele deve sair do ponto i
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j for k in K) == 1)
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j for k in K) == 1)
-    for k in K:
-        # Se o veículo k visita o ponto i, então y[i, k] = 1
-        model.cnst.add(sum(model.x[i, j, k] for j in V if i != j) == model.y[i, k])
-        model.cnst.add(sum(model.x[j, i, k] for j in V if i != j) == model.y[i, k])
-
-# Tempo de viagem não pode exceder a capacidade máxima do veículo e o tempo máximo 
-for k in K:
-    model.cnst.add(sum(d[i, j] * model.x[i, j, k] for i in V for j in V if i != j) <= K[k]['c'])
-    model.cnst.add(sum(d[i, j] * model.x[i, j, k] / K[k]['s'] for i in V for j in V if i != j) <= model.max_time)
-
-# Restrições MTZ para eliminação de subcircuitos
-for i in V:
-    if i != 0:
-        for j in V:
-            if i != j and j != 0:
-                for k in K:
-                    model.cnst.add(model.u[j] >=  model.u[i] + (n-1) * model.x[i, j, k] + (n-3) * model.x[j, i, k]  - (n - 2))
-
-# Restrições de fortalecimento para MTZ
-for i in V:
-    if i != 0:
-        model.cnst.add(model.u[i] >= 1)
-        model.cnst.add(model.u[i] <= n-1)
-
-# Restrições para o depósito
-model.cnst.add(model.u[0] == 0)
+# Criando o modelo: as restrições vêm da matriz de build_vrp, montada com arrays de arcos
+with record.phase('build'):
+    matrix = build_vrp(inst)
+    model = ConcreteModel()
+
+    # Variáveis binárias que determinam se o veículo k viaja do ponto i ao ponto j
+    model.x = Var(inst.x_index(), within=Boolean, initialize=0)
+
+    # Variáveis y determina se o ponto i é visitado pelo veículo k
+    model.y = Var(V.keys(), K, within=Binary, initialize=0)
+
+    # Variável auxiliar para o tempo máximo de viagem
+    model.max_time = Var(within=NonNegativeReals, initialize=0)
+
+    # Variáveis auxiliares para eliminação de subcircuitos (MTZ), com u[0] = 0 no depósito e 1 <= u[i] <= n-1 nos demais
+    model.u = Var(V.keys(), within=NonNegativeReals, bounds=lambda model, i: (0, 0) if i == 0 else (1, n - 1))
+
+    # Função objetivo: minimizar o tempo máximo de cobertura de todos os pontos
+    model.obj = Objective(expr=model.max_time, sense=minimize)
+
+    # Restrições na ordem das linhas da matriz: graus de saída e entrada, y, capacidade e tempo máximo por veículo e MTZ
+    model.cnst = ConstraintList()
+    columns = list(model.x.values()) + [model.y[i, k] for k in K for i in V] + [model.max_time] + [model.u[i] for i in V]
+    matrix.add_to_pyomo(columns, model.cnst)
+
+    if start is not None:
+        # O GLPK não aceita solução inicial: as rotas ficam como valores iniciais (ignorados por ele) e o tempo delas
+        # limita max_time; se o GLPK não achar solução, a resposta é a da heurística
+        load_start(model, inst, *start)
+        model.max_time.setub(start[1] + 1e-6)
+        print(f"GLPK sem solucao inicial: a heuristica entra so como limite do tempo maximo ({start[1]:.2f})")
 
 # Resolver o modelo
 solver = SolverFactory('glpk')
 solver.options['tmlim'] = 30 * 60
-results = solver.solve(model, tee=True)
-
-# Verificar se a solução foi encontrada
-if results.solver.status == 'ok':
+with record.phase('solve'):
+    results = solver.solve(model, tee=True)
+record.discount_solver('solve', results)
+record.set(status=str(results.solver.termination_condition), solver='glpk', bound=results.problem.lower_bound,
+           objective=results.problem.upper_bound)
+
+# Verificar se a solução foi encontrada; sem ela, a resposta é a da heurística
+found = results.solver.status == 'ok'
+if found or start is not None:
     print("\nResumo da Execucao:")
     print(f'{results}\n--------------------------------------')
-    if results.solver.termination_condition == 'optimal':
+    if found and results.solver.termination_condition == 'optimal':
         print("\nSolução Otima Encontrada")
         print('-------------------------------------')
+    routes, objective = (routes_from_model(model, v), model.obj()) if found else start
+    if not found:
+        print("\nSolucao da heuristica")
+        print('-------------------------------------')
+        record.set(status='heuristic', objective=start[1])
     # Extraindo informações do resultado
-    print(f"Tempo para cobertura total: {model.obj():.2f} segundos")
+    print(f"Tempo para cobertura total: {objective:.2f} segundos")
     for i in range(v):
         print(f"Veículo {i} Tempo Maximo de Voo {K[i]['b']/60:.2f} horas | Velocidade {K[i]['s']:.2f} m/s | Capacidade de cobertura {K[i]['c']/1000:.2f} km")
     print('-------------------------------------')
 
     # Imprimir as rotas de cada veículo
-    print_routes(model, K, V, d)
-    if args.path:
-        plot_routes(model, K, V, d, save=True, path=args.path)
-    else:
-        plot_routes(model, K, V, d)
+    with record.phase('routes'):
+        print_routes(routes, K, d)
+    with record.phase('plot'):
+        plot_routes(routes, K, V, d, path=args.path, mode=args.plot)
 else:
     print("Nenhuma solução viavel encontrada.")
@@ -1,73 +1,154 @@
-import random
+import argparse
+import json
 import os
-import math
-
-def calculate_average_distance(vertices):
-    total_distance = 0
-    num_pairs = 0
-    for i in range(len(vertices)):
-        for j in range(i + 1, len(vertices)):
-            x1, y1 = vertices[i]
-            x2, y2 = vertices[j]
-            distance = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-            total_distance += distance
-            num_pairs += 1
-    return total_distance / num_pairs if num_pairs > 0 else 0
-
-def generate_vrp_instance(num_vertices, num_vehicles):
-    vertices = []
-    
-    # Gerar vértices
-    for i in range(num_vertices):
-        x = random.randint(-10000, 10000)
-        y = random.randint(-10000, 10000)
-        vertices.append((x, y))
-    
-    # Calcular a distância média entre os vértices
-    avg_distance = calculate_average_distance(vertices)
-    
-    def create_instance(num_vertices, num_vehicles, difficulty_factor):
-        instance = []
-        
-        # Adicionar número de vértices e veículos à instância
-        instance.append(f"{num_vertices} {num_vehicles}")
-        
-        # Adicionar vértices à instância
-        for x, y in vertices:
-            instance.append(f"{x} {y}")
-        
-        # Gerar parâmetros dos veículos
-        for i in range(num_vehicles):
-            speed = random.uniform(5, 15) * difficulty_factor
-            battery = (avg_distance / speed) / (num_vehicles - 1) * difficulty_factor
-            instance.append(f"{battery:.2f} {speed:.2f}")
-        
-        return instance
-
-    # Instância fácil
-    easy_instance = create_instance(num_vertices, num_vehicles, difficulty_factor=1.0)
-    
-    # Instância difícil (menos veículos e/ou menor bateria/velocidade)
-    difficult_instance = create_instance(num_vertices, max(2, num_vehicles - 1), difficulty_factor=0.5)
-    
-    return easy_instance, difficult_instance
+
+import numpy as np
+
+# Tamanhos de cada nível: (vértices mín., máx.), (veículos mín., máx.)
+TIERS = {
+    'small': ((3, 15), (2, 5)),
+    'medium': ((20, 120), (3, 10)),
+    'large': ((200, 3000), (10, 40)),
+}
+DISTRIBUTIONS = ('uniform', 'clustered', 'depot-offset')
+BOX = 10000  # Coordenadas em [-BOX, BOX]
+BHH = 0.7124  # Constante de Beardwood-Halton-Hammersley: TSP de n pontos em área A ~ BHH * sqrt(n A)
+FLOOR_TIERS = ('medium', 'large')  # Níveis com o mínimo de bateria; o pequeno mantém a bateria da versão original
+
+
+def calculate_average_distance(vertices, rng=None, max_pairs=2_000_000):
+    """Distância média entre pares de vértices.
+
+    Com até max_pairs pares, é exata, por blocos de linhas da matriz de
+    distâncias (sem montar a matriz n x n inteira). Acima disso, é estimada
+    com max_pairs pares sorteados.
+    """
+    points = np.asarray(vertices, dtype=float)
+    n = len(points)
+    pairs = n * (n - 1) // 2
+    if pairs == 0:
+        return 0.0
+    if pairs > max_pairs:
+        rng = rng if rng is not None else np.random.default_rng(0)
+        i = rng.integers(0, n, max_pairs)
+        j = (i + rng.integers(1, n, max_pairs)) % n  # j != i
+        return float(np.hypot(*(points[i] - points[j]).T).mean())
+    total = 0.0
+    block = max(1, max_pairs // n)
+    for start in range(0, n, block):
+        diff = points[start:start + block, None, :] - points[None, :, :]
+        total += np.hypot(diff[..., 0], diff[..., 1]).sum()
+    return total / 2 / pairs
+
+
+def generate_points(rng, num_vertices, distribution='uniform', clusters=None):
+    """Coordenadas inteiras; o ponto 0 é o depósito.
+
+    uniform: todos uniformes no quadrado. clustered: clientes em torno de
+    centros sorteados (desvio de 5% do lado), depósito uniforme.
+    depot-offset: clientes uniformes e o depósito num canto do quadrado.
+    """
+    if distribution == 'uniform':
+        points = rng.integers(-BOX, BOX + 1, (num_vertices, 2))
+    elif distribution == 'clustered':
+        clusters = clusters or max(2, int(np.sqrt(num_vertices) / 2))
+        centers = rng.uniform(-0.8 * BOX, 0.8 * BOX, (clusters, 2))
+        members = centers[rng.integers(0, clusters, num_vertices)]
+        points = np.clip(np.rint(members + rng.normal(0, 0.1 * BOX, (num_vertices, 2))), -BOX, BOX).astype(int)
+        points[0] = rng.integers(-BOX, BOX + 1, 2)
+    elif distribution == 'depot-offset':
+        points = rng.integers(-BOX, BOX + 1, (num_vertices, 2))
+        points[0] = (-BOX, -BOX)
+    else:
+        raise ValueError(f"Distribuição desconhecida: {distribution}")
+    return points
+
+
+def vehicle_parameters(rng, points, num_vehicles, difficulty_factor, avg_distance, floor=False):
+    """Bateria (min) e velocidade (m/s) de cada veículo.
+
+    A bateria é a da versão original, (distância média / velocidade) /
+    (veículos - 1) vezes o fator de dificuldade. Com floor, ela nunca é
+    menor que o necessário para cada veículo cobrir sua parte de um circuito
+    por todos os pontos (estimativa de Beardwood-Halton-Hammersley) mais a
+    ida e volta ao ponto mais distante do depósito. Sem esse mínimo, as
+    instâncias médias e grandes seriam inviáveis.
+    """
+    speed = rng.uniform(5, 15, num_vehicles) * difficulty_factor
+    battery = avg_distance / speed / max(num_vehicles - 1, 1) * difficulty_factor
+    if floor:
+        width, height = np.ptp(points, axis=0) + 1
+        tour = BHH * np.sqrt(len(points) * width * height)
+        reach = 2 * np.hypot(*(points - points[0]).T).max()
+        battery = np.maximum(battery, (tour / num_vehicles + reach) / speed / 60)
+    return battery, speed
+
+
+def create_instance(rng, points, num_vehicles, difficulty_factor, avg_distance, floor=False):
+    battery, speed = vehicle_parameters(rng, points, num_vehicles, difficulty_factor, avg_distance, floor)
+    instance = [f"{len(points)} {num_vehicles}"]
+    instance += [f"{x} {y}" for x, y in points.tolist()]
+    instance += [f"{b:.2f} {s:.2f}" for b, s in zip(battery.tolist(), speed.tolist())]
+    return instance
+
+
+def generate_vrp_instance(rng, num_vertices, num_vehicles, distribution='uniform', floor=False):
+    """Par de instâncias com os mesmos pontos: fácil e difícil (menos veículos e menor bateria/velocidade)."""
+    points = generate_points(rng, num_vertices, distribution)
+    avg_distance = calculate_average_distance(points, rng)
+    easy_instance = create_instance(rng, points, num_vehicles, 1.0, avg_distance, floor)
+    difficult_instance = create_instance(rng, points, max(2, num_vehicles - 1), 0.5, avg_distance, floor)
+    return easy_instance, difficult_instance, avg_distance
+
 
 def write_instance_to_file(filename, instance):
     with open(filename, 'w') as f:
-        for line in instance:
-            f.write(line + "\n")
-
-num_instances = 20
-max_vertices = 15
-
-# Criar diretório .tests se não existir
-os.makedirs('./tests', exist_ok=True)
-
-for idx in range(num_instances):
-    num_vertices = random.randint(3, max_vertices)  # Número de vértices 
-    num_vehicles = random.randint(2, min(num_vertices-1, 5))  # Número de veículos
-    instance0, instance1 = generate_vrp_instance(num_vertices, num_vehicles)
-    filename = f'./tests/{idx + 1}_1.txt'
-    write_instance_to_file(filename, instance0)
-    filename = f'./tests/{idx + 1}_2.txt'
-    write_instance_to_file(filename, instance1)
\ No newline at end of file
+        f.write("\n".join(instance) + "\n")
+
+
+def generate_tier(seed, tier, count, distributions, directory):
+    """Gera count pares de instâncias do nível; cada uma tem sua própria semente, derivada de (seed, nível, índice).
+
+    Os arquivos do nível pequeno mantêm os nomes da versão original
+    ({índice}_{dificuldade}.txt); os outros levam o nível na frente.
+    """
+    (min_vertices, max_vertices), (min_vehicles, max_vehicles) = TIERS[tier]
+    entries = []
+    for idx in range(count):
+        instance_seed = [seed, list(TIERS).index(tier), idx]
+        rng = np.random.default_rng(instance_seed)
+        # Tamanhos em escala logarítmica, para o nível grande não ficar só com instâncias de milhares de pontos
+        num_vertices = int(np.rint(np.exp(rng.uniform(np.log(min_vertices), np.log(max_vertices)))))
+        num_vehicles = int(rng.integers(min_vehicles, min(num_vertices - 1, max_vehicles) + 1))
+        distribution = distributions[idx % len(distributions)]
+        instances = generate_vrp_instance(rng, num_vertices, num_vehicles, distribution, floor=tier in FLOOR_TIERS)
+        for difficulty, instance in zip((1, 2), instances[:2]):
+            prefix = '' if tier == 'small' else f'{tier}_'
+            filename = os.path.join(directory, f'{prefix}{idx + 1}_{difficulty}.txt')
+            write_instance_to_file(filename, instance)
+            entries.append({'file': os.path.basename(filename), 'tier': tier, 'seed': instance_seed, 'distribution': distribution,
+                            'vertices': num_vertices, 'vehicles': int(instance[0].split()[1]),
+                            'difficulty': difficulty, 'average_distance': round(instances[2], 2)})
+    return entries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera instâncias do VRP reproduzíveis (semente explícita) em níveis de tamanho, com um manifesto.')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador; a mesma semente gera os mesmos arquivos.')
+    parser.add_argument('--tiers', nargs='+', choices=list(TIERS), default=['small'],
+                        help='Níveis: small (3-15 vértices), medium (20-120), large (200-3000, até 40 veículos).')
+    parser.add_argument('--count', type=int, default=20, help='Pares de instâncias (fácil e difícil) por nível.')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS + ('mixed',), default='uniform',
+                        help='Distribuição dos pontos; mixed alterna as três entre as instâncias.')
+    parser.add_argument('--output', default='./tests', help='Diretório dos testes; o manifesto vai para manifest.json nele.')
+    args = parser.parse_args()
+
+    # Criar diretório dos testes se não existir
+    os.makedirs(args.output, exist_ok=True)
+    distributions = DISTRIBUTIONS if args.distribution == 'mixed' else (args.distribution,)
+    manifest = {'seed': args.seed, 'count': args.count, 'distribution': args.distribution, 'instances': []}
+    for tier in args.tiers:
+        manifest['instances'] += generate_tier(args.seed, tier, args.count, distributions, args.output)
+    with open(os.path.join(args.output, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    print(f"{len(manifest['instances'])} instancias em {args.output}")
@@ -1,47 +1,89 @@
 import subprocess
 import os
+import sys
 import glob
+import json
+import math
+import signal
+import threading
+import time
 import concurrent.futures
+import multiprocessing
 import traceback
+import argparse
+
+import numpy as np
+
+from utils.result_cache import ResultCache, cache_key, source_version
+from utils.run_record import instance_hash
+from utils.vrp_utils import render_routes, routes_file
+
+TIMEOUT = 1980
+
+
+def read_instance(input_file):
+    """Pontos e veículos do arquivo de teste, no formato lido pelos scripts (n v, n coordenadas, v baterias/velocidades)."""
+    with open(input_file) as file:
+        values = file.read().split()
+    n, v = int(values[0]), int(values[1])
+    V = {i: (int(values[2 + 2 * i]), int(values[3 + 2 * i])) for i in range(n)}
+    start = 2 + 2 * n
+    K = {k: {'b': float(values[start + 2 * k]), 's': float(values[start + 2 * k + 1])} for k in range(v)}
+    return V, K
+
+def log_name(log_dir, script, input_file):
+    return os.path.join(log_dir, f"{os.path.splitext(os.path.basename(script))[0]}_{os.path.splitext(os.path.basename(input_file))[0]}.txt")
+
+
+def execute_script(script, input_file, log_dir, record=None, started=None):
+    """Executa o script com o input em uma sessão própria; started(process) recebe o processo, para ele poder ser cancelado."""
+    log_file = log_name(log_dir, script, input_file)
+    status = 'failed'
 
-def execute_script(script, input_file, log_dir):
-    log_file = os.path.join(log_dir, f"{os.path.splitext(os.path.basename(script))[0]}_{os.path.splitext(os.path.basename(input_file))[0]}.txt")
-    
     try:
         # Verifica se o arquivo de script e de input existem
         if not os.path.isfile(script):
             raise FileNotFoundError(f"Script file not found: {script}")
         if not os.path.isfile(input_file):
             raise FileNotFoundError(f"Input file not found: {input_file}")
-        
+
         # Abre o arquivo de input para leitura
         with open(input_file, 'r') as infile:
             input_data = infile.read()
-            
-        print(f"Executando script {script} com input {input_file}...")
-        # Executa o script com o input fornecido
-        process = subprocess.Popen(['python', script, '--path', log_file.replace('.txt', '.png')],
-                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
+
+        print(f"Executando script {script} com input {input_file}...", flush=True)
+        # Executa o script com o input fornecido; a imagem fica para o processo de plotagem
+        command = [sys.executable, script, '--path', log_file.replace('.txt', '.png'), '--plot', 'defer']
+        if record:
+            command += ['--record', record, '--test', os.path.splitext(os.path.basename(input_file))[0]]
+        # Um thread por solver: o pool já ocupa os núcleos
+        env = dict(os.environ, OMP_NUM_THREADS='1', OPENBLAS_NUM_THREADS='1', MKL_NUM_THREADS='1')
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                   env=env, start_new_session=True)
+        if started:
+            started(process)
+
         # Define um timeout de 30 minutos (1800 segundos)
         try:
-            stdout, stderr = process.communicate(input=input_data, timeout=1980)
+            stdout, stderr = process.communicate(input=input_data, timeout=TIMEOUT)
+            status = 'ok' if process.returncode == 0 else 'failed'
         except subprocess.TimeoutExpired:
-            process.kill()  # Termina o processo se exceder o timeout
+            os.killpg(process.pid, signal.SIGKILL)  # Termina o script e o solver se excederem o timeout
             stdout, stderr = process.communicate()  # Obtém o que foi produzido até o momento
-            print(f"O processo para o script {script} com o input {input_file} excedeu o limite de tempo de 30 minutos.")
-        
+            status = 'timeout'
+            print(f"O processo para o script {script} com o input {input_file} excedeu o limite de tempo de 30 minutos.", flush=True)
+
         # Verifica se o diretório de logs existe
         if not os.path.exists(log_dir):
             raise OSError(f"Falha ao criar o diretório de logs: {log_dir}")
-        
+
         # Escreve a saída e erros no arquivo de log
         with open(log_file, 'w') as log:
             log.write(f"{stdout}\n")
             if stderr:
                 log.write(f"Erros:\n{stderr}\n")
             log.write("-"*80 + "\n")
-    
+
     except Exception as e:
         # Em caso de erro, grava o erro no log
         with open(f"{log_file.replace('logs/', 'logs/error_')}", 'w') as log:
@@ -50,27 +92,263 @@ def execute_script(script, input_file, log_dir):
             log.write("\n" + "-"*80 + "\n\n")
         print(f"Erro ao executar o script {script}. Veja o log em {log_file} para mais detalhes.")
         print("Detalhes do erro:\n", traceback.format_exc())
-            
+    return status
+
+
+class RunHistory:
+    """Tempos das execuções anteriores, um JSON por linha (script, instância, n, veículos, tempo, status).
+
+    estimate() usa o tempo da mesma instância com o mesmo script; senão, um
+    ajuste tempo = a (n² v)^b sobre o histórico do script (ou de todos, se o
+    script tiver poucos pontos), limitado ao tempo máximo. Sem histórico, não
+    há estimativa e a ordem é pelo tamanho n² v.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        if path and os.path.isfile(path):
+            with open(path) as file:
+                self.entries = [json.loads(line) for line in file if line.strip()]
+        self._fits = {}
+
+    def add(self, **entry):
+        self.entries.append(entry)
+        self._fits.clear()
+        if self.path:
+            with open(self.path, 'a') as file:
+                file.write(json.dumps(entry) + '\n')
+
+    def _fit(self, script=None):
+        if script not in self._fits:
+            points = [(e['n'] ** 2 * e['vehicles'], e['time']) for e in self.entries
+                      if (script is None or e['script'] == script) and e['time'] > 0]
+            fit = None
+            if len({size for size, _ in points}) >= 2:
+                size, seconds = np.log(np.array(points)).T
+                b, a = np.polyfit(size, seconds, 1)
+                fit = (a, min(max(b, 0.0), 4.0))
+            self._fits[script] = fit
+        return self._fits[script]
+
+    def estimate(self, script, instance, n, vehicles):
+        """Tempo esperado em segundos, ou None sem histórico."""
+        script = os.path.basename(script)
+        same = [e['time'] for e in self.entries if e['script'] == script and e['instance'] == instance]
+        if same:
+            return same[-1]
+        fit = self._fit(script) or self._fit()
+        if fit is None:
+            return None
+        a, b = fit
+        return min(math.exp(a + b * math.log(n * n * vehicles)), TIMEOUT)
+
+
+def available_memory():
+    """Memória disponível em MB (MemAvailable do Linux; em outros sistemas, páginas livres)."""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+
+def pool_size(job_memory=2048, jobs=None):
+    """Processos simultâneos: os núcleos disponíveis, limitados pela memória livre dividida pela memória de um job."""
+    if jobs:
+        return jobs
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    return max(1, min(cores, int(available_memory() // job_memory)))
+
+
+def read_status(record):
+    """Status gravado pelo script no registro da execução (RunRecord), ou None."""
+    try:
+        with open(record) as file:
+            lines = [line for line in file if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]).get('status') if lines else None
+
+
+def run_with_cache(script_files, input_files, log_dir, cache=None, max_workers=None, history=None, cancel_siblings=False,
+                   records=None):
+    """Executa os pares (script, input) que o cache não tem; os demais têm log e imagem restaurados do cache.
+
+    A chave é o hash da instância (coordenadas e veículos), a versão do código
+    do script e o tempo limite, então um teste renomeado ou repetido não é
+    resolvido de novo e uma instância ou formulação alterada é.
+
+    Os jobs saem do maior tempo esperado (pelo histórico) para o menor: um
+    job longo no fim da fila não fica sozinho prolongando o lote. Com
+    cancel_siblings, quando uma formulação prova a otimalidade de uma
+    instância, as outras formulações da mesma instância são canceladas (as
+    que ainda estão na fila) ou terminadas (as que estão rodando).
+
+    Os scripts só gravam as rotas (--plot defer); as imagens são desenhadas
+    por um processo à parte enquanto os próximos testes rodam, então o tempo
+    de cada execução não inclui o matplotlib.
+    """
+    history = history or RunHistory(None)
+    max_workers = max_workers or pool_size()
+    versions = {script: source_version(script) for script in script_files}
+    pending = []
+    for input_file in input_files:
+        V, K = read_instance(input_file)
+        instance = instance_hash(V, K)
+        for script in script_files:
+            key = cache_key(instance, os.path.basename(script), versions[script], {'timeout': TIMEOUT})
+            log_file = log_name(log_dir, script, input_file)
+            if cache is not None and cache.get(key) is not None and cache.restore(key, 'log.txt', log_file):
+                cache.restore(key, 'routes.png', log_file.replace('.txt', '.png'))
+                cache.restore(key, 'routes.json', routes_file(log_file))
+                print(f"Cache: {script} com input {input_file}")
+                continue
+            expected = history.estimate(script, instance, len(V), len(K))
+            pending.append({'key': key, 'script': script, 'input': input_file, 'log': log_file, 'instance': instance,
+                            'n': len(V), 'vehicles': len(K), 'expected': expected})
+
+    # Maior tempo esperado primeiro; sem estimativa (tempo desconhecido), antes dos outros e pelo tamanho do modelo (n² v)
+    pending.sort(key=lambda job: (job['expected'] is None, job['expected'] or 0.0, job['n'] ** 2 * job['vehicles']), reverse=True)
+    expected = sum(job['expected'] or 0 for job in pending)
+    print(f"{len(pending)} jobs em {max_workers} processos | tempo esperado {expected:.0f} s "
+          f"(cerca de {expected / max_workers:.0f} s de parede)", flush=True)
+
+    processes, cancelled, solved = {}, set(), set()
+    lock = threading.Lock()
+
+    def kill(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def started(job_id):
+        def register(process):
+            with lock:
+                processes[job_id] = process
+                stop = job_id in cancelled
+            if stop:
+                kill(process)
+        return register
+
+    def run(job_id, job):
+        with lock:
+            if job['instance'] in solved:
+                cancelled.add(job_id)
+                return 'cancelled', 0.0
+        start = time.perf_counter()
+        status = execute_script(job['script'], job['input'], log_dir, job['record'], started(job_id))
+        with lock:
+            processes.pop(job_id, None)
+            if job_id in cancelled:
+                status = 'cancelled'
+        return status, time.perf_counter() - start
+
+    # Executa os scripts em paralelo e desenha as rotas de cada um assim que ele termina. O processo de plotagem é
+    # iniciado com spawn: um fork herdaria o stdin (pipe) dos scripts em execução, que nunca receberiam o fim da entrada
+    plots = {}
+    begin = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as plotter:
+        futures = {}
+        for job_id, job in enumerate(pending):
+            # O registro de cada job vai para um arquivo próprio, lido para o status e depois acrescentado ao comum
+            job['record'] = os.path.abspath(job['log'].replace('.txt', '.jsonl'))
+            if os.path.exists(job['record']):
+                os.remove(job['record'])
+            futures[executor.submit(run, job_id, job)] = job_id
+        done = 0
+        for future in concurrent.futures.as_completed(futures):
+            job_id = futures[future]
+            job = pending[job_id]
+            done += 1
+            if future.cancelled():
+                continue
+            try:
+                status, seconds = future.result()  # Captura exceções se ocorrerem
+            except Exception as e:
+                print(f"Erro ao executar uma das tarefas em paralelo: {e}")
+                continue
+            result = read_status(job['record'])
+            if records and os.path.isfile(job['record']):
+                with open(job['record']) as file, open(records, 'a') as out:
+                    out.write(file.read())
+            if os.path.isfile(job['record']):
+                os.remove(job['record'])
+
+            if status in ('ok', 'timeout'):
+                history.add(script=os.path.basename(job['script']), instance=job['instance'], n=job['n'],
+                            vehicles=job['vehicles'], time=round(seconds, 3), status=status, result=result)
+            if cancel_siblings and status == 'ok' and result == 'optimal':
+                # Formulação provou a otimalidade: as outras da mesma instância não precisam terminar
+                with lock:
+                    solved.add(job['instance'])
+                    siblings = {other_id for other_id, other in enumerate(pending)
+                                if other['instance'] == job['instance'] and other_id != job_id and other_id not in cancelled}
+                    cancelled.update(siblings)
+                    for other_id in siblings & processes.keys():
+                        kill(processes[other_id])
+                for other_future, other_id in futures.items():
+                    if other_id in siblings and other_future.cancel():
+                        print(f"Cancelado: {pending[other_id]['script']} com input {pending[other_id]['input']}", flush=True)
+
+            with lock:
+                running = len(processes)
+            expected = f"{job['expected']:.1f}" if job['expected'] is not None else '-'
+            print(f"[{done}/{len(pending)}] {job['script']} com input {job['input']} -> {status}"
+                  f"{f' ({result})' if result else ''} em {seconds:.1f} s (esperado {expected} s) | "
+                  f"{running} rodando | {time.perf_counter() - begin:.0f} s de parede", flush=True)
+
+            if status == 'cancelled':
+                continue
+            if os.path.isfile(routes_file(job['log'])):
+                plots[plotter.submit(render_routes, routes_file(job['log']))] = (job['key'], job['log'], status)
+            elif cache is not None and status in ('ok', 'timeout'):
+                cache.put(job['key'], {'status': status}, {'log.txt': job['log']})
+
+        # Guarda no cache cada execução com a imagem já desenhada
+        for future in concurrent.futures.as_completed(plots):
+            key, log_file, status = plots[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Erro ao desenhar as rotas de {log_file}: {e}")
+            if cache is not None and status in ('ok', 'timeout'):
+                cache.put(key, {'status': status}, {'log.txt': log_file, 'routes.png': log_file.replace('.txt', '.png'),
+                                                    'routes.json': routes_file(log_file)})
+    print(f"Tempo total: {time.perf_counter() - begin:.1f} s")
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Executa os scripts do VRP em todos os testes, reaproveitando o cache de resultados.')
+    parser.add_argument('--cache', default='cache/', help='Diretório do cache de resultados (por instância, código e tempo limite).')
+    parser.add_argument('--cache-mb', type=int, default=1024, help='Tamanho máximo do cache; as entradas menos usadas saem primeiro.')
+    parser.add_argument('--no-cache', action='store_true', help='Não consulta nem grava o cache.')
+    parser.add_argument('--jobs', type=int, default=None, help='Processos simultâneos (padrão: núcleos disponíveis, limitados pela memória).')
+    parser.add_argument('--job-memory', type=int, default=2048, help='Memória reservada por job, em MB, para dimensionar o pool.')
+    parser.add_argument('--history', default='history.jsonl', help='Tempos das execuções anteriores, usados para ordenar a fila.')
+    parser.add_argument('--records', default='results.jsonl', help='Arquivo JSON Lines com o registro (RunRecord) de cada execução.')
+    parser.add_argument('--cancel-siblings', action='store_true',
+                        help='Cancela as outras formulações de uma instância quando uma delas prova a otimalidade.')
+    args = parser.parse_args()
+
     # Lista de arquivos de scripts a serem executados
     script_files = [
         './VRP_CUTS.py',
         './VRP_MTZ.py',
+        './VRP_CG.py',
     ]
     # Lista de arquivos de input correspondentes aos scripts
     tests_dir = 'tests/'
-    input_files = glob.glob(os.path.join(tests_dir, '*'))
+    input_files = glob.glob(os.path.join(tests_dir, '*.txt'))
     # Diretório onde os arquivos de log serão armazenados
     log_dir = 'logs/'
     os.makedirs(log_dir, exist_ok=True)
 
-    # Executa os scripts em paralelo
-    with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(execute_script, script, input_file, log_dir) for input_file in input_files for script in script_files]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                future.result()  # Captura exceções se ocorrerem
-            except Exception as e:
-                print(f"Erro ao executar uma das tarefas em paralelo: {e}")
\ No newline at end of file
+    run_with_cache(script_files, input_files, log_dir, None if args.no_cache else ResultCache(args.cache, args.cache_mb),
+                   max_workers=pool_size(args.job_memory, args.jobs), history=RunHistory(args.history),
+                   cancel_siblings=args.cancel_siblings, records=args.records)
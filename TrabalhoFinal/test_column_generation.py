@@ -0,0 +1,25 @@
+from utils.column_generation import ColumnGeneration
+from utils.vrp_instance import VrpInstance
+
+
+def small_instance():
+    inst = VrpInstance([(0, 0), (1000, 0), (0, 1000), (1000, 1000)], [30.0, 30.0], [10.0, 10.0])
+    inst.compute_distances()
+    return inst
+
+
+def test_heuristic_route_with_one_customer_is_a_single_column():
+    inst = small_instance()
+    cg = ColumnGeneration(inst)
+    routes = [[1, 3], [2]]
+    value = max(cg.route_time(k, route) for k, route in enumerate(routes))
+    cg.solve_relaxation(routes)
+
+    keys = [(k, tuple(route)) for k, route in cg.routes]
+    assert len(keys) == len(set(keys))
+    assert keys.count((1, (2,))) == 1
+
+    # Com uma cópia só de cada rota, a solução inicial é viável e o resultado não piora
+    routes, objective = cg.solve_integer((routes, value), tee=False)
+    assert sorted(i for route in routes for i in route) == [1, 2, 3]
+    assert objective <= value + 1e-6
@@ -0,0 +1,28 @@
+import numpy as np
+
+from utils.subtour_separation import SubtourSeparator
+from utils.vrp_instance import VrpInstance
+
+
+def solution(inst, routes):
+    """x e y de rotas dadas como listas de arcos por veículo."""
+    arc = {(i, j): a for a, (i, j) in enumerate(zip(inst.tail.tolist(), inst.head.tolist()))}
+    x, y = np.zeros((inst.m, len(arc))), np.zeros((inst.m, inst.n))
+    for k, arcs in enumerate(routes):
+        for i, j in arcs:
+            x[k, arc[i, j]] = 1
+            y[k, [i, j]] = 1
+    return x, y
+
+
+def test_integer_cuts_only_the_vehicle_with_the_subtour():
+    inst = VrpInstance([(0, 0), (1000, 0), (0, 1000), (1000, 1000), (500, 500)], [30.0, 30.0], [10.0, 10.0])
+    inst.compute_distances()
+    # Veículo 0: depósito -> 1 -> depósito e o subcircuito 2 <-> 3; veículo 1: depósito -> 4 -> depósito
+    x, y = solution(inst, [[(0, 1), (1, 0), (2, 3), (3, 2)], [(0, 4), (4, 0)]])
+    separator = SubtourSeparator(inst)
+
+    cuts = separator.integer(x, y)
+    assert sorted((sorted(S), k, h) for S, k, h in cuts) == [([2, 3], 0, 2), ([2, 3], 0, 3)]
+    # Os mesmos cortes já estão no pool
+    assert separator.integer(x, y) == []
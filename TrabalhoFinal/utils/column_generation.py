@@ -0,0 +1,317 @@
+import heapq
+import time
+
+import numpy as np
+
+EPS = 1e-6
+
+
+class RouteLabeling:
+    """Pricing do VRP por rotas: caminho mínimo elementar com restrição de recurso (ESPPRC) por rotulação.
+
+    Para o veículo k, o arco (i, j) custa sigma_k d[i][j] / s_k - pi[j] e o
+    recurso é a distância percorrida, limitada pela capacidade c_k (contando a
+    volta ao depósito). Um rótulo (custo, distância, visitados, ponto) domina
+    outro no mesmo ponto se tem custo e distância menores ou iguais e visitou
+    um subconjunto dos pontos. Os rótulos são estendidos em ordem de
+    distância; com beam, só os beam rótulos de menor custo de cada ponto são
+    mantidos (pricing heurístico, sem garantia de achar a rota de menor
+    custo reduzido).
+    """
+
+    def __init__(self, inst):
+        self.n = inst.n
+        self.d = inst.dist.tolist()
+        self.speed = inst.speed.tolist()
+        self.capacity = inst.capacity.tolist()
+
+    def price(self, k, pi, mu, sigma, beam=None, limit=20, deadline=None):
+        """Até limit rotas do veículo k com custo reduzido negativo, a melhor primeiro.
+
+        Devolve (rotas, menor custo reduzido, completo); completo é falso se o
+        prazo acabou antes de esgotar os rótulos.
+        """
+        n, d, cap = self.n, self.d, self.capacity[k] + EPS
+        scale = sigma / self.speed[k]
+        cost_of = [[scale * dij - pi[j] for j, dij in enumerate(row)] for row in d]
+        labels = [(0.0, 0.0, 1, 0, -1)]  # (custo, distância, visitados, ponto, pai)
+        alive = [True]
+        at = [[] for _ in range(n)]  # Rótulos não dominados de cada ponto
+        heap = [(0.0, 0)]
+        found, best, popped = [], 0.0, 0
+        while heap:
+            popped += 1
+            if deadline is not None and popped % 1000 == 0 and time.perf_counter() >= deadline:
+                return self._routes(labels, found, limit), best, False
+            _, idx = heapq.heappop(heap)
+            if not alive[idx]:
+                continue
+            cost, length, mask, i, _ = labels[idx]
+            if i:
+                rc = cost + scale * d[i][0] - mu
+                if rc < -EPS:
+                    found.append((rc, idx))
+                best = min(best, rc)
+            di, ci = d[i], cost_of[i]
+            for j in range(1, n):
+                if mask >> j & 1:
+                    continue
+                L = length + di[j]
+                if L + d[j][0] > cap:
+                    continue
+                c, new_mask = cost + ci[j], mask | 1 << j
+                if any(labels[o][0] <= c + EPS and labels[o][1] <= L + EPS and not labels[o][2] & ~new_mask for o in at[j]):
+                    continue
+                keep = []
+                for o in at[j]:
+                    oc, ol, om = labels[o][:3]
+                    if c <= oc and L <= ol and not new_mask & ~om:
+                        alive[o] = False
+                    else:
+                        keep.append(o)
+                new = len(labels)
+                labels.append((c, L, new_mask, j, idx))
+                alive.append(True)
+                keep.append(new)
+                if beam and len(keep) > beam:
+                    keep.sort(key=lambda o: labels[o][0])
+                    for o in keep[beam:]:
+                        alive[o] = False
+                    keep = keep[:beam]
+                at[j] = keep
+                if alive[new]:
+                    heapq.heappush(heap, (L, new))
+        return self._routes(labels, found, limit), best, True
+
+    def _routes(self, labels, found, limit):
+        routes = []
+        for _, idx in sorted(found)[:limit]:
+            route = []
+            while idx > 0:
+                route.append(labels[idx][3])
+                idx = labels[idx][4]
+            routes.append(route[::-1])
+        return routes
+
+
+class ColumnGeneration:
+    """VRP min-max por rotas: mestre de particionamento resolvido por geração de colunas e price-and-branch.
+
+    Mestre restrito (RMP), com lambda[k, r] = 1 se o veículo k faz a rota r:
+        min max_time
+        sum lambda[k, r] sobre as rotas que visitam i = 1   (cada cliente i, dual pi_i)
+        sum_r lambda[k, r] = 1                                (cada veículo k, dual mu_k)
+        max_time - sum_r t[k, r] lambda[k, r] >= 0            (cada veículo k, dual sigma_k)
+    com t[k, r] = distância da rota / s_k. As rotas já respeitam a capacidade
+    c_k, então não há restrição de capacidade nem de subcircuito no mestre.
+    Colunas artificiais de custo alto em cada linha de igualdade mantêm o RMP
+    viável desde a primeira iteração.
+
+    A relaxação linear é resolvida pelo HiGHS (highspy), reotimizada a partir
+    da base anterior a cada rodada de colunas. O pricing tenta primeiro a
+    rotulação com beam e roda a exata quando a heurística não acha colunas
+    ou quando o valor do RMP fica stall rodadas sem melhorar; com o pricing
+    exato de todos os veículos, sum pi + sum mu + sum_k min(0, rc_k) é um
+    limite inferior (de Lagrange), e a geração para quando ele alcança o
+    valor do RMP. O pricing exato é exponencial: se o prazo acaba antes dele
+    terminar, não há limite. Depois, as colunas geradas viram inteiras e o
+    HiGHS resolve o particionamento (price-and-branch): o valor é um limite
+    superior, ótimo quando coincide com o limite da relaxação.
+
+    Os duais do RMP são degenerados e oscilam: o pricing heurístico acha
+    colunas de custo reduzido negativo por dezenas de rodadas sem o valor do
+    RMP mudar. Por isso o pricing é estabilizado (suavização de Wentges): as
+    colunas são procuradas no ponto alpha centro + (1 - alpha) duais do RMP,
+    e o ponto passa a ser o centro. Se nada for achado ali, o pricing é
+    refeito nos próprios duais do RMP, que passam a ser o centro.
+    """
+
+    def __init__(self, inst, beam=8, limit=20, alpha=0.5, stall=5):
+        self.inst = inst
+        self.pricing = RouteLabeling(inst)
+        self.beam = beam  # Rótulos mantidos por ponto no pricing heurístico
+        self.limit = limit  # Colunas por veículo em cada rodada
+        self.alpha = alpha  # Peso do centro na suavização dos duais (0 desliga)
+        self.stall = stall  # Rodadas sem melhora do RMP antes do pricing exato
+        self.center = None
+        self.routes = []  # (k, rota) de cada coluna lambda, na ordem das colunas após as fixas
+        self.known = set()
+        self.stats = {'iterations': 0, 'pricing_time': 0.0, 'master_time': 0.0, 'exact_pricing': 0, 'lp_bound': None}
+
+    # Mestre
+    def _build(self):
+        import highspy
+
+        inst, n, m = self.inst, self.inst.n, self.inst.m
+        self.h = h = highspy.Highs()
+        h.setOptionValue('output_flag', False)
+        inf = highspy.kHighsInf
+        self.rows = n - 1 + 2 * m  # Clientes, veículos, tempo
+        lower = np.concatenate([np.ones(n - 1 + m), np.zeros(m)])
+        upper = np.concatenate([np.ones(n - 1 + m), np.full(m, inf)])
+        h.addRows(self.rows, lower, upper, 0, np.zeros(self.rows + 1, dtype=np.int32), np.array([], dtype=np.int32), np.array([]))
+
+        # max_time e artificiais (custo acima de qualquer rota que cubra todos os clientes sozinha)
+        big = 2 * inst.dist[0].sum() / inst.speed.min() + 1
+        time_rows = np.arange(n - 1 + m, self.rows, dtype=np.int32)
+        artificial = np.arange(n - 1 + m, dtype=np.int32)
+        self.fixed = 1 + len(artificial)
+        starts = np.concatenate([[0], m + np.arange(len(artificial) + 1)]).astype(np.int32)
+        h.addCols(self.fixed, np.concatenate([[1.0], np.full(len(artificial), big)]), np.zeros(self.fixed), np.full(self.fixed, inf),
+                  m + len(artificial), starts, np.concatenate([time_rows, artificial]), np.ones(m + len(artificial)))
+
+    def route_time(self, k, route):
+        d = self.inst.dist
+        stops = [0] + route + [0]
+        return d[stops[:-1], stops[1:]].sum() / self.inst.speed[k]
+
+    def add_columns(self, columns):
+        """Acrescenta ao RMP as rotas (k, rota) ainda não geradas. Devolve quantas entraram."""
+        n = self.inst.n
+        # Um dict pela chave também tira as repetições do próprio lote (rotas unitárias e da heurística vêm juntas)
+        columns = list({(k, tuple(route)): (k, list(route)) for k, route in columns
+                        if (k, tuple(route)) not in self.known}.values())
+        if not columns:
+            return 0
+        starts, index, value = [0], [], []
+        for k, route in columns:
+            self.known.add((k, tuple(route)))
+            self.routes.append((k, route))
+            index += [i - 1 for i in route] + [n - 1 + k, n - 1 + self.inst.m + k]
+            value += [1.0] * (len(route) + 1) + [-self.route_time(k, route)]
+            starts.append(len(index))
+        self.h.addCols(len(columns), np.zeros(len(columns)), np.zeros(len(columns)), np.ones(len(columns)), len(index),
+                       np.array(starts[:-1], dtype=np.int32), np.array(index, dtype=np.int32), np.array(value))
+        return len(columns)
+
+    def _solve_master(self):
+        start = time.perf_counter()
+        self.h.run()
+        self.stats['master_time'] += time.perf_counter() - start
+        duals = np.array(self.h.getSolution().row_dual)
+        n, m = self.inst.n, self.inst.m
+        pi = np.concatenate([[0.0], duals[:n - 1]]).tolist()
+        return self.h.getInfo().objective_function_value, pi, duals[n - 1:n - 1 + m], duals[n - 1 + m:]
+
+    def _heuristic(self, duals, deadline):
+        """Rotas ainda não geradas com custo reduzido negativo nos duais, pelo pricing com beam."""
+        pi, mu, sigma = duals
+        columns = []
+        for k in range(self.inst.m):
+            routes, _, _ = self.pricing.price(k, pi, mu[k], sigma[k], self.beam, self.limit, deadline)
+            columns += [(k, r) for r in routes if (k, tuple(r)) not in self.known]
+        return columns
+
+    def _exact(self, duals, deadline):
+        """Pricing exato de todos os veículos. Devolve (colunas, limite de Lagrange nos duais ou None)."""
+        pi, mu, sigma = duals
+        self.stats['exact_pricing'] += 1
+        columns, reduced, complete = [], [], True
+        for k in range(self.inst.m):
+            routes, best, done = self.pricing.price(k, pi, mu[k], sigma[k], None, self.limit, deadline)
+            columns += [(k, r) for r in routes]
+            reduced.append(best)
+            complete = complete and done
+        # Valor dual (clientes e veículos; as linhas de tempo têm lado direito 0) mais o menor custo reduzido de cada veículo
+        return columns, sum(pi) + sum(mu) + sum(reduced) if complete else None
+
+    def _price(self, duals, exact, deadline):
+        """Pricing heurístico nos duais suavizados e, sem colunas novas, nos do RMP; exato se pedido ou sem colunas.
+
+        Devolve (colunas, limite de Lagrange ou None).
+        """
+        start = time.perf_counter()
+        columns = []
+        if self.alpha and self.center is not None:
+            point = tuple([self.alpha * c + (1 - self.alpha) * v for c, v in zip(center, rmp)]
+                          for center, rmp in zip(self.center, duals))
+            columns = self._heuristic(point, deadline)
+            self.center = point
+        if not columns:
+            columns = self._heuristic(duals, deadline)
+            self.center = duals
+        lagrange = None
+        if not columns and time.perf_counter() < deadline:
+            found, lagrange = self._exact(duals, deadline)
+            columns += found
+        elif exact:
+            # Com colunas da heurística, o exato é só uma tentativa de fechar o limite: longe dos duais ótimos a
+            # rotulação explode, então ele custa no máximo metade do pricing feito até aqui
+            budget = max(1.0, (self.stats['pricing_time'] + time.perf_counter() - start) / 2)
+            found, lagrange = self._exact(duals, min(deadline, time.perf_counter() + budget))
+            columns += found
+        self.stats['pricing_time'] += time.perf_counter() - start
+        return columns, lagrange
+
+    def solve_relaxation(self, initial=(), tmlim=30 * 60):
+        """Geração de colunas na relaxação linear, a partir das rotas iniciais (por veículo). Devolve o valor do RMP."""
+        deadline = time.perf_counter() + tmlim
+        self._build()
+        inst = self.inst
+        # Rotas de um cliente que cabem na capacidade, mais as rotas iniciais
+        columns = [(k, [i]) for k in range(inst.m) for i in range(1, inst.n) if 2 * inst.dist[0, i] <= inst.capacity[k] + EPS]
+        columns += [(k, list(route)) for k, route in enumerate(initial) if route]
+        self.add_columns(columns)
+        self.center = None
+        best, stalled, window = None, 0, self.stall
+        while True:
+            value, pi, mu, sigma = self._solve_master()
+            # Sem melhora do RMP por window rodadas, o pricing exato dá o limite que pode encerrar a geração; se não
+            # encerrar, a janela dobra, para o exato não tomar o tempo da heurística
+            if best is not None and value >= best - EPS * max(1.0, abs(best)):
+                stalled += 1
+            else:
+                best, stalled = value, 0
+            exact = window and stalled >= window
+            columns, lagrange = self._price((pi, mu.tolist(), sigma.tolist()), exact, deadline)
+            if exact:
+                stalled, window = 0, 2 * window
+            if lagrange is not None:
+                self.stats['lp_bound'] = max(self.stats['lp_bound'] or 0.0, lagrange)
+            bound = self.stats['lp_bound']
+            closed = bound is not None and value - bound <= EPS * max(1.0, abs(value))
+            added = 0 if closed else self.add_columns(columns)
+            self.stats['iterations'] += 1
+            print(f"Geracao de colunas {self.stats['iterations']}: RMP {value:.4f} | colunas novas {added} | "
+                  f"limite {'-' if bound is None else f'{bound:.4f}'} | mestre {self.stats['master_time']:.4f} s | "
+                  f"pricing {self.stats['pricing_time']:.4f} s")
+            if closed or not added or time.perf_counter() >= deadline:
+                break
+        self.stats['lp_value'] = value
+        self.stats['columns'] = len(self.routes)
+        return value
+
+    def artificial(self):
+        """Verdadeiro se a relaxação ainda usa colunas artificiais (sem rotas que cubram os clientes)."""
+        x = self.h.getSolution().col_value
+        return any(v > EPS for v in x[1:self.fixed])
+
+    def solve_integer(self, start=None, tmlim=30 * 60, tee=True):
+        """Price-and-branch: particionamento inteiro sobre as colunas geradas. Devolve (rotas por veículo, valor) ou None."""
+        import highspy
+
+        h, columns = self.h, len(self.routes)
+        h.setOptionValue('output_flag', tee)
+        h.setOptionValue('time_limit', float(tmlim))
+        h.changeColsBounds(self.fixed - 1, np.arange(1, self.fixed, dtype=np.int32), np.zeros(self.fixed - 1), np.zeros(self.fixed - 1))
+        h.changeColsIntegrality(columns, np.arange(self.fixed, self.fixed + columns, dtype=np.int32),
+                                np.full(columns, highspy.HighsVarType.kInteger))
+        if start is not None:
+            routes, value = start
+            chosen = {(k, tuple(route)) for k, route in enumerate(routes)}
+            initial = highspy.HighsSolution()
+            initial.col_value = [value] + [0.0] * (self.fixed - 1) + [float((k, tuple(r)) in chosen) for k, r in self.routes]
+            initial.value_valid = True
+            h.setSolution(initial)
+        begin = time.perf_counter()
+        h.run()
+        self.stats['mip_time'] = time.perf_counter() - begin
+        self.stats['mip_status'] = h.modelStatusToString(h.getModelStatus())
+        if not h.getInfo().primal_solution_status:
+            return None
+        x = h.getSolution().col_value
+        routes = [[] for _ in range(self.inst.m)]
+        for (k, route), v in zip(self.routes, x[self.fixed:]):
+            if v > 0.5:
+                routes[k] = route
+        return routes, max(self.route_time(k, r) for k, r in enumerate(routes))
@@ -0,0 +1,307 @@
+# Contraparte de ProblemaDeSteiner/matriz.py (ModeloMatricial): os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from utils.vrp_utils import TOL, extract_routes
+
+INF = float('inf')
+# Status do HiGHS (modelStatusToString) no vocabulário dos registros dos outros scripts
+HIGHS_STATUS = {'Optimal': 'optimal', 'Infeasible': 'infeasible', 'Time limit reached': 'time limit'}
+
+
+class MatrixModel:
+    """Programa linear inteiro em forma de matriz esparsa, montado direto com NumPy.
+
+    As restrições ficam em COO (linha, coluna, valor) com sentido ('E', 'L'
+    ou 'G') e lado direito por linha. O modelo é escrito em MPS livre de uma
+    vez ou entregue direto ao HiGHS (highspy), sem construir expressões do
+    Pyomo.
+    """
+
+    def __init__(self, cost, lower, upper, integer):
+        self.cost = np.asarray(cost, dtype=float)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.integer = np.asarray(integer, dtype=bool)
+        self._rows, self._cols, self._vals = [], [], []
+        self._senses, self._rhs = [], []
+        self.num_rows = 0
+
+    @property
+    def num_cols(self):
+        return len(self.cost)
+
+    def add_rows(self, rows, cols, vals, sense, rhs):
+        """Acrescenta um bloco de linhas. rows são índices locais 0..len(rhs)-1 do bloco."""
+        rhs = np.asarray(rhs, dtype=float)
+        self._rows.append(np.asarray(rows, dtype=np.int64) + self.num_rows)
+        self._cols.append(np.asarray(cols, dtype=np.int64))
+        self._vals.append(np.broadcast_to(np.asarray(vals, dtype=float), len(self._cols[-1])))
+        self._senses.append(np.full(len(rhs), sense))
+        self._rhs.append(rhs)
+        self.num_rows += len(rhs)
+
+    def nnz(self):
+        return sum(len(c) for c in self._cols)
+
+    def csc(self):
+        """Matriz por colunas: (início de cada coluna, índices de linha, valores)."""
+        rows, cols, vals = np.concatenate(self._rows), np.concatenate(self._cols), np.concatenate(self._vals)
+        order = np.lexsort((rows, cols))
+        start = np.zeros(self.num_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=self.num_cols), out=start[1:])
+        return start, rows[order], vals[order]
+
+    def csr(self):
+        """Matriz por linhas: (início de cada linha, índices de coluna, valores)."""
+        rows, cols, vals = np.concatenate(self._rows), np.concatenate(self._cols), np.concatenate(self._vals)
+        order = np.argsort(rows, kind='stable')
+        start = np.zeros(self.num_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.num_rows), out=start[1:])
+        return start, cols[order], vals[order]
+
+    def add_to_pyomo(self, columns, constraints):
+        """Acrescenta as linhas a uma ConstraintList do Pyomo; columns[j] é a variável da coluna j."""
+        from pyomo.core.expr.numeric_expr import LinearExpression, MonomialTermExpression
+
+        start, cols, vals = self.csr()
+        senses, rhs = np.concatenate(self._senses).tolist(), np.concatenate(self._rhs).tolist()
+        cols, vals, start = cols.tolist(), vals.tolist(), start.tolist()
+        for r in range(self.num_rows):
+            s, e = start[r], start[r + 1]
+            # Expressão linear montada direto dos termos, sem as somas parciais de sum()
+            body = LinearExpression([columns[c] if v == 1 else MonomialTermExpression((v, columns[c])) for c, v in zip(cols[s:e], vals[s:e])])
+            if senses[r] == 'E':
+                constraints.add(body == rhs[r])
+            elif senses[r] == 'L':
+                constraints.add(body <= rhs[r])
+            else:
+                constraints.add(body >= rhs[r])
+
+    def write_mps(self, path):
+        start, rows, vals = self.csc()
+        senses, rhs = np.concatenate(self._senses), np.concatenate(self._rhs)
+        out = ['NAME MODEL', 'ROWS', ' N OBJ']
+        out += [f' {s} R{i}' for i, s in enumerate(senses)]
+        out.append('COLUMNS')
+        int_open = False
+        for j in range(self.num_cols):
+            if self.integer[j] != int_open:
+                out.append(f" M{j} 'MARKER' '{'INTORG' if self.integer[j] else 'INTEND'}'")
+                int_open = bool(self.integer[j])
+            if self.cost[j] != 0:
+                out.append(f' C{j} OBJ {self.cost[j]:.17g}')
+            out += [f' C{j} R{i} {v:.17g}' for i, v in zip(rows[start[j]:start[j + 1]].tolist(), vals[start[j]:start[j + 1]].tolist())]
+        if int_open:
+            out.append(" MEND 'MARKER' 'INTEND'")
+        out.append('RHS')
+        out += [f' RHS R{i} {v:.17g}' for i, v in enumerate(rhs.tolist()) if v != 0]
+        out.append('BOUNDS')
+        for j, (lb, ub) in enumerate(zip(self.lower.tolist(), self.upper.tolist())):
+            if lb == ub:
+                out.append(f' FX BND C{j} {lb:.17g}')
+                continue
+            if lb == -INF:
+                out.append(f' MI BND C{j}')
+            elif lb != 0:
+                out.append(f' LO BND C{j} {lb:.17g}')
+            if ub != INF:
+                out.append(f' UP BND C{j} {ub:.17g}')
+            elif self.integer[j]:
+                out.append(f' PL BND C{j}')
+        out.append('ENDATA\n')
+        with open(path, 'w') as file:
+            file.write('\n'.join(out))
+
+    def solve(self, tmlim=30 * 60, tee=True, start=None, cutoff=None):
+        """Resolve com o HiGHS se o highspy estiver instalado; senão escreve o MPS e chama o glpsol.
+
+        start é uma solução inicial (valor por coluna), usada só pelo HiGHS. O
+        glpsol não aceita solução inicial inteira; nele, cutoff (valor de uma
+        solução conhecida) entra como corte de objetivo.
+        """
+        try:
+            import highspy  # noqa: F401
+        except ImportError:
+            if cutoff is not None:
+                cols = np.flatnonzero(self.cost)
+                self.add_rows(np.zeros(len(cols)), cols, self.cost[cols], 'L', [cutoff])
+            return self._solve_glpk(tmlim, tee)
+        return self._solve_highs(tmlim, tee, start)
+
+    def _solve_highs(self, tmlim, tee, start=None):
+        import highspy
+
+        start_write = time.perf_counter()
+        starts, rows, vals = self.csc()
+        senses, rhs = np.concatenate(self._senses), np.concatenate(self._rhs)
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.num_cols
+        lp.num_row_ = self.num_rows
+        lp.col_cost_ = self.cost
+        lp.col_lower_ = self.lower
+        lp.col_upper_ = self.upper
+        lp.row_lower_ = np.where(senses == 'L', -highspy.kHighsInf, rhs)
+        lp.row_upper_ = np.where(senses == 'G', highspy.kHighsInf, rhs)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = starts
+        lp.a_matrix_.index_ = rows
+        lp.a_matrix_.value_ = vals
+        lp.integrality_ = [highspy.HighsVarType.kInteger if i else highspy.HighsVarType.kContinuous for i in self.integer]
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', tee)
+        h.setOptionValue('time_limit', float(tmlim))
+        h.passModel(lp)
+        if start is not None:
+            initial = highspy.HighsSolution()
+            initial.col_value = list(start)
+            initial.value_valid = True
+            h.setSolution(initial)
+        write_time = time.perf_counter() - start_write
+
+        start_solve = time.perf_counter()
+        h.run()
+        solve_time = time.perf_counter() - start_solve
+        info = h.getInfo()
+        status = h.modelStatusToString(h.getModelStatus())
+        status = HIGHS_STATUS.get(status, status.lower())
+        x = np.array(h.getSolution().col_value) if info.primal_solution_status else None
+        value = None if x is None else info.objective_function_value
+        return Solution('highs', status, value, info.mip_dual_bound, x, write_time, solve_time)
+
+    def _solve_glpk(self, tmlim, tee):
+        with tempfile.TemporaryDirectory() as folder:
+            mps = os.path.join(folder, 'model.mps')
+            sol = os.path.join(folder, 'solution.txt')
+            start = time.perf_counter()
+            self.write_mps(mps)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            process = subprocess.run(['glpsol', '--freemps', mps, '--tmlim', str(int(tmlim)), '-w', sol],
+                                     capture_output=True, text=True)
+            solve_time = time.perf_counter() - start
+            if tee:
+                print(process.stdout)
+            status, value, x = 'error', None, None
+            if os.path.isfile(sol):
+                x = np.zeros(self.num_cols)
+                with open(sol) as file:
+                    for line in file:
+                        parts = line.split()
+                        if not parts:
+                            continue
+                        if parts[0] == 's':
+                            # s mip LINHAS COLUNAS STATUS OBJ
+                            status = {'o': 'optimal', 'f': 'feasible', 'n': 'infeasible', 'u': 'undefined'}.get(parts[4], parts[4])
+                            value = float(parts[-1])
+                        elif parts[0] == 'j':
+                            x[int(parts[1]) - 1] = float(parts[2])
+        bound = value if status == 'optimal' else None
+        return Solution('glpk', status, value, bound, x, write_time, solve_time)
+
+
+class Solution:
+    def __init__(self, solver, status, value, bound, x, write_time, solve_time):
+        self.solver = solver
+        self.status = status
+        self.value = value
+        self.bound = bound
+        self.x = x
+        self.write_time = write_time
+        self.solve_time = solve_time
+
+    def ok(self):
+        return self.x is not None and self.value is not None
+
+    def optimal(self):
+        return self.status.lower() == 'optimal'
+
+
+def solution_routes(solution, inst):
+    """Rotas por veículo lidas das colunas x da solução (arcos com x > 0.5)."""
+    arcs = len(inst.tail)
+    k, a = np.divmod(np.flatnonzero(solution.x[:arcs * inst.m] > TOL), arcs)
+    return extract_routes(zip(inst.tail[a].tolist(), inst.head[a].tolist(), k.tolist()), inst.m)
+
+
+def build_vrp(inst, mtz=True):
+    """Formulação do VRP_MTZ.py (ou, com mtz falso, a do VRP_CUTS.py sem os cortes) montada em matriz.
+
+    Colunas: x[i, j, k] (k-maior, arcos na ordem de inst.tail), y[i, k]
+    (k-maior), max_time e, com MTZ, u[i]. Usa as distâncias de
+    inst.compute_distances().
+    """
+    n, m = inst.n, inst.m
+    tail, head, dist = inst.tail, inst.head, inst.arc_dist
+    A = len(tail)
+
+    X, Y = A * m, n * m
+    x_cols = np.arange(X)
+    y0, max_time, u0 = X, X + Y, X + Y + 1
+    U = n if mtz else 0
+    cost = np.zeros(X + Y + 1 + U)
+    cost[max_time] = 1
+    lower = np.zeros(len(cost))
+    upper = np.concatenate([np.ones(X + Y), [INF], np.full(U, n - 1.0)])
+    integer = np.concatenate([np.ones(X + Y, dtype=bool), np.zeros(1 + U, dtype=bool)])
+    if mtz:
+        lower[u0 + 1:] = 1  # u[i] >= 1 fora do depósito
+        upper[u0] = 0  # u[depósito] = 0
+    model = MatrixModel(cost, lower, upper, integer)
+
+    tail_k, head_k = np.tile(tail, m), np.tile(head, m)
+    k_of = np.repeat(np.arange(m), A)
+    visits = np.ones(n)
+    visits[0] = m
+
+    # Grau de saída e de entrada: |K| no depósito, 1 nos demais pontos
+    model.add_rows(tail_k, x_cols, 1.0, 'E', visits)
+    model.add_rows(head_k, x_cols, 1.0, 'E', visits)
+
+    # Saída e entrada de cada veículo k no ponto i definem y[i, k]
+    y_cols = y0 + np.arange(Y)
+    for ends in (tail_k, head_k):
+        model.add_rows(np.concatenate([ends + n * k_of, np.arange(Y)]),
+                       np.concatenate([x_cols, y_cols]),
+                       np.concatenate([np.ones(X), -np.ones(Y)]), 'E', np.zeros(Y))
+
+    # Capacidade de cobertura e tempo máximo por veículo
+    model.add_rows(k_of, x_cols, np.tile(dist, m), 'L', inst.capacity)
+    model.add_rows(np.concatenate([k_of, np.arange(m)]), np.concatenate([x_cols, np.full(m, max_time)]),
+                   np.concatenate([np.tile(dist, m) / inst.speed[k_of], -np.ones(m)]), 'L', np.zeros(m))
+    if not mtz:
+        return model
+
+    # MTZ: u[j] - u[i] - (n-1) x[i, j, k] - (n-3) x[j, i, k] >= -(n-2), para i, j fora do depósito
+    inner = np.flatnonzero((tail != 0) & (head != 0))
+    a = np.tile(inner, m) + A * np.repeat(np.arange(m), len(inner))
+    rev = np.tile(inst.arc_id[head[inner], tail[inner]], m) + A * np.repeat(np.arange(m), len(inner))
+    i, j = tail_k[a], head_k[a]
+    r = np.arange(len(a))
+    model.add_rows(np.concatenate([r, r, r, r]), np.concatenate([u0 + j, u0 + i, a, rev]),
+                   np.concatenate([np.ones(len(a)), -np.ones(len(a)), np.full(len(a), -(n - 1.0)), np.full(len(a), -(n - 3.0))]),
+                   'G', np.full(len(a), -(n - 2.0)))
+    return model
+
+
+def solve_vrp_mtz(inst, tmlim=30 * 60, tee=True, routes=None, value=None):
+    """Monta e resolve o VRP MTZ em forma matricial. Devolve (solução, rotas por veículo ou None, tempo de montagem).
+
+    Com routes (e o tempo máximo delas em value), as rotas entram como solução
+    inicial no HiGHS; no GLPK, só value entra, como limite de max_time.
+    """
+    from utils.vrp_heuristics import start_vector
+
+    start = time.perf_counter()
+    model = build_vrp(inst)
+    build_time = time.perf_counter() - start
+    initial = start_vector(inst, routes, value, model.num_cols) if routes else None
+    solution = model.solve(tmlim, tee, initial, cutoff=value + 1e-6 if routes else None)
+    routes = solution_routes(solution, inst) if solution.ok() else None
+    return solution, routes, build_time
@@ -0,0 +1,99 @@
+# Contraparte de ProblemaDeSteiner/cache_resultados.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+_IMPORT = re.compile(r'^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))', re.M)
+
+
+def source_version(script):
+    """Hash do código do script e dos módulos locais (inclusive utils/) que ele importa, recursivamente."""
+    root = os.path.dirname(os.path.abspath(script))
+    pending, seen = [os.path.abspath(script)], set()
+    digest = hashlib.sha256()
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, 'rb') as file:
+            code = file.read()
+        digest.update(os.path.relpath(path, root).encode() + b'\0' + code)
+        for module_from, module in _IMPORT.findall(code.decode(errors='ignore')):
+            local = os.path.join(root, *(module_from or module).split('.')) + '.py'
+            if os.path.isfile(local):
+                pending.append(local)
+    return digest.hexdigest()[:16]
+
+
+def cache_key(*parts):
+    """Chave de conteúdo: hash das partes (instância, versão do código, opções) em JSON canônico."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+class ResultCache:
+    """Cache de resultados em disco endereçado por conteúdo, com descarte LRU por tamanho.
+
+    Cada entrada é um diretório <chave>/ com entry.json e os arquivos da
+    execução (log, imagem das rotas). Uma consulta atualiza o mtime da
+    entrada; acima do limite, as entradas usadas há mais tempo saem primeiro.
+    """
+
+    def __init__(self, directory='cache', limit_mb=1024):
+        self.directory = directory
+        self.limit = limit_mb * 1024 * 1024
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Resultado guardado para a chave, ou None."""
+        try:
+            with open(os.path.join(self._entry(key), 'entry.json')) as file:
+                entry = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+        os.utime(self._entry(key))
+        return entry
+
+    def restore(self, key, name, destination):
+        """Copia um arquivo guardado na entrada para o destino; falso se ele não existir."""
+        source = os.path.join(self._entry(key), name)
+        if not os.path.isfile(source):
+            return False
+        shutil.copyfile(source, destination)
+        return True
+
+    def put(self, key, entry, files=None):
+        """Guarda o resultado e cópias dos arquivos ({nome na entrada: caminho}); a entrada só aparece completa."""
+        temporary = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        for name, path in (files or {}).items():
+            if path and os.path.isfile(path):
+                shutil.copyfile(path, os.path.join(temporary, name))
+        with open(os.path.join(temporary, 'entry.json'), 'w') as file:
+            json.dump(entry, file, indent=1, default=str)
+        destination = self._entry(key)
+        shutil.rmtree(destination, ignore_errors=True)
+        os.replace(temporary, destination)
+        self.prune()
+
+    def prune(self):
+        """Apaga as entradas menos recentemente usadas até o cache caber no limite."""
+        entries, total = [], 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+            entries.append((os.stat(path).st_mtime, size, path))
+            total += size
+        for _, size, path in sorted(entries):
+            if total <= self.limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,126 @@
+# Contraparte de ProblemaDeSteiner/registro.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import atexit
+import hashlib
+import json
+import os
+import resource
+import time
+from contextlib import contextmanager
+
+
+def instance_hash(V, K):
+    """Hash da instância normalizada (coordenadas na ordem dos pontos, bateria e velocidade de cada veículo)."""
+    text = ' '.join(f"{V[i][0]},{V[i][1]}" for i in sorted(V)) + '\n' + ' '.join(f"{K[k]['b']},{K[k]['s']}" for k in sorted(K))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def peak_memory():
+    """Pico de RSS do processo em MB (VmHWM do Linux; em outros sistemas, ru_maxrss)."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RunRecord:
+    """Registro de uma execução do VRP, gravado como uma linha JSON.
+
+    Cada fase (leitura, distâncias, montagem, resolução, separação, rotas,
+    plotagem) acumula tempo, número de chamadas e o pico de memória ao
+    terminar. Com caminho definido, a linha é acrescentada ao arquivo na saída
+    do script com uma única escrita em modo append, então execuções paralelas
+    podem compartilhar o arquivo. Com profile(), o perfil da execução é
+    gravado junto.
+    """
+
+    def __init__(self, method, path=None, test=None):
+        self.path = path
+        self.data = {'method': method, 'test': test, 'status': 'incomplete', 'phases': {}, 'calls': {}, 'phase_memory': {}}
+        self._start = time.perf_counter()
+        self._last = {}  # Duração da última chamada de cada fase
+        self._saved = False
+        self._profiler = None
+        if path:
+            atexit.register(self.save)
+
+    def instance(self, V, K):
+        self.data.update(instance=instance_hash(V, K), n=len(V), vehicles=len(K))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases, calls = self.data['phases'], self.data['calls']
+            self._last[name] = time.perf_counter() - start
+            phases[name] = phases.get(name, 0.0) + self._last[name]
+            calls[name] = calls.get(name, 0) + 1
+            self.data['phase_memory'][name] = peak_memory()
+
+    def add_time(self, name, seconds):
+        """Acrescenta a uma fase um tempo medido fora de phase() (por exemplo, pelo SolverBackend)."""
+        phases = self.data['phases']
+        phases[name] = phases.get(name, 0.0) + seconds
+
+    def discount_solver(self, name, results):
+        """Move da última chamada da fase para 'write' o que não foi tempo do solver (escrita do LP e leitura da solução)."""
+        last = self._last.get(name, 0.0)
+        solver_time = results.solver.time
+        solver_time = min(solver_time, last) if isinstance(solver_time, (int, float)) and solver_time > 0 else last
+        self.data['phases'][name] -= last - solver_time
+        self.add_time('write', last - solver_time)
+
+    def profile(self, path):
+        """Perfila o resto da execução: .html/.txt com pyinstrument, outros arquivos com cProfile (.prof)."""
+        if not path:
+            return
+        if os.path.splitext(path)[1] in ('.html', '.txt'):
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise SystemExit("pyinstrument nao instalado: pip install pyinstrument (ou use um arquivo .prof para o cProfile)")
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self.data['profile'] = path
+        if not self.path:
+            atexit.register(self.save)
+
+    def _write_profile(self):
+        profiler, path = self._profiler, self.data['profile']
+        self._profiler = None
+        if hasattr(profiler, 'dump_stats'):
+            profiler.disable()
+            profiler.dump_stats(path)
+            return
+        profiler.stop()
+        with open(path, 'w') as file:
+            file.write(profiler.output_html() if path.endswith('.html') else profiler.output_text())
+
+    def set(self, **fields):
+        self.data.update(fields)
+
+    def save(self):
+        if self._profiler is not None:
+            self._write_profile()
+        if not self.path or self._saved:
+            return
+        self._saved = True
+        self.data['total_time'] = time.perf_counter() - self._start
+        self.data['peak_memory'] = peak_memory()
+        self.data['solver_memory'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        line = (json.dumps(self.data, default=str) + '\n').encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
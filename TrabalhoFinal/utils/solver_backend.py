@@ -0,0 +1,117 @@
+# Contraparte de ProblemaDeSteiner/resolvedor.py: os projetos rodam cada um da sua pasta e não importam
+# um do outro, então uma correção feita aqui também deve ser feita lá.
+import time
+
+from pyomo.environ import SolverFactory
+
+
+class SolverBackend:
+    """Camada entre o laço de cortes do VRP e o solver.
+
+    Com 'highs' ou 'cbc' usa as interfaces persistentes (APPSI) do Pyomo: o
+    modelo é carregado uma vez e só os cortes novos são enviados a cada
+    iteração, mantendo a base anterior. Sem o solver persistente instalado,
+    usa o GLPK, que reescreve o arquivo LP e inicia um processo por chamada.
+
+    Cada solve() registra o tempo de atualização do modelo separado do tempo
+    de resolução.
+    """
+
+    PERSISTENT = ('highs', 'cbc')
+
+    def __init__(self, model, backend='glpk', tmlim=30 * 60):
+        self.model = model
+        self.tmlim = tmlim
+        self.to_add = []
+        self.history = []  # (tempo de atualização, tempo de resolução) por chamada
+        self.last = None
+
+        self.opt = self._persistent(backend) if backend in self.PERSISTENT else None
+        self.persistent = self.opt is not None
+        if self.persistent:
+            self.backend = backend
+        else:
+            if backend != 'glpk':
+                print(f"Solver persistente '{backend}' indisponivel, usando GLPK")
+            self.backend = 'glpk'
+            self.opt = SolverFactory('glpk')
+            self.opt.options['tmlim'] = tmlim
+
+    def _persistent(self, backend):
+        try:
+            from pyomo.contrib.appsi.solvers import Highs, Cbc
+        except ImportError:
+            return None
+        opt = {'highs': Highs, 'cbc': Cbc}[backend]()
+        if not opt.available():
+            return None
+        opt.config.time_limit = self.tmlim
+        # Sem solução viável (prazo sem incumbente, mestre inviável) o APPSI levantaria RuntimeError ao carregá-la;
+        # a solução é carregada em solve() só quando existe
+        opt.config.load_solution = False
+        # Os cortes novos são informados explicitamente; não varre o modelo a cada resolução
+        opt.update_config.check_for_new_or_removed_constraints = False
+        opt.update_config.check_for_new_or_removed_vars = False
+        opt.update_config.check_for_new_or_removed_params = False
+        opt.update_config.update_constraints = False
+        opt.update_config.update_named_expressions = False
+        start = time.perf_counter()
+        opt.set_instance(self.model)
+        self.history.append((time.perf_counter() - start, 0.0))
+        return opt
+
+    def add_constraints(self, constraints):
+        """Registra restrições recém-criadas no modelo."""
+        if self.persistent:
+            self.to_add.extend(constraints)
+
+    def solve(self, tee=False, warmstart=False):
+        """Com warmstart, os valores atuais das variáveis vão como solução inicial (só nos persistentes que aceitam)."""
+        if self.persistent:
+            start = time.perf_counter()
+            if self.to_add:
+                self.opt.add_constraints(self.to_add)
+                self.to_add = []
+            update = time.perf_counter() - start
+
+            self.opt.config.stream_solver = tee
+            self.opt.config.warmstart = warmstart and getattr(self.opt, 'warm_start_capable', lambda: False)()
+            start = time.perf_counter()
+            self.last = self.opt.solve(self.model)
+            if self.last.best_feasible_objective is not None:
+                self.last.solution_loader.load_vars()
+            solve = time.perf_counter() - start
+        else:
+            start = time.perf_counter()
+            self.last = self.opt.solve(self.model, tee=tee)
+            total = time.perf_counter() - start
+            solve = min(self.last.solver.time or total, total)
+            update = total - solve
+        self.history.append((update, solve))
+        return self.last
+
+    @property
+    def update_time(self):
+        return self.history[-1][0]
+
+    @property
+    def solve_time(self):
+        return self.history[-1][1]
+
+    def ok(self):
+        """Verdadeiro se a última resolução encontrou solução viável."""
+        if self.persistent:
+            return self.last.best_feasible_objective is not None
+        return str(self.last.solver.status) == 'ok'
+
+    def optimal(self):
+        if self.persistent:
+            return self.last.termination_condition.name == 'optimal'
+        return str(self.last.solver.termination_condition) == 'optimal'
+
+    def print_times(self):
+        update = sum(u for u, _ in self.history)
+        solve = sum(s for _, s in self.history)
+        print(f"Solver: {self.backend}{' (persistente)' if self.persistent else ''}")
+        print(f"Tempo de atualizacao do modelo: {update:.4f}")
+        print(f"Tempo de resolucao: {solve:.4f}")
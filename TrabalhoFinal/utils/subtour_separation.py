@@ -0,0 +1,126 @@
+import time
+
+import networkx as nx
+import numpy as np
+
+SCALE = 10 ** 6  # Capacidades inteiras para o fluxo máximo do SciPy
+
+
+class SubtourSeparator:
+    """Separação dos cortes de subcircuito do VRP (GSEC) x_k(δ+(S)) >= y[h, k], para S sem o depósito e h em S.
+
+    Os conjuntos S são encontrados sobre x̄, a soma de x sobre os veículos:
+    como cada cliente tem grau 1, se x̄(δ+(S)) < 1 = Σ_k y[h, k], algum
+    veículo viola o GSEC de S. Os cortes inseridos são os por veículo, mais
+    fortes na relaxação e sem as linhas densas de um corte agregado.
+
+    fractional() separa na relaxação linear com cortes mínimos h -> depósito
+    (SciPy se instalado, senão networkx), sobre x̄ e depois sobre cada x_k,
+    e devolve os pares (k, h) violados de cada S. integer() usa as
+    componentes fortemente conexas dos arcos usados por cada veículo e só
+    devolve os cortes que esse veículo viola; se o subcircuito voltar em outro
+    veículo, o corte dele entra na rodada seguinte. Cortes já inseridos ficam
+    no pool e não são devolvidos de novo.
+    """
+
+    def __init__(self, inst, eps=1e-4):
+        self.inst = inst
+        self.eps = eps
+        self.pool = set()
+        self.times = []  # Tempo de cada rodada de separação
+
+    def _new(self, cuts):
+        new = []
+        for S, k, h in cuts:
+            cut = (frozenset(S), k, h)
+            if cut not in self.pool:
+                self.pool.add(cut)
+                new.append(cut)
+        return new
+
+    def cut_arcs(self, S):
+        """Índices dos arcos de S para fora de S."""
+        inside = np.zeros(self.inst.n, dtype=bool)
+        inside[list(S)] = True
+        return np.flatnonzero(inside[self.inst.tail] & ~inside[self.inst.head])
+
+    def integer(self, x, y):
+        """x: (veículos, arcos), y: (veículos, pontos)."""
+        start = time.perf_counter()
+        cuts = []
+        for k in range(self.inst.m):
+            used = x[k] > 0.5
+            G = nx.DiGraph(zip(self.inst.tail[used].tolist(), self.inst.head[used].tolist()))
+            for S in nx.strongly_connected_components(G):
+                if 0 in S:
+                    continue
+                members = list(S)
+                out = x[k, self.cut_arcs(S)].sum()
+                cuts += [(S, k, h) for h in members if y[k, h] > out + self.eps]
+        new = self._new(cuts)
+        self.times.append(time.perf_counter() - start)
+        return new
+
+    def fractional(self, x, y):
+        """x: (veículos, arcos), y: (veículos, pontos)."""
+        start = time.perf_counter()
+        sets = self._violated(x.sum(axis=0), np.ones(self.inst.n))
+        for k in range(self.inst.m):
+            sets += self._violated(x[k], y[k])
+        cuts = []
+        for S in {frozenset(S) for S in sets}:
+            members = list(S)
+            out = x[:, self.cut_arcs(S)].sum(axis=1)  # x_k(δ+(S)) de cada veículo
+            k, h = np.nonzero(y[:, members] > out[:, None] + self.eps)
+            cuts += [(S, int(a), members[b]) for a, b in zip(k, h)]
+        new = self._new(cuts)
+        self.times.append(time.perf_counter() - start)
+        return new
+
+    def _violated(self, cap, demand):
+        """Conjuntos S cujo corte mínimo h -> depósito, para algum h em S, é menor que demand[h]."""
+        support = np.flatnonzero(cap > self.eps)
+        tail, head, cap = self.inst.tail[support], self.inst.head[support], cap[support]
+        try:
+            min_cut = self._scipy_min_cut(tail, head, cap)
+        except ImportError:
+            min_cut = self._networkx_min_cut(tail, head, cap)
+        found, covered = [], set()
+        for h in range(1, self.inst.n):
+            if h in covered or demand[h] <= self.eps:
+                continue
+            value, S = min_cut(h)
+            if value < demand[h] - self.eps:
+                found.append(S)
+                covered.update(S)
+        return found
+
+    def _scipy_min_cut(self, tail, head, cap):
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import breadth_first_order, maximum_flow
+
+        n = self.inst.n
+        A = csr_matrix((np.rint(cap * SCALE).astype(np.int32), (tail, head)), shape=(n, n))
+
+        def min_cut(h):
+            result = maximum_flow(A, h, 0)
+            # Lado de h: vértices alcançáveis no grafo residual
+            residual = (A - result.flow).tocsr()
+            residual.data[residual.data < 0] = 0
+            residual.eliminate_zeros()
+            return result.flow_value / SCALE, breadth_first_order(residual, h, return_predecessors=False).tolist()
+        return min_cut
+
+    def _networkx_min_cut(self, tail, head, cap):
+        G = nx.DiGraph()
+        G.add_nodes_from(range(self.inst.n))
+        G.add_weighted_edges_from(zip(tail.tolist(), head.tolist(), cap.tolist()), weight='capacity')
+
+        def min_cut(h):
+            value, (S, _) = nx.minimum_cut(G, h, 0, flow_func=nx.algorithms.flow.shortest_augmenting_path)
+            return value, S
+        return min_cut
+
+    @property
+    def time(self):
+        return sum(self.times)
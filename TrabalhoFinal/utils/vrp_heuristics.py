@@ -0,0 +1,303 @@
+import time
+
+import numpy as np
+
+EPS = 1e-9
+
+
+class MinMaxHeuristic:
+    """Heurística para o VRP min-max (tempo do veículo mais lento) com frota heterogênea.
+
+    routes[k] é a lista de clientes do veículo k, sem o depósito. Duas
+    construções (varredura angular com setores proporcionais à velocidade
+    e economias de Clarke-Wright até sobrarem |K| rotas) são melhoradas por
+    busca local com relocação, troca, 2-opt e cross-exchange. As soluções
+    são comparadas por (excesso sobre as capacidades c, tempo máximo, tempo
+    total): o excesso só existe enquanto a construção não cabe nas baterias,
+    e o tempo total desempata os movimentos que não mexem no veículo
+    crítico.
+    """
+
+    def __init__(self, inst, time_limit=30, segment=3):
+        self.inst = inst
+        self.d = inst.dist.tolist()
+        self.speed = inst.speed.tolist()
+        self.capacity = inst.capacity.tolist()
+        self.time_limit = time_limit
+        self.segment = segment  # Maior segmento trocado no cross-exchange
+        self.stats = {}
+
+    def length(self, route):
+        d = self.d
+        stops = [0] + route + [0]
+        return sum(d[a][b] for a, b in zip(stops, stops[1:]))
+
+    def objective(self, lengths):
+        excess = sum(max(0.0, L - c) for L, c in zip(lengths, self.capacity))
+        times = [L / s for L, s in zip(lengths, self.speed)]
+        return excess, max(times), sum(times)
+
+    def makespan(self, routes):
+        return self.objective([self.length(r) for r in routes])[1]
+
+    def feasible(self, routes):
+        return self.objective([self.length(r) for r in routes])[0] <= EPS
+
+    # Construção
+    def _assign(self, routes):
+        """Rotas mais longas para os veículos mais rápidos."""
+        routes = sorted(routes, key=self.length, reverse=True) + [[] for _ in range(self.inst.m - len(routes))]
+        by_speed = sorted(range(self.inst.m), key=lambda k: -self.speed[k])
+        assigned = [None] * self.inst.m
+        for k, route in zip(by_speed, routes):
+            assigned[k] = route
+        return assigned
+
+    def sweep(self, starts=8):
+        """Clientes em ordem de ângulo em torno do depósito, cortados em setores com tamanhos proporcionais à velocidade."""
+        coords = self.inst.coords
+        angle = np.arctan2(coords[1:, 1] - coords[0, 1], coords[1:, 0] - coords[0, 0])
+        order = (np.argsort(angle) + 1).tolist()
+        customers = len(order)
+        by_speed = sorted(range(self.inst.m), key=lambda k: -self.speed[k])
+        share = np.cumsum([self.speed[k] for k in by_speed]) / sum(self.speed)
+        cuts = [0] + np.rint(share * customers).astype(int).tolist()
+        for t in range(1, len(cuts) - 1):
+            # Todo veículo sai do depósito no modelo: nenhum setor vazio
+            cuts[t] = min(max(cuts[t], cuts[t - 1] + 1), customers - (len(cuts) - 1 - t))
+        best = None
+        for start in range(0, customers, max(1, customers // starts)):
+            rotated = order[start:] + order[:start]
+            routes = [None] * self.inst.m
+            for k, a, b in zip(by_speed, cuts, cuts[1:]):
+                routes[k] = rotated[a:b]
+            value = self.objective([self.length(r) for r in routes])
+            if best is None or value < best[0]:
+                best = (value, routes)
+        return best[1]
+
+    def savings(self):
+        """Clarke-Wright: junta as pontas das rotas com maior economia até sobrarem |K| rotas."""
+        n, d = self.inst.n, self.inst.dist
+        i, j = np.triu_indices(n - 1, 1)
+        i, j = i + 1, j + 1
+        gain = d[0, i] + d[0, j] - d[i, j]
+        order = np.argsort(-gain, kind='stable')
+        routes = {c: [c] for c in range(1, n)}
+        route_of = {c: c for c in range(1, n)}
+        limit = max(self.capacity)
+        for a, b in zip(i[order].tolist(), j[order].tolist()):
+            if len(routes) <= self.inst.m:
+                break
+            ra, rb = route_of[a], route_of[b]
+            if ra == rb:
+                continue
+            A, B = routes[ra], routes[rb]
+            if a not in (A[0], A[-1]) or b not in (B[0], B[-1]):
+                continue
+            # Orienta as rotas para que a termine A e b comece B
+            if A[-1] != a:
+                A = A[::-1]
+            if B[0] != b:
+                B = B[::-1]
+            merged = A + B
+            if self.length(merged) > limit:
+                continue
+            del routes[rb]
+            routes[ra] = merged
+            for c in B:
+                route_of[c] = ra
+        routes = list(routes.values())
+        while len(routes) > self.inst.m:
+            # Sem junção que caiba na maior bateria: junta as duas menores e deixa a busca local repartir
+            routes.sort(key=self.length)
+            routes = [routes[0] + routes[1]] + routes[2:]
+        return self._assign(routes)
+
+    # Busca local
+    def local_search(self, routes, deadline):
+        routes = [list(r) for r in routes]
+        lengths = [self.length(r) for r in routes]
+        moves = {'two_opt': 0, 'relocate': 0, 'swap': 0, 'cross': 0}
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for name, move in (('two_opt', self._two_opt), ('relocate', self._relocate),
+                               ('swap', self._swap), ('cross', self._cross)):
+                if move(routes, lengths):
+                    moves[name] += 1
+                    improved = True
+                    break
+        self.stats['moves'] = moves
+        return routes
+
+    def _better(self, lengths, changes):
+        """Verdadeiro se trocar os comprimentos das rotas em changes ({k: novo comprimento}) melhora o objetivo."""
+        new = list(lengths)
+        for k, L in changes.items():
+            new[k] = L
+        before, after = self.objective(lengths), self.objective(new)
+        return after[0] < before[0] - EPS or (abs(after[0] - before[0]) <= EPS and (
+            after[1] < before[1] - EPS or (after[1] <= before[1] + EPS and after[2] < before[2] - EPS)))
+
+    def _two_opt(self, routes, lengths):
+        """Inverte um trecho de uma rota (só diminui o comprimento dela)."""
+        d = self.d
+        for k, route in enumerate(routes):
+            stops = [0] + route + [0]
+            for i in range(1, len(stops) - 2):
+                a, b = stops[i - 1], stops[i]
+                for j in range(i + 1, len(stops) - 1):
+                    c, e = stops[j], stops[j + 1]
+                    delta = d[a][c] + d[b][e] - d[a][b] - d[c][e]
+                    if delta < -EPS:
+                        route[i - 1:j] = route[i - 1:j][::-1]
+                        lengths[k] += delta
+                        return True
+        return False
+
+    def _relocate(self, routes, lengths):
+        """Move um cliente para a melhor posição de outra rota."""
+        d = self.d
+        for a, route in enumerate(routes):
+            if len(route) == 1:
+                continue  # Todo veículo sai do depósito no modelo: a rota não pode ficar vazia
+            stops = [0] + route + [0]
+            for i in range(1, len(stops) - 1):
+                p, c, q = stops[i - 1], stops[i], stops[i + 1]
+                removed = lengths[a] + d[p][q] - d[p][c] - d[c][q]
+                for b, other in enumerate(routes):
+                    if b == a:
+                        continue
+                    ends = [0] + other + [0]
+                    best, pos = min((d[u][c] + d[c][v] - d[u][v], j) for j, (u, v) in enumerate(zip(ends, ends[1:])))
+                    if self._better(lengths, {a: removed, b: lengths[b] + best}):
+                        del route[i - 1]
+                        other.insert(pos, c)
+                        lengths[a], lengths[b] = removed, lengths[b] + best
+                        return True
+        return False
+
+    def _swap(self, routes, lengths):
+        """Troca dois clientes de rotas diferentes."""
+        d = self.d
+        for a in range(len(routes)):
+            A = [0] + routes[a] + [0]
+            for b in range(a + 1, len(routes)):
+                B = [0] + routes[b] + [0]
+                for i in range(1, len(A) - 1):
+                    p, c, q = A[i - 1], A[i], A[i + 1]
+                    out_a = d[p][c] + d[c][q]
+                    for j in range(1, len(B) - 1):
+                        u, e, v = B[j - 1], B[j], B[j + 1]
+                        La = lengths[a] - out_a + d[p][e] + d[e][q]
+                        Lb = lengths[b] - d[u][e] - d[e][v] + d[u][c] + d[c][v]
+                        if self._better(lengths, {a: La, b: Lb}):
+                            routes[a][i - 1], routes[b][j - 1] = e, c
+                            lengths[a], lengths[b] = La, Lb
+                            return True
+        return False
+
+    def _cross(self, routes, lengths):
+        """Cross-exchange: troca trechos de até `segment` clientes entre duas rotas, mantendo a orientação."""
+        d, L = self.d, self.segment
+        for a in range(len(routes)):
+            A = [0] + routes[a] + [0]
+            for b in range(a + 1, len(routes)):
+                B = [0] + routes[b] + [0]
+                for i in range(1, len(A) - 1):
+                    for la in range(1, min(L, len(A) - 1 - i) + 1):
+                        p, s1, e1, q = A[i - 1], A[i], A[i + la - 1], A[i + la]
+                        inner_a = self._inner(A, i, la)
+                        for j in range(1, len(B) - 1):
+                            for lb in range(1, min(L, len(B) - 1 - j) + 1):
+                                if la == 1 and lb == 1:
+                                    continue  # Já coberto pela troca
+                                u, s2, e2, v = B[j - 1], B[j], B[j + lb - 1], B[j + lb]
+                                inner_b = self._inner(B, j, lb)
+                                La = lengths[a] - d[p][s1] - inner_a - d[e1][q] + d[p][s2] + inner_b + d[e2][q]
+                                Lb = lengths[b] - d[u][s2] - inner_b - d[e2][v] + d[u][s1] + inner_a + d[e1][v]
+                                if self._better(lengths, {a: La, b: Lb}):
+                                    seg_a, seg_b = A[i:i + la], B[j:j + lb]
+                                    routes[a][i - 1:i - 1 + la] = seg_b
+                                    routes[b][j - 1:j - 1 + lb] = seg_a
+                                    lengths[a], lengths[b] = La, Lb
+                                    return True
+        return False
+
+    def _inner(self, stops, i, size):
+        d = self.d
+        return sum(d[stops[t]][stops[t + 1]] for t in range(i, i + size - 1))
+
+    def solve(self):
+        """Melhor construção seguida de busca local. Devolve as rotas por veículo."""
+        start = time.perf_counter()
+        candidates = {'sweep': self.sweep(), 'savings': self.savings()}
+        name, routes = min(candidates.items(), key=lambda item: self.objective([self.length(r) for r in item[1]]))
+        self.stats.update(construction=name, initial=self.makespan(routes), build_time=time.perf_counter() - start)
+        routes = self.local_search(routes, start + self.time_limit)
+        self.stats.update(value=self.makespan(routes), feasible=self.feasible(routes), time=time.perf_counter() - start)
+        return routes
+
+
+def initial_routes(inst, record, time_limit=30):
+    """Roda a heurística na fase 'heuristic' do registro e imprime o resultado.
+
+    Devolve (rotas, tempo máximo) se couberem nas capacidades, senão None.
+    Com menos clientes que veículos o modelo é inviável e nada é feito.
+    """
+    if inst.n - 1 < inst.m:
+        return None
+    with record.phase('heuristic'):
+        heuristic = MinMaxHeuristic(inst, time_limit=time_limit)
+        routes = heuristic.solve()
+    stats = heuristic.stats
+    print(f"Heuristica ({stats['construction']} + busca local): tempo maximo {stats['value']:.2f} s "
+          f"(construcao {stats['initial']:.2f} s) em {stats['time']:.4f} s{'' if stats['feasible'] else ' | excede a capacidade'}")
+    record.set(heuristic=stats['value'], heuristic_feasible=stats['feasible'])
+    return (routes, stats['value']) if stats['feasible'] else None
+
+
+def route_arcs(routes):
+    """Arcos (i, j, k) das rotas, incluindo a saída e a volta ao depósito."""
+    arcs = []
+    for k, route in enumerate(routes):
+        if route:
+            stops = [0] + route + [0]
+            arcs += [(i, j, k) for i, j in zip(stops, stops[1:])]
+    return arcs
+
+
+def load_start(model, inst, routes, value):
+    """Coloca as rotas como valores iniciais de x, y, max_time (e u, no MTZ) do modelo do Pyomo."""
+    for var in model.x.values():
+        var.set_value(0)
+    for var in model.y.values():
+        var.set_value(0)
+    for i, j, k in route_arcs(routes):
+        model.x[i, j, k].set_value(1)
+    for k, route in enumerate(routes):
+        for i in route:
+            model.y[i, k].set_value(1)
+        if route:
+            model.y[0, k].set_value(1)
+        if hasattr(model, 'u'):
+            for position, i in enumerate(route, start=1):
+                model.u[i].set_value(position)
+    model.max_time.set_value(value)
+    if hasattr(model, 'u'):
+        model.u[0].set_value(0)
+
+
+def start_vector(inst, routes, value, num_cols):
+    """Mesmo ponto inicial nas colunas de build_vrp (x, y, max_time, u)."""
+    A, n, m = len(inst.tail), inst.n, inst.m
+    start = np.zeros(num_cols)
+    for i, j, k in route_arcs(routes):
+        start[k * A + inst.arc_id[i, j]] = 1
+    for k, route in enumerate(routes):
+        start[A * m + k * n + np.array([0] + route if route else [], dtype=int)] = 1
+        if num_cols > A * m + n * m + 1:
+            start[A * m + n * m + 1 + np.array(route, dtype=int)] = np.arange(1, len(route) + 1)
+    start[A * m + n * m] = value
+    return start
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class VrpInstance:
+    """Instância do VRP em arrays NumPy.
+
+    coords é (n, 2), battery, speed e capacity têm um valor por veículo.
+    compute_distances() preenche a matriz dist (n, n) e os arcos i != j em
+    arrays inteiros: tail[a], head[a], dist[a] em arc_dist e o índice de
+    cada arco em arc_id[i, j]. V e K guardam os mesmos dados como
+    dicionários, para o registro e a impressão das rotas.
+    """
+
+    def __init__(self, coords, battery, speed):
+        self.V = {i: tuple(p) for i, p in enumerate(coords)}
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.battery = np.asarray(battery, dtype=float)
+        self.speed = np.asarray(speed, dtype=float)
+        self.capacity = self.speed * 60 * self.battery
+        self.K = {k: {'b': b, 's': s, 'c': s * 60 * b} for k, (b, s) in enumerate(zip(battery, speed))}
+        self.dist = None
+
+    @property
+    def n(self):
+        return len(self.coords)
+
+    @property
+    def m(self):
+        return len(self.speed)
+
+    def compute_distances(self):
+        diff = self.coords[:, None, :] - self.coords[None, :, :]
+        self.dist = np.hypot(diff[..., 0], diff[..., 1])
+        n = self.n
+        # Arcos i != j em ordem de i; o arco a = i * (n - 1) + j', com j' = j - (j > i)
+        self.tail = np.repeat(np.arange(n), n - 1)
+        self.head = np.arange(n * (n - 1)) % (n - 1)
+        self.head += self.head >= self.tail
+        self.arc_dist = self.dist[self.tail, self.head]
+        self.arc_id = np.full((n, n), -1, dtype=np.int64)
+        self.arc_id[self.tail, self.head] = np.arange(len(self.tail))
+        return self.dist
+
+    def x_index(self):
+        """Índices (i, j, k) das variáveis x na ordem das colunas da matriz: veículo, depois arco."""
+        tail, head = self.tail.tolist(), self.head.tolist()
+        return [(i, j, k) for k in range(self.m) for i, j in zip(tail, head)]
+
+
+def read_instance():
+    """Lê a instância da entrada padrão: n v, as n coordenadas e a bateria (min) e velocidade (m/s) de cada veículo."""
+    n, v = map(int, input("Digite o número de vértices e o número de veículos: ").split())  # Número de vértices e número de veículos
+
+    # Leitura das coordenadas dos vértices
+    coords = []
+    for i in range(n):
+        x, y = map(int, input(f"Digite as coordenadas do ponto {i + 1}: ").split())
+        coords.append((x, y))
+
+    # Leitura dos veículos
+    battery, speed = [], []
+    for i in range(v):
+        b, s = map(float, input(f"Digite o tempo de bateria (m) e a velocidade do veículo {i + 1} (m/s) ").split())
+        battery.append(b)
+        speed.append(s)
+    return VrpInstance(coords, battery, speed)
@@ -1,64 +1,120 @@
-import matplotlib.pyplot as plt
-import networkx as nx
+import json
 
-def print_routes(model, V, N ,d):
+TOL = 0.5  # x acima disso conta como arco usado (solvers devolvem 0.9999999, 1e-10, ...)
+
+
+def extract_routes(arcs, vehicles):
+    """Rotas por veículo (routes[k] com os clientes em ordem, sem o depósito) a partir dos arcos (i, j, k) usados."""
+    successor = [{} for _ in range(vehicles)]
+    for i, j, k in arcs:
+        successor[k][i] = j
+    routes = []
+    for k in range(vehicles):
+        route, current = [], successor[k].get(0)
+        while current not in (None, 0) and len(route) < len(successor[k]):
+            route.append(current)
+            current = successor[k].get(current)
+        routes.append(route)
+    return routes
+
+
+def routes_from_model(model, vehicles, tol=TOL):
+    """Rotas de um modelo do Pyomo com x[i, j, k], lendo os valores de x uma única vez."""
+    used = [index for index, value in model.x.extract_values().items() if value is not None and value > tol]
+    return extract_routes(used, vehicles)
+
+
+def route_length(route, d):
+    stops = [0] + route + [0]
+    return sum(d[i, j] for i, j in zip(stops, stops[1:]))
+
+
+def print_routes(routes, V, d):
     """Imprime a rota de cada veículo."""
-    for k in V:
-        route = [0]  # Começa do depósito
-        current_location = 0
-        while True:
-            next_location = None
-            for i in N:
-                if i != current_location and model.x[current_location, i, k].value == 1:
-                    next_location = i
-                    break
-            if next_location is None or next_location == 0:
-                break
-            route.append(next_location)
-            current_location = next_location
-        route.append(0)  # Volta ao depósito
-        total_dist = sum(d[current_location, next_location] for current_location, next_location in zip(route, route[1:]))
+    for k, route in enumerate(routes):
+        total_dist = route_length(route, d)
         total_time = total_dist / V[k]['s']
-        final_route= ' -> '.join(str(i) for i in route)
+        final_route = ' -> '.join(str(i) for i in [0] + route + [0])
         print(f"Rota do veiculo {k}: {final_route} | Distancia percorrida: {total_dist/1000:.2f} km | Tempo de deslocamento: {total_time/ 60:.2f} minutos")
 
-def plot_routes(model, V, N, d, save = False, path = None):
-    """Plota a rota de cada veículo em um gráfico com cores diferentes."""
-    # Criação do grafo
-    G = nx.DiGraph()
-    
+
+def plot_routes(routes, V, N, d, path=None, mode='auto'):
+    """Plota a rota de cada veículo em um gráfico com cores diferentes.
+
+    mode 'auto' salva em path (backend Agg, sem janela) ou, sem path, abre a
+    janela do matplotlib; 'defer' só grava as rotas em path trocado para
+    .json, para a imagem ser feita depois por render_routes (em outro
+    processo); 'off' não faz nada. O matplotlib só é importado quando usado.
+    """
+    if mode == 'off':
+        return
+    if mode == 'defer':
+        save_routes(path, routes, V, N, d)
+        return
+    if path:
+        figure = _draw(routes, V, N, d)
+        figure.savefig(path)
+        return
+    import matplotlib.pyplot as plt
+    _draw(routes, V, N, d, plt.figure(figsize=(12, 8)))
+    plt.show()
+
+
+def _draw(routes, V, N, d, figure=None):
+    import matplotlib
+    import networkx as nx
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if figure is None:
+        figure = Figure(figsize=(12, 8))
+        FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
     # Cores para os veículos
-    colors = plt.cm.get_cmap('nipy_spectral', len(V))
-    
-    # Criação de um dicionário para as cores das arestas
-    edge_colors = {}
-
-    # Adicionar arestas e cores ao grafo
-    for k_idx, k in enumerate(V):
-        for i in N:
-            for j in N:
-                if i != j and model.x[i, j, k].value == 1:
-                    dist = {round(d[i, j]/1000, 2)}
-                    time = {round(d[i, j]/V[k]['s']/60, 2)}
-                    G.add_edge(i, j, weight="{}km \n {}min".format(dist, time), color=(colors(k_idx)))
-                    edge_colors[(i, j)] =(colors(k_idx)) # Mapeia a cor para a aresta
-
-    # Configurações do grafo
-    pos = {i: (N[i][0], N[i][1]) for i in N}
-    labels = {i: f'{i}' for i in N}
-    edge_color_list = [edge_colors.get((u, v), 'black') for u, v in G.edges()]  # Lista de cores para as arestas
+    colors = matplotlib.colormaps['nipy_spectral'].resampled(len(V))
 
-    # Lista de cores para os nós, com a raiz (nó 0) em verde e os outros em azul claro
+    # Arestas das rotas, com distância e tempo
+    G = nx.DiGraph()
+    for k, route in enumerate(routes):
+        stops = [0] + route + [0] if route else []
+        for i, j in zip(stops, stops[1:]):
+            G.add_edge(i, j, weight=f"{d[i, j]/1000:.2f}km \n {d[i, j]/V[k]['s']/60:.2f}min", color=colors(k))
+
+    # Configurações do grafo, com a raiz (nó 0) em verde e os outros em azul claro
+    pos = {i: (N[i][0], N[i][1]) for i in N}
+    labels = {i: f'{i}' for i in G.nodes()}
+    edge_color_list = [G.edges[u, v]['color'] for u, v in G.edges()]
     node_color_list = ['green' if node == 0 else 'lightblue' for node in G.nodes()]
 
     # Desenho do grafo
-    plt.figure(figsize=(12, 8))
-    nx.draw(G, pos, with_labels=True, labels=labels, node_size=700, node_color=node_color_list, font_size=10, font_weight='bold', edge_color=edge_color_list, width=2.0)
-    edge_labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
-    
-    plt.title("Rotas dos Veículos")
-    if save:
-        plt.savefig(path)
-    else:
-        plt.show()
+    nx.draw(G, pos, ax=ax, with_labels=True, labels=labels, node_size=700, node_color=node_color_list, font_size=10, font_weight='bold',
+            edge_color=edge_color_list, width=2.0)
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), font_size=8, ax=ax)
+    ax.set_title("Rotas dos Veículos")
+    return figure
+
+
+def routes_file(path):
+    """Arquivo .json das rotas adiadas de uma imagem."""
+    return path.rsplit('.', 1)[0] + '.json'
+
+
+def save_routes(path, routes, V, N, d):
+    """Grava as rotas, os pontos, as velocidades e as distâncias usadas, o bastante para render_routes desenhar sem o modelo."""
+    arcs = {f"{i},{j}": float(d[i, j]) for route in routes for i, j in zip([0] + route, route + [0]) if route}
+    data = {'image': path, 'routes': routes, 'points': {i: list(p) for i, p in N.items()},
+            'speeds': [V[k]['s'] for k in range(len(routes))], 'arcs': arcs}
+    with open(routes_file(path), 'w') as file:
+        json.dump(data, file)
+
+
+def render_routes(json_path):
+    """Desenha a imagem gravada por plot_routes(..., mode='defer'). Devolve o caminho da imagem."""
+    with open(json_path) as file:
+        data = json.load(file)
+    N = {int(i): p for i, p in data['points'].items()}
+    V = {k: {'s': s} for k, s in enumerate(data['speeds'])}
+    d = {tuple(map(int, arc.split(','))): value for arc, value in data['arcs'].items()}
+    _draw(data['routes'], V, N, d).savefig(data['image'])
+    return data['image']